@@ -4,21 +4,99 @@ NexusFS Configuration Management
 Central configuration for all NexusFS components.
 """
 
+import functools
+import json
 import os
+import tomllib
 from pathlib import Path
+from typing import Any, get_origin
 
-import toml
-from pydantic import BaseModel, Field
-from pydantic_settings import BaseSettings
+from pydantic import BaseModel, ConfigDict, Field
 
 # Default paths
 DEFAULT_DATA_DIR = Path("D:/NexusFS/data")
 DEFAULT_CONFIG_DIR = Path("D:/NexusFS/configs")
 
+# Environment overrides, e.g. NEXUS_LOG_LEVEL or NEXUS_INDEX_THREADS
+ENV_PREFIX = "NEXUS_"
+ENV_FILE = Path(".env")
+
+
+def _read_env_file(path: Path) -> dict[str, str]:
+    """Parse KEY=VALUE lines from a .env file."""
+    values = {}
+    if path.is_file():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            key, sep, value = line.strip().removeprefix("export ").partition("=")
+            if sep and not key.startswith("#"):
+                values[key.strip()] = value.strip().strip("'\"")
+    return values
+
+
+def _set_env_value(model: type[BaseModel], data: dict[str, Any], name: str, value: str) -> bool:
+    """
+    Store an env value under the field it names, descending into sub-configs.
+
+    Field names contain underscores themselves, so NEXUS_INDEX_BATCH_SIZE is
+    resolved by trying each sub-config whose name prefixes the key.
+    """
+    field = model.model_fields.get(name)
+    if field is not None:
+        # Lists and dicts are given as JSON, as pydantic-settings accepted
+        data[name] = json.loads(value) if get_origin(field.annotation) in (list, dict) else value
+        return True
+
+    for field_name, field in model.model_fields.items():
+        annotation = field.annotation
+        if (
+            name.startswith(field_name + "_")
+            and isinstance(annotation, type)
+            and issubclass(annotation, BaseModel)
+        ):
+            nested = data.get(field_name)
+            if not isinstance(nested, dict):
+                nested = {}
+            if _set_env_value(annotation, nested, name[len(field_name) + 1 :], value):
+                data[field_name] = nested
+                return True
+    return False
+
+
+def _apply_env(model: type[BaseModel], data: dict[str, Any]) -> dict[str, Any]:
+    """Overlay NEXUS_* settings from .env and then the process environment."""
+    env = {**_read_env_file(ENV_FILE), **os.environ}
+    for key, value in env.items():
+        if key.upper().startswith(ENV_PREFIX):
+            _set_env_value(model, data, key[len(ENV_PREFIX) :].lower(), value)
+    return data
+
+
+def _construct_trusted(model: type[BaseModel], data: dict[str, Any]) -> Any:
+    """
+    Build a model from trusted data without validation.
+
+    model_construct() performs no coercion, so Path fields (stored as strings
+    by save()) and nested models are rebuilt here.
+    """
+    values = {}
+    for name, value in data.items():
+        field = model.model_fields.get(name)
+        if field is None:
+            continue
+        annotation = field.annotation
+        if annotation in (Path, Path | None) and value is not None:
+            value = Path(value)
+        elif isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            value = _construct_trusted(annotation, value)
+        values[name] = value
+    return model.model_construct(**values)
+
 
 class DriveConfig(BaseModel):
     """Configuration for a single drive."""
 
+    model_config = ConfigDict(defer_build=True)
+
     letter: str
     enabled: bool = True
     priority: int = 0  # Higher = process first
@@ -29,6 +107,8 @@ class DriveConfig(BaseModel):
 class IndexConfig(BaseModel):
     """Indexing configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     # Drives to index
     drives: list[str] = Field(default_factory=lambda: ["C", "D", "E", "F", "G"])
 
@@ -69,10 +149,22 @@ class IndexConfig(BaseModel):
         ]
     )
 
+    @functools.cached_property
+    def exclude_dirs_set(self) -> frozenset[str]:
+        """Lower-cased exclude_dirs for O(1) membership tests."""
+        return frozenset(d.lower() for d in self.exclude_dirs)
+
+    @functools.cached_property
+    def exclude_extensions_set(self) -> frozenset[str]:
+        """Lower-cased exclude_extensions for O(1) membership tests."""
+        return frozenset(e.lower() for e in self.exclude_extensions)
+
 
 class SearchConfig(BaseModel):
     """Search configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     # Performance
     max_results: int = 1000
     fuzzy_distance: int = 2
@@ -90,6 +182,8 @@ class SearchConfig(BaseModel):
 class SpaceConfig(BaseModel):
     """Space management configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     # Large file thresholds
     large_file_gb: float = 1.0
     huge_file_gb: float = 10.0
@@ -117,6 +211,8 @@ class SpaceConfig(BaseModel):
 class TransactionConfig(BaseModel):
     """Transaction and rollback configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     log_path: Path = DEFAULT_DATA_DIR / "transactions" / "transaction_log.jsonl"
     snapshot_dir: Path = DEFAULT_DATA_DIR / "transactions" / "snapshots"
     backup_dir: Path = DEFAULT_DATA_DIR / "backups"
@@ -132,9 +228,12 @@ class TransactionConfig(BaseModel):
     max_snapshots: int = 7
 
 
-class NexusConfig(BaseSettings):
+class NexusConfig(BaseModel):
     """Main NexusFS configuration."""
 
+    # Validators are built on first instantiation rather than at import time
+    model_config = ConfigDict(defer_build=True)
+
     # Paths
     data_dir: Path = DEFAULT_DATA_DIR
     config_dir: Path = DEFAULT_CONFIG_DIR
@@ -166,45 +265,70 @@ class NexusConfig(BaseSettings):
     log_rotation: str = "10 MB"
     log_retention: int = 5
 
-    class Config:
-        env_prefix = "NEXUS_"
-        env_file = ".env"
-
     @classmethod
     def load(cls, config_path: Path | None = None) -> "NexusConfig":
-        """Load configuration from file."""
+        """Load configuration from file, then apply NEXUS_* env overrides."""
         if config_path is None:
             config_path = DEFAULT_CONFIG_DIR / "default.toml"
 
+        data: dict[str, Any] = {}
         if config_path.exists():
-            data = toml.load(config_path)
-            return cls(**data)
+            with open(config_path, "rb") as f:
+                data = tomllib.load(f)
 
-        return cls()
+        return cls(**_apply_env(cls, data))
+
+    @classmethod
+    def load_trusted(cls, config_path: Path | None = None) -> "NexusConfig":
+        """
+        Load a configuration file written by save() without re-validating it.
+
+        Only use this for files NexusFS wrote itself; user-edited files must go
+        through load() so invalid values are rejected.
+        """
+        if config_path is None:
+            config_path = DEFAULT_CONFIG_DIR / "default.toml"
+
+        if not config_path.exists():
+            return cls()
+
+        with open(config_path, "rb") as f:
+            data = tomllib.load(f)
+
+        if "drives" in data:
+            data["drives"] = {
+                letter: DriveConfig.model_construct(**drive)
+                for letter, drive in data["drives"].items()
+            }
+        return _construct_trusted(cls, data)
 
     def save(self, config_path: Path | None = None) -> None:
         """Save configuration to file."""
         if config_path is None:
             config_path = DEFAULT_CONFIG_DIR / "default.toml"
 
+        import tomli_w  # Only needed for writing; reads use stdlib tomllib
+
         config_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(config_path, "w") as f:
-            toml.dump(self.model_dump(), f)
+        # TOML has no null and no Path type, so dump JSON-compatible values
+        with open(config_path, "wb") as f:
+            f.write(tomli_w.dumps(self.model_dump(mode="json", exclude_none=True)).encode())
 
 
-# Global config instance
-_config: NexusConfig | None = None
+# Explicit instance installed by set_config(); takes precedence over the file
+_config_override: NexusConfig | None = None
 
 
+@functools.cache
 def get_config() -> NexusConfig:
     """Get the global configuration instance."""
-    global _config
-    if _config is None:
-        _config = NexusConfig.load()
-    return _config
+    if _config_override is not None:
+        return _config_override
+    return NexusConfig.load()
 
 
 def set_config(config: NexusConfig) -> None:
     """Set the global configuration instance."""
-    global _config
-    _config = config
+    global _config_override
+    _config_override = config
+    get_config.cache_clear()
@@ -20,7 +20,10 @@ from nexus_ai.core.ai_providers import (
     AIProvider,
     AIProviderManager,
     AIResponse,
+    LLMCache,
     ProviderType,
+    ProviderUnavailable,
+    SemanticCache,
     get_ai_manager,
 )
 from nexus_ai.core.backup_system import (
@@ -54,6 +57,7 @@ from nexus_ai.core.logging_config import (
     add_realtime_callback,
     get_logger,
     log_async_function_call,
+    log_enabled,
     log_function_call,
     remove_realtime_callback,
     setup_logging,
@@ -70,13 +74,17 @@ __all__ = [
     "LogPerformance",
     "log_function_call",
     "log_async_function_call",
+    "log_enabled",
     # AI Providers
     "AIProviderManager",
     "AIProvider",
     "AIConfig",
     "AIMessage",
     "AIResponse",
+    "LLMCache",
+    "SemanticCache",
     "ProviderType",
+    "ProviderUnavailable",
     "get_ai_manager",
     # Agents
     "AgentOrchestrator",
@@ -14,16 +14,22 @@ Supports parallel agent execution and task queuing.
 from __future__ import annotations
 
 import asyncio
+import functools
+import itertools
+import os
 import queue
-import threading
-import uuid
+import re
+import secrets
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 from enum import Enum
-from pathlib import Path
 from typing import Any
 
+import msgspec
+import orjson
+
 from nexus_ai.core.ai_providers import (
     AIMessage,
     AIProviderManager,
@@ -34,6 +40,68 @@ from nexus_ai.core.logging_config import LogPerformance, get_logger
 
 logger = get_logger("agents")
 
+# LLMs frequently wrap JSON answers in a markdown code fence
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+
+def _parse_json_response(response: str) -> Any:
+    """Parse a JSON AI response, unwrapping a markdown code fence if present."""
+    if match := _JSON_FENCE_RE.search(response):
+        response = match.group(1)
+    return orjson.loads(response)
+
+
+def _batch_error(task: AgentTask, error: BaseException) -> dict[str, Any]:
+    """Result for one task of a batch whose own step failed; the others still run."""
+    logger.error(f"Task {task.id} failed in batch: {error}")
+    return {"error": str(error)}
+
+
+# Blocking filesystem scans; agents run these via asyncio.to_thread so a large
+# directory does not stall the orchestrator's event loop.
+def _scan_dir(path: str) -> list[dict[str, Any]]:
+    """List the regular files directly inside path with size and mtime."""
+    files: list[dict[str, Any]] = []
+    if not os.path.isdir(path):
+        return files
+
+    # scandir caches the stat result per entry
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            st = entry.stat()
+            files.append(
+                {
+                    "name": entry.name,
+                    "extension": os.path.splitext(entry.name)[1],
+                    "size": st.st_size,
+                    "modified": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                }
+            )
+    return files
+
+
+def _find_shortcuts(path: str) -> list[dict[str, Any]]:
+    """Recursively collect .lnk shortcuts under path."""
+    issues: list[dict[str, Any]] = []
+    if not os.path.isdir(path):
+        return issues
+
+    for dirpath, _dirnames, filenames in os.walk(path):
+        for name in filenames:
+            if not name.lower().endswith(".lnk"):
+                continue
+            # Would check if shortcut target exists
+            issues.append(
+                {
+                    "type": "shortcut",
+                    "path": os.path.join(dirpath, name),
+                    "status": "check_needed",
+                }
+            )
+    return issues
+
 
 class AgentStatus(Enum):
     """Agent execution status."""
@@ -69,27 +137,82 @@ class AgentType(Enum):
     ANALYTICS = "analytics"
 
 
-@dataclass
-class AgentTask:
+# Wall-clock/monotonic pair captured once so task timestamps can be stored
+# as monotonic nanoseconds and only turned into datetimes when displayed
+_EPOCH_WALL = datetime.now()
+_EPOCH_MONOTONIC_NS = time.monotonic_ns()
+
+
+def _monotonic_to_iso(ns: int | None) -> str | None:
+    """Convert a time.monotonic_ns() reading to an ISO timestamp."""
+    if ns is None:
+        return None
+    return (_EPOCH_WALL + timedelta(microseconds=(ns - _EPOCH_MONOTONIC_NS) // 1000)).isoformat()
+
+
+@functools.cache
+def _get_space_analyzer() -> type:
+    """Import SpaceAnalyzer on first use; only CleanupAgent needs it."""
+    from nexus_ai.tools.space_analyzer import SpaceAnalyzer
+
+    return SpaceAnalyzer
+
+
+class AgentTask(msgspec.Struct, kw_only=True):
     """A task to be executed by an agent."""
 
-    id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = msgspec.field(default_factory=lambda: secrets.token_hex(4))
     type: AgentType = AgentType.ORGANIZER
     description: str = ""
-    parameters: dict[str, Any] = field(default_factory=dict)
+    parameters: dict[str, Any] = msgspec.field(default_factory=dict)
     priority: TaskPriority = TaskPriority.NORMAL
-    created_at: datetime = field(default_factory=datetime.now)
-    started_at: datetime | None = None
-    completed_at: datetime | None = None
+    created_at: datetime = msgspec.field(default_factory=datetime.now)
+    # time.monotonic_ns() readings; see started_at_iso/completed_at_iso
+    started_at: int | None = None
+    completed_at: int | None = None
     status: AgentStatus = AgentStatus.IDLE
     result: dict[str, Any] | None = None
     error: str | None = None
     parent_task_id: str | None = None
-    subtasks: list[str] = field(default_factory=list)
+    subtasks: list[str] = msgspec.field(default_factory=list)
 
+    @property
+    def started_at_iso(self) -> str | None:
+        """Wall-clock start time as an ISO string."""
+        return _monotonic_to_iso(self.started_at)
+
+    @property
+    def completed_at_iso(self) -> str | None:
+        """Wall-clock completion time as an ISO string."""
+        return _monotonic_to_iso(self.completed_at)
 
-@dataclass
-class AgentConfig:
+    @property
+    def duration_ms(self) -> float | None:
+        """Time between start and completion in milliseconds."""
+        if self.started_at is None or self.completed_at is None:
+            return None
+        return (self.completed_at - self.started_at) / 1_000_000
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON-compatible dict."""
+        return msgspec.to_builtins(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> AgentTask:
+        """Deserialize from a dict produced by to_dict()."""
+        return msgspec.convert(data, cls)
+
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes."""
+        return _json_encoder.encode(self)
+
+    @classmethod
+    def from_json(cls, data: bytes) -> AgentTask:
+        """Deserialize from JSON bytes."""
+        return _task_decoder.decode(data)
+
+
+class AgentConfig(msgspec.Struct, kw_only=True):
     """Configuration for an agent."""
 
     type: AgentType
@@ -99,71 +222,122 @@ class AgentConfig:
     auto_run: bool = False
     run_interval_seconds: int = 300
     max_concurrent_tasks: int = 5
+    history_size: int = 1000
     ai_provider: ProviderType | None = None
     ai_model: str | None = None
-    parameters: dict[str, Any] = field(default_factory=dict)
+    parameters: dict[str, Any] = msgspec.field(default_factory=dict)
+
+
+_json_encoder = msgspec.json.Encoder()
+_task_decoder = msgspec.json.Decoder(AgentTask)
 
 
 class Agent(ABC):
     """Abstract base class for all agents."""
 
+    # Most queued tasks of one type the orchestrator hands to execute_batch()
+    BATCH_SIZE = 1
+
+    # Built from SYSTEM_PROMPT once per subclass; see __init_subclass__
+    SYSTEM_MESSAGE: AIMessage | None = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "SYSTEM_PROMPT" in cls.__dict__:
+            cls.SYSTEM_MESSAGE = AIMessage(role="system", content=cls.SYSTEM_PROMPT)
+
     def __init__(self, config: AgentConfig, ai_manager: AIProviderManager | None = None):
         self.config = config
         self.ai_manager = ai_manager or get_ai_manager()
         self._status = AgentStatus.IDLE
         self._current_task: AgentTask | None = None
-        self._task_history: list[AgentTask] = []
-        self._lock = threading.Lock()
+        self._task_history: deque[AgentTask] = deque(maxlen=config.history_size)
+        self._tasks_completed = 0
+        self._lock = asyncio.Lock()
 
     @property
     def status(self) -> AgentStatus:
         return self._status
 
+    def get_task_history(self) -> list[dict[str, Any]]:
+        """Get completed tasks as serialized dicts."""
+        # Agents run on the event loop thread, so the history cannot change
+        # while this synchronous method is copying it
+        return [task.to_dict() for task in list(self._task_history)]
+
     @abstractmethod
     async def execute(self, task: AgentTask) -> dict[str, Any]:
         """Execute a task. Must be implemented by subclasses."""
         pass
 
+    async def execute_batch(self, tasks: list[AgentTask]) -> list[dict[str, Any]]:
+        """Execute several same-type tasks. Defaults to one execute() per task."""
+        return [await self.execute(task) for task in tasks]
+
     async def run_task(self, task: AgentTask) -> AgentTask:
         """Run a task with full lifecycle management."""
-        with self._lock:
-            self._current_task = task
-            self._status = AgentStatus.RUNNING
-            task.status = AgentStatus.RUNNING
-            task.started_at = datetime.now()
+        return (await self.run_batch([task]))[0]
 
-        logger.info(f"Agent {self.config.name} starting task {task.id}", task_type=task.type.value)
+    async def run_batch(self, tasks: list[AgentTask]) -> list[AgentTask]:
+        """Run same-type tasks with full lifecycle management via execute_batch()."""
+        async with self._lock:
+            self._current_task = tasks[0]
+            self._status = AgentStatus.RUNNING
+            started_at = time.monotonic_ns()
+            for task in tasks:
+                task.status = AgentStatus.RUNNING
+                task.started_at = started_at
+
+        task_ids = ", ".join(task.id for task in tasks)
+        logger.info(
+            f"Agent {self.config.name} starting task {task_ids}", task_type=tasks[0].type.value
+        )
 
         try:
-            with LogPerformance(f"Agent task {task.id}"):
-                result = await self.execute(task)
-                task.result = result
-                task.status = AgentStatus.COMPLETED
+            with LogPerformance(f"Agent task {task_ids}"):
+                if len(tasks) == 1:
+                    results = [await self.execute(tasks[0])]
+                else:
+                    results = await self.execute_batch(tasks)
+                for task, result in zip(tasks, results, strict=True):
+                    task.result = result
+                    task.status = AgentStatus.COMPLETED
 
         except asyncio.CancelledError:
-            task.status = AgentStatus.CANCELLED
-            task.error = "Task was cancelled"
-            logger.warning(f"Task {task.id} cancelled")
+            for task in tasks:
+                task.status = AgentStatus.CANCELLED
+                task.error = "Task was cancelled"
+            logger.warning(f"Task {task_ids} cancelled")
 
         except Exception as e:
-            task.status = AgentStatus.FAILED
-            task.error = str(e)
-            logger.exception(f"Task {task.id} failed: {e}")
+            for task in tasks:
+                task.status = AgentStatus.FAILED
+                task.error = str(e)
+            logger.exception(f"Task {task_ids} failed: {e}")
 
         finally:
-            task.completed_at = datetime.now()
-            with self._lock:
+            completed_at = time.monotonic_ns()
+            async with self._lock:
+                for task in tasks:
+                    task.completed_at = completed_at
+                    self._task_history.append(task)
+                self._tasks_completed += len(tasks)
                 self._status = AgentStatus.IDLE
                 self._current_task = None
-                self._task_history.append(task)
 
-        return task
+        return tasks
 
     async def ai_chat(self, prompt: str, system_prompt: str | None = None) -> str:
-        """Send a prompt to the configured AI provider."""
+        """
+        Send a prompt to the configured AI provider.
+
+        Uses the class SYSTEM_PROMPT unless a different system_prompt is given.
+        """
         messages = []
         if system_prompt:
             messages.append(AIMessage(role="system", content=system_prompt))
+        elif self.SYSTEM_MESSAGE is not None:
+            messages.append(self.SYSTEM_MESSAGE)
         messages.append(AIMessage(role="user", content=prompt))
 
         response = await self.ai_manager.chat(
@@ -194,54 +368,96 @@ Output format: JSON with structure:
     "summary": "brief summary"
 }"""
 
-    async def execute(self, task: AgentTask) -> dict[str, Any]:
+    BATCH_SIZE = 8
+
+    async def _scan(self, task: AgentTask) -> dict[str, Any]:
+        """Collect the task parameters and the files to organize."""
         path = task.parameters.get("path", ".")
-        strategy = task.parameters.get("strategy", "semantic")
-        dry_run = task.parameters.get("dry_run", True)
+        return {
+            "path": path,
+            "strategy": task.parameters.get("strategy", "semantic"),
+            "dry_run": task.parameters.get("dry_run", True),
+            "files": await asyncio.to_thread(_scan_dir, path),
+        }
 
+    @staticmethod
+    def _result(scan: dict[str, Any], suggestions: Any) -> dict[str, Any]:
+        return {
+            "path": scan["path"],
+            "strategy": scan["strategy"],
+            "dry_run": scan["dry_run"],
+            "file_count": len(scan["files"]),
+            "suggestions": suggestions,
+        }
+
+    async def execute(self, task: AgentTask) -> dict[str, Any]:
         # Analyze files
-        files = []
-        if Path(path).is_dir():
-            for f in Path(path).iterdir():
-                if f.is_file():
-                    files.append(
-                        {
-                            "name": f.name,
-                            "extension": f.suffix,
-                            "size": f.stat().st_size,
-                            "modified": datetime.fromtimestamp(f.stat().st_mtime).isoformat(),
-                        }
-                    )
-
-        if not files:
+        scan = await self._scan(task)
+
+        if not scan["files"]:
             return {"suggestions": [], "message": "No files to organize"}
 
         # Ask AI for organization suggestions
         prompt = f"""Analyze these files and suggest organization:
 
-Path: {path}
-Strategy: {strategy}
-Files: {files[:50]}  # Limit for context
+Path: {scan["path"]}
+Strategy: {scan["strategy"]}
+Files: {orjson.dumps(scan["files"][:50]).decode()}  # Limit for context
 
 Provide JSON organization suggestions."""
 
-        response = await self.ai_chat(prompt, self.SYSTEM_PROMPT)
+        response = await self.ai_chat(prompt)
 
         # Parse response
         try:
-            import json
-
-            suggestions = json.loads(response)
-        except json.JSONDecodeError:
+            suggestions = _parse_json_response(response)
+        except orjson.JSONDecodeError:
             suggestions = {"suggestions": [], "raw_response": response}
 
-        return {
-            "path": path,
-            "strategy": strategy,
-            "dry_run": dry_run,
-            "file_count": len(files),
-            "suggestions": suggestions,
-        }
+        return self._result(scan, suggestions)
+
+    async def execute_batch(self, tasks: list[AgentTask]) -> list[dict[str, Any]]:
+        scans = await asyncio.gather(*(self._scan(task) for task in tasks), return_exceptions=True)
+        results: list[dict[str, Any]] = [
+            _batch_error(task, scan)
+            if isinstance(scan, BaseException)
+            else {"suggestions": [], "message": "No files to organize"}
+            for task, scan in zip(tasks, scans)
+        ]
+        pending = [
+            i
+            for i, scan in enumerate(scans)
+            if not isinstance(scan, BaseException) and scan["files"]
+        ]
+        if not pending:
+            return results
+
+        # One prompt covering every directory; the AI answers with an array
+        sections = "\n\n".join(
+            f"""[{n}]
+Path: {scans[i]["path"]}
+Strategy: {scans[i]["strategy"]}
+Files: {orjson.dumps(scans[i]["files"][:50]).decode()}"""
+            for n, i in enumerate(pending)
+        )
+        prompt = f"""Analyze each of these directories and suggest organization:
+
+{sections}
+
+Provide a JSON array with one organization object per directory, in the same order."""
+
+        response = await self.ai_chat(prompt)
+
+        try:
+            batch = _parse_json_response(response)
+        except orjson.JSONDecodeError:
+            batch = None
+        if not isinstance(batch, list) or len(batch) != len(pending):
+            batch = [{"suggestions": [], "raw_response": response} for _ in pending]
+
+        for i, suggestions in zip(pending, batch):
+            results[i] = self._result(scans[i], suggestions)
+        return results
 
 
 class CleanupAgent(Agent):
@@ -270,17 +486,16 @@ Output format: JSON with structure:
     "warnings": ["any concerns"]
 }"""
 
-    async def execute(self, task: AgentTask) -> dict[str, Any]:
-        path = task.parameters.get("path", "C:\\")
-        min_age_days = task.parameters.get("min_age_days", 30)
-        categories = task.parameters.get("categories", ["temp", "cache", "logs"])
+    BATCH_SIZE = 8
 
-        from nexus_ai.tools.space_analyzer import SpaceAnalyzer
-
-        analyzer = SpaceAnalyzer()
+    async def _find_candidates(self, task: AgentTask) -> list[dict[str, Any]]:
+        """Collect temp and cache files under the task path."""
+        analyzer = _get_space_analyzer()()
 
         # Find candidates
-        analysis = analyzer.analyze_path(path)
+        analysis = await asyncio.to_thread(
+            analyzer.analyze_path, task.parameters.get("path", "C:\\")
+        )
 
         candidates = []
         for f in analysis.temp_files[:100]:
@@ -303,6 +518,14 @@ Output format: JSON with structure:
                 }
             )
 
+        return candidates
+
+    async def execute(self, task: AgentTask) -> dict[str, Any]:
+        min_age_days = task.parameters.get("min_age_days", 30)
+        categories = task.parameters.get("categories", ["temp", "cache", "logs"])
+
+        candidates = await self._find_candidates(task)
+
         if not candidates:
             return {"deletable": [], "total_size": 0, "message": "No cleanup candidates found"}
 
@@ -310,21 +533,64 @@ Output format: JSON with structure:
 
 Minimum age: {min_age_days} days
 Categories: {categories}
-Candidates: {candidates[:50]}
+Candidates: {orjson.dumps(candidates[:50]).decode()}
 
 Identify which are safe to delete."""
 
-        response = await self.ai_chat(prompt, self.SYSTEM_PROMPT)
+        response = await self.ai_chat(prompt)
 
         try:
-            import json
-
-            result = json.loads(response)
-        except json.JSONDecodeError:
+            result = _parse_json_response(response)
+        except orjson.JSONDecodeError:
             result = {"deletable": [], "raw_response": response}
 
         return result
 
+    async def execute_batch(self, tasks: list[AgentTask]) -> list[dict[str, Any]]:
+        all_candidates = await asyncio.gather(
+            *(self._find_candidates(task) for task in tasks), return_exceptions=True
+        )
+        results: list[dict[str, Any]] = [
+            _batch_error(task, candidates)
+            if isinstance(candidates, BaseException)
+            else {"deletable": [], "total_size": 0, "message": "No cleanup candidates found"}
+            for task, candidates in zip(tasks, all_candidates)
+        ]
+        pending = [
+            i
+            for i, candidates in enumerate(all_candidates)
+            if not isinstance(candidates, BaseException) and candidates
+        ]
+        if not pending:
+            return results
+
+        # One prompt covering every candidate set; the AI answers with an array
+        sections = "\n\n".join(
+            f"""[{n}]
+Minimum age: {tasks[i].parameters.get("min_age_days", 30)} days
+Categories: {tasks[i].parameters.get("categories", ["temp", "cache", "logs"])}
+Candidates: {orjson.dumps(all_candidates[i][:50]).decode()}"""
+            for n, i in enumerate(pending)
+        )
+        prompt = f"""Analyze each of these candidate sets for safe deletion:
+
+{sections}
+
+Provide a JSON array with one result object per candidate set, in the same order."""
+
+        response = await self.ai_chat(prompt)
+
+        try:
+            batch = _parse_json_response(response)
+        except orjson.JSONDecodeError:
+            batch = None
+        if not isinstance(batch, list) or len(batch) != len(pending):
+            batch = [{"deletable": [], "raw_response": response} for _ in pending]
+
+        for i, result in zip(pending, batch):
+            results[i] = result
+        return results
+
 
 class ResearchAgent(Agent):
     """Agent for researching files and gathering context."""
@@ -352,7 +618,7 @@ Context: {context}
 
 Provide detailed analysis and recommendations."""
 
-        response = await self.ai_chat(prompt, self.SYSTEM_PROMPT)
+        response = await self.ai_chat(prompt)
 
         return {
             "query": query,
@@ -379,19 +645,8 @@ Always preserve original files before any repair attempt."""
         path = task.parameters.get("path", ".")
         repair_type = task.parameters.get("repair_type", "all")
 
-        issues = []
-
         # Check for broken shortcuts
-        if Path(path).is_dir():
-            for f in Path(path).rglob("*.lnk"):
-                # Would check if shortcut target exists
-                issues.append(
-                    {
-                        "type": "shortcut",
-                        "path": str(f),
-                        "status": "check_needed",
-                    }
-                )
+        issues = await asyncio.to_thread(_find_shortcuts, path)
 
         return {
             "path": path,
@@ -476,13 +731,11 @@ Output JSON with:
 - size_range: if mentioned
 - paths: specific paths mentioned"""
 
-        response = await self.ai_chat(prompt, self.SYSTEM_PROMPT)
+        response = await self.ai_chat(prompt)
 
         try:
-            import json
-
-            parsed = json.loads(response)
-        except json.JSONDecodeError:
+            parsed = _parse_json_response(response)
+        except orjson.JSONDecodeError:
             parsed = {"keywords": [query]}
 
         return {
@@ -492,6 +745,22 @@ Output JSON with:
         }
 
 
+# Most queue entries one AgentOrchestrator._take_batch() call looks at, so a backlog
+# of other task types is not drained and requeued for every batch
+_BATCH_LOOKAHEAD = 64
+
+
+# Agent implementation per type; add entries here to plug in custom agents
+_AGENT_CLASSES: dict[AgentType, type[Agent]] = {
+    AgentType.ORGANIZER: OrganizerAgent,
+    AgentType.CLEANUP: CleanupAgent,
+    AgentType.RESEARCH: ResearchAgent,
+    AgentType.REPAIR: RepairAgent,
+    AgentType.MONITOR: MonitorAgent,
+    AgentType.SEARCH: SearchAgent,
+}
+
+
 class AgentOrchestrator:
     """
     Orchestrates multiple agents for automated file management.
@@ -507,6 +776,7 @@ class AgentOrchestrator:
         self.ai_manager = ai_manager or get_ai_manager()
         self._agents: dict[AgentType, Agent] = {}
         self._task_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
         self._running = False
         self._workers: list[asyncio.Task] = []
         self._max_workers = 5
@@ -520,16 +790,7 @@ class AgentOrchestrator:
                 description=f"Default {agent_type.value} agent",
             )
 
-        agent_classes = {
-            AgentType.ORGANIZER: OrganizerAgent,
-            AgentType.CLEANUP: CleanupAgent,
-            AgentType.RESEARCH: ResearchAgent,
-            AgentType.REPAIR: RepairAgent,
-            AgentType.MONITOR: MonitorAgent,
-            AgentType.SEARCH: SearchAgent,
-        }
-
-        agent_class = agent_classes.get(agent_type)
+        agent_class = _AGENT_CLASSES.get(agent_type)
         if agent_class:
             self._agents[agent_type] = agent_class(config, self.ai_manager)
             logger.info(f"Registered agent: {agent_type.value}")
@@ -542,9 +803,11 @@ class AgentOrchestrator:
 
     async def submit_task(self, task: AgentTask) -> str:
         """Submit a task to the queue."""
-        # Priority queue uses (priority, task) tuples
-        # Negative priority so higher priority = processed first
-        await self._task_queue.put((-task.priority.value, task))
+        # Priority queue uses (priority, sequence, task) tuples
+        # Negative priority so higher priority = processed first; the
+        # sequence keeps FIFO order within a priority and means tasks
+        # themselves are never compared
+        await self._task_queue.put((-task.priority.value, next(self._sequence), task))
         logger.info(f"Task {task.id} submitted", type=task.type.value, priority=task.priority.value)
         return task.id
 
@@ -552,23 +815,25 @@ class AgentOrchestrator:
         """Worker coroutine that processes tasks from the queue."""
         logger.debug(f"Worker {worker_id} started")
 
+        # Workers block on the queue until stop() cancels them. run_task()
+        # absorbs a cancellation that lands mid-task, so _running is
+        # re-checked before waiting again.
         while self._running:
             try:
-                # Get task with timeout to allow checking _running flag
-                try:
-                    _, task = await asyncio.wait_for(self._task_queue.get(), timeout=1.0)
-                except TimeoutError:
-                    continue
+                *_, task = await self._task_queue.get()
 
                 agent = self._agents.get(task.type)
                 if agent is None:
                     logger.error(f"No agent registered for type: {task.type.value}")
                     task.status = AgentStatus.FAILED
                     task.error = f"No agent for type: {task.type.value}"
+                    self._task_queue.task_done()
                     continue
 
-                await agent.run_task(task)
-                self._task_queue.task_done()
+                batch = self._take_batch(task, agent.BATCH_SIZE)
+                await agent.run_batch(batch)
+                for _ in batch:
+                    self._task_queue.task_done()
 
             except asyncio.CancelledError:
                 break
@@ -577,6 +842,41 @@ class AgentOrchestrator:
 
         logger.debug(f"Worker {worker_id} stopped")
 
+    def _take_batch(self, first: AgentTask, limit: int) -> list[AgentTask]:
+        """
+        Pull up to limit - 1 more ready tasks of first's type without waiting.
+
+        Tasks of other types are stepped over and requeued, but only within
+        their priority: once one is deferred, a lower-priority task of
+        first's type ends the batch rather than jumping it. At most
+        _BATCH_LOOKAHEAD entries are looked at per call.
+        """
+        batch = [first]
+        deferred = []
+        for _ in range(_BATCH_LOOKAHEAD):
+            if len(batch) >= limit:
+                break
+            try:
+                entry = self._task_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            # entry[0] is the negated priority; the queue yields it in ascending order
+            if deferred and entry[0] > deferred[0][0]:
+                deferred.append(entry)
+                break
+            if entry[-1].type is first.type:
+                batch.append(entry[-1])
+            else:
+                deferred.append(entry)
+
+        # Entries keep their original sequence number, so requeueing
+        # preserves their place in line
+        for entry in deferred:
+            self._task_queue.put_nowait(entry)
+            self._task_queue.task_done()
+
+        return batch
+
     async def start(self, num_workers: int = 5) -> None:
         """Start the orchestrator with worker pool."""
         if self._running:
@@ -629,24 +929,19 @@ class AgentOrchestrator:
             "agents": {
                 t.value: {
                     "status": a.status.value,
-                    "tasks_completed": len(a._task_history),
+                    "tasks_completed": a._tasks_completed,
                 }
                 for t, a in self._agents.items()
             },
         }
 
 
-# Global orchestrator instance
-_orchestrator: AgentOrchestrator | None = None
-
-
+@functools.cache
 def get_orchestrator() -> AgentOrchestrator:
     """Get the global agent orchestrator."""
-    global _orchestrator
-    if _orchestrator is None:
-        _orchestrator = AgentOrchestrator()
-        _orchestrator.register_all_agents()
-    return _orchestrator
+    orchestrator = AgentOrchestrator()
+    orchestrator.register_all_agents()
+    return orchestrator
 
 
 async def quick_task(
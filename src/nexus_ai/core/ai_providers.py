@@ -13,20 +13,69 @@ Supports GPU acceleration with RTX 3090 Ti.
 
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
+import hashlib
 import os
+import random
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Any, Literal
 
 import httpx
+import orjson
 
 from nexus_ai.core.logging_config import get_logger, log_async_function_call
 
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import ijson
+
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import httpxr
+
+    HTTPXR_AVAILABLE = True
+except ImportError:
+    HTTPXR_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
 logger = get_logger("ai_providers")
 
+# Request bodies are pre-encoded with orjson, so the type is set explicitly
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_MSGPACK_HEADERS = {"Content-Type": "application/msgpack", "Accept": "application/msgpack"}
+
+# Connection pool shared by every request to one base URL
+_POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=50,
+    keepalive_expiry=30.0,
+)
+
 
 class ProviderType(Enum):
     """Supported AI providers."""
@@ -78,6 +127,507 @@ class AIConfig:
     gpu_memory_fraction: float = 0.9
     # Batch settings
     batch_size: int = 1
+    # Most in-flight requests to this provider at once
+    max_concurrency: int = 32
+    # Retries for transport errors, 429 and 5xx (exponential backoff + jitter)
+    max_retries: int = 3
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 30.0
+    # Circuit breaker: open after this many consecutive failed requests
+    breaker_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+    # Serve near-duplicate prompts from SemanticCache (needs sentence-transformers)
+    semantic_cache: bool = False
+    # "httpxr" swaps in the Rust-backed drop-in client when it is installed
+    http_backend: Literal["httpx", "httpxr"] = "httpx"
+    # Opt-in: byte-stable request bodies so provider-side prefix/KV caches hit
+    # on shared system prompts. For Anthropic it also marks the system prompt
+    # with cache_control, which bills cache writes at a higher input rate, so
+    # only enable it where the same system prompt is reused within minutes.
+    enable_prefix_cache: bool = False
+    # "msgpack" for Ollama behind a msgpack<->JSON shim (see OllamaProvider)
+    wire_format: Literal["json", "msgpack"] = "json"
+
+
+_role_content = attrgetter("role", "content")
+
+
+def _to_wire(messages: list[AIMessage]) -> list[dict[str, str]]:
+    """Convert messages to the role/content dicts chat APIs expect."""
+    return [{"role": r, "content": c} for r, c in map(_role_content, messages)]
+
+
+def _split_system(messages: list[AIMessage]) -> tuple[str, list[dict[str, str]]]:
+    """Separate the (last) system message from the rest in one pass."""
+    system = ""
+    wire = []
+    append = wire.append
+    for role, content in map(_role_content, messages):
+        if role == "system":
+            system = content
+        else:
+            append({"role": role, "content": content})
+    return system, wire
+
+
+class LLMCache:
+    """
+    In-memory LRU cache of AI responses with a time-to-live.
+
+    Keys are hashes of everything that determines a response, so only
+    deterministic requests (temperature 0, or an explicit cache=True)
+    should be stored.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, AIResponse]] = OrderedDict()
+
+    @staticmethod
+    def make_key(
+        provider_type: ProviderType,
+        messages: list[AIMessage],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        options: dict[str, Any] | None = None,
+    ) -> str:
+        """Hash the request fields that determine a response."""
+        request = {
+            "provider": provider_type.value,
+            "model": model,
+            "messages": _to_wire(messages),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "options": options or {},
+        }
+        encoded = orjson.dumps(request, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> AIResponse | None:
+        """Return a live cached response, or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return response
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, response: AIResponse) -> None:
+        """Store a response, evicting the least recently used beyond max_entries."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@functools.cache
+def _best_match_kernel() -> Any:
+    """
+    Numba-compiled masked cosine argmax, or None without numba.
+
+    Rows are normalized, so the dot product is the cosine similarity. Rows
+    are scored in parallel with SIMD; the argmax is a cheap serial pass.
+    """
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return None
+    import numpy as np
+
+    @njit(cache=True, parallel=True, fastmath=True)
+    def best_match(mat, namespaces, ns_id, query, size):
+        sims = np.empty(size, dtype=np.float32)
+        for i in prange(size):
+            if namespaces[i] == ns_id:
+                acc = np.float32(0.0)
+                for j in range(query.shape[0]):
+                    acc += mat[i, j] * query[j]
+                sims[i] = acc
+            else:
+                sims[i] = -1.0
+        best = 0
+        for i in range(1, size):
+            if sims[i] > sims[best]:
+                best = i
+        return best, sims[best]
+
+    return best_match
+
+
+class SemanticCache:
+    """
+    Cache that matches paraphrased prompts by embedding similarity.
+
+    The last user message is embedded with a local sentence-transformers
+    model; a cached response is returned when its prompt has cosine
+    similarity >= threshold within the same namespace (provider, model,
+    settings and earlier messages). Embeddings live in a preallocated ring
+    buffer, so the oldest entries are overwritten once max_entries is hit; a
+    namespace is forgotten when its last entry is overwritten.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        threshold: float = 0.95,
+        max_entries: int = 10_000,
+    ):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._model: Any = None
+        self._unavailable = False
+        self._model_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._embeddings: Any = None  # (max_entries, dim) float32, rows normalized
+        self._namespaces: Any = None  # (max_entries,) int64 namespace ids
+        self._namespace_ids: dict[str, int] = {}
+        self._namespace_counts: dict[str, int] = {}  # live entries per namespace
+        self._next_namespace_id = 0
+        self._slot_namespaces: list[str | None] = [None] * max_entries
+        self._responses: list[AIResponse | None] = [None] * max_entries
+        self._size = 0
+        self._next = 0
+
+    def _encode(self, text: str) -> Any:
+        """Embed text as a normalized float32 vector, or None if unavailable."""
+        if self._unavailable:
+            return None
+        if self._model is None:
+            with self._model_lock:
+                # Concurrent first calls would each load a copy of the model
+                if self._unavailable:
+                    return None
+                if self._model is None:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                    except ImportError:
+                        logger.warning(
+                            "sentence-transformers not installed, semantic cache disabled"
+                        )
+                        self._unavailable = True
+                        return None
+                    self._model = SentenceTransformer(self.model_name, device="cpu")
+        return self._model.encode(text, normalize_embeddings=True, convert_to_numpy=True)
+
+    def lookup(self, text: str, namespace: str) -> AIResponse | None:
+        """Return the closest cached response above the threshold. Blocking."""
+        with self._lock:
+            ns_id = self._namespace_ids.get(namespace)
+            empty = self._size == 0 or ns_id is None
+        if empty:
+            self.misses += 1
+            return None
+
+        query = self._encode(text)
+        if query is None:
+            self.misses += 1
+            return None
+
+        kernel = _best_match_kernel()
+        with self._lock:
+            if kernel is not None:
+                idx, sim = kernel(self._embeddings, self._namespaces, ns_id, query, self._size)
+            else:
+                # One GEMV over the live rows; other namespaces are masked out
+                sims = self._embeddings[: self._size] @ query
+                sims[self._namespaces[: self._size] != ns_id] = -1.0
+                idx = int(sims.argmax())
+                sim = sims[idx]
+            if sim >= self.threshold:
+                self.hits += 1
+                return self._responses[idx]
+
+        self.misses += 1
+        return None
+
+    def add(self, text: str, namespace: str, response: AIResponse) -> None:
+        """Store a response under the embedding of text. Blocking."""
+        vector = self._encode(text)
+        if vector is None:
+            return
+
+        import numpy as np
+
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._namespaces = np.full(self.max_entries, -1, dtype=np.int64)
+                self._warm_kernel(vector.shape[0])
+            slot = self._next
+            if (evicted := self._slot_namespaces[slot]) is not None:
+                self._release_namespace(evicted)
+            ns_id = self._namespace_ids.get(namespace)
+            if ns_id is None:
+                ns_id = self._namespace_ids[namespace] = self._next_namespace_id
+                self._next_namespace_id += 1
+            self._namespace_counts[namespace] = self._namespace_counts.get(namespace, 0) + 1
+            self._embeddings[slot] = vector
+            self._namespaces[slot] = ns_id
+            self._slot_namespaces[slot] = namespace
+            self._responses[slot] = response
+            self._next = (slot + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def _release_namespace(self, namespace: str) -> None:
+        """Count one entry of namespace as evicted; forget it with its last entry."""
+        count = self._namespace_counts[namespace] - 1
+        if count:
+            self._namespace_counts[namespace] = count
+        else:
+            del self._namespace_counts[namespace]
+            del self._namespace_ids[namespace]
+
+    @staticmethod
+    def _warm_kernel(dim: int) -> None:
+        """JIT-compile the search kernel now, so the first lookup doesn't pay for it."""
+        if (kernel := _best_match_kernel()) is not None:
+            import numpy as np
+
+            kernel(
+                np.zeros((8, dim), dtype=np.float32),
+                np.zeros(8, dtype=np.int64),
+                0,
+                np.zeros(dim, dtype=np.float32),
+                8,
+            )
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._namespace_ids.clear()
+            self._namespace_counts.clear()
+            self._slot_namespaces = [None] * self.max_entries
+            self._responses = [None] * self.max_entries
+            self._size = 0
+            self._next = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def _last_user_message(messages: list[AIMessage]) -> str | None:
+    """Content of the most recent user message."""
+    for m in reversed(messages):
+        if m.role == "user":
+            return m.content
+    return None
+
+
+_SSE_PREFIX = b"data: "
+_SSE_DONE = b"[DONE]"
+
+
+async def _iter_lines(response: httpx.Response) -> AsyncIterator[bytes]:
+    """Split a streamed body into raw lines without decoding to str."""
+    pending = b""
+    async for chunk in response.aiter_bytes():
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.removesuffix(b"\r")
+    if pending:
+        yield pending.removesuffix(b"\r")
+
+
+async def _iter_sse_payloads(response: httpx.Response) -> AsyncIterator[bytes]:
+    """Yield the raw payload of each SSE ``data:`` line until ``[DONE]``."""
+    async for line in _iter_lines(response):
+        if line.startswith(_SSE_PREFIX):
+            data = line[6:]
+            if data == _SSE_DONE:
+                return
+            yield data
+
+
+async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[Any]:
+    """Yield the decoded JSON of each SSE ``data:`` line until ``[DONE]``."""
+    async for data in _iter_sse_payloads(response):
+        yield orjson.loads(data)
+
+
+def _raw_json_string(line: bytes, marker: bytes) -> bytes | None:
+    """
+    Slice the JSON string value following ``marker`` straight out of ``line``.
+
+    The slice is already UTF-8, so no decode/encode is needed. Returns None
+    when the marker is missing or the value contains escapes; callers then
+    fall back to a full parse.
+    """
+    start = line.find(marker)
+    if start < 0:
+        return None
+    start += len(marker)
+    end = line.find(b'"', start)
+    if end < 0:
+        return None
+    value = line[start:end]
+    return None if b"\\" in value else value
+
+
+async def _iter_delta_bytes(response: httpx.Response) -> AsyncIterator[bytes]:
+    """Content deltas of an OpenAI-style chat stream, as UTF-8 bytes."""
+    async for data in _iter_sse_payloads(response):
+        content = _raw_json_string(data, b'"content":"')
+        if content is None:
+            content = (orjson.loads(data)["choices"][0]["delta"].get("content") or "").encode()
+        if content:
+            yield content
+
+
+class ProviderUnavailable(Exception):
+    """Raised while a provider's circuit breaker is open."""
+
+
+class CircuitState(Enum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing provider until a probe request succeeds.
+
+    Opens after ``threshold`` consecutive failures within ``window_seconds``;
+    after ``reset_seconds`` one probe is let through (half-open) and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self, threshold: int = 5, reset_seconds: float = 30.0, window_seconds: float = 60.0
+    ):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.window_seconds = window_seconds
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._first_failure_at = 0.0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        if self.state is CircuitState.CLOSED:
+            return True
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probing = False
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def release_probe(self) -> None:
+        """Let another probe through if the current one ended without an outcome."""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        if self.state is CircuitState.HALF_OPEN:
+            self._trip(now)
+            return
+        if self._failures == 0 or now - self._first_failure_at > self.window_seconds:
+            self._failures = 0
+            self._first_failure_at = now
+        self._failures += 1
+        if self._failures >= self.threshold:
+            self._trip(now)
+
+    def _trip(self, now: float) -> None:
+        self.state = CircuitState.OPEN
+        self._opened_at = now
+        self._failures = 0
+        self._probing = False
+
+
+# Status codes worth retrying: rate limiting and server-side errors
+_RETRY_STATUS = frozenset({429, *range(500, 600)})
+
+
+# Bodies smaller than this are read whole; ijson's setup cost isn't worth it
+_STREAM_JSON_MIN_BYTES = 4096
+_SCALAR_EVENTS = frozenset({"string", "number", "boolean", "null"})
+
+
+def _lookup(data: Any, path: str) -> Any:
+    """Resolve an ijson-style path, taking "item" as the first array element."""
+    for key in path.split("."):
+        data = data[0] if key == "item" else data[key]
+    return data
+
+
+def _select_fields(data: Any, fields: dict[str, str]) -> dict[str, Any]:
+    """Resolve each of ``fields`` in a decoded document, leaving out missing ones."""
+    found = {}
+    for name, path in fields.items():
+        try:
+            found[name] = _lookup(data, path)
+        except (KeyError, IndexError, TypeError):
+            pass
+    return found
+
+
+class _ByteReader:
+    """Async file-like adapter so ijson can read a streamed httpx body."""
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:  # ijson probes the return type with read(0)
+            return b""
+        return await anext(self._chunks, b"")
+
+
+async def _read_fields(response: httpx.Response, fields: dict[str, str]) -> dict[str, Any]:
+    """
+    Pull selected values out of a JSON response body.
+
+    ``fields`` maps result names to ijson paths such as
+    "choices.item.message.content". Large bodies are parsed incrementally
+    with ijson, stopping as soon as every field has been seen, so the full
+    document is never materialized. Missing fields are left out.
+    """
+    length = int(response.headers.get("content-length") or 0)
+    if not IJSON_AVAILABLE or 0 < length < _STREAM_JSON_MIN_BYTES:
+        return _select_fields(orjson.loads(await response.aread()), fields)
+
+    names = {path: name for name, path in fields.items()}
+    found = {}
+    async for prefix, event, value in ijson.parse_async(_ByteReader(response), use_float=True):
+        name = names.get(prefix)
+        if name is not None and name not in found and event in _SCALAR_EVENTS:
+            found[name] = value
+            if len(found) == len(names):
+                break
+    return found
 
 
 class AIProvider(ABC):
@@ -85,7 +635,10 @@ class AIProvider(ABC):
 
     def __init__(self, config: AIConfig):
         self.config = config
+        self.breaker = CircuitBreaker(config.breaker_threshold, config.breaker_reset_seconds)
+        # Injected by AIProviderManager; otherwise opened per `async with`
         self._client: httpx.AsyncClient | None = None
+        self._owns_client = False
 
     @abstractmethod
     async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
@@ -97,165 +650,295 @@ class AIProvider(ABC):
         """Stream a chat completion response."""
         pass
 
+    async def stream_chat_bytes(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[bytes]:
+        """Stream the response as UTF-8 bytes, for callers writing to sockets or files."""
+        async for chunk in self.stream_chat(messages, **kwargs):
+            yield chunk.encode()
+
+    def _retry_delay(self, attempt: int, retry_after: str | None) -> float:
+        """Backoff before the next attempt, honoring a numeric Retry-After."""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.config.retry_max_delay)
+            except ValueError:
+                pass
+        delay = min(self.config.retry_max_delay, self.config.retry_base_delay * 2**attempt)
+        return delay + random.uniform(0, self.config.retry_base_delay)
+
+    async def _post(
+        self, url: str | httpx.URL, *, stream: bool = False, **kwargs
+    ) -> httpx.Response:
+        """
+        POST with retries on transient failures, guarded by the circuit breaker.
+
+        With stream=True the body is left unread; the caller must close the
+        response.
+        """
+        if not self.breaker.allow():
+            raise ProviderUnavailable(f"{self.config.provider.value} circuit is open")
+        probe = self.breaker.state is CircuitState.HALF_OPEN
+        try:
+            return await self._send_with_retries(url, stream=stream, **kwargs)
+        except BaseException:
+            # A cancelled or unexpectedly failing half-open probe would otherwise
+            # keep every later request out; recorded outcomes already cleared it
+            if probe:
+                self.breaker.release_probe()
+            raise
+
+    async def _send_with_retries(
+        self, url: str | httpx.URL, *, stream: bool, **kwargs
+    ) -> httpx.Response:
+        """The retry loop of _post; records each final outcome on the breaker."""
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                request = self._client.build_request("POST", url, **kwargs)
+                response = await self._client.send(request, stream=stream)
+            except httpx.TransportError:
+                if attempt >= self.config.max_retries:
+                    self.breaker.record_failure()
+                    raise
+            else:
+                if response.is_success:
+                    self.breaker.record_success()
+                    return response
+                if stream:
+                    # Keep error bodies readable for callers; this also releases the stream
+                    await response.aread()
+                if response.status_code not in _RETRY_STATUS:
+                    # Reached the provider; client errors don't count against it
+                    self.breaker.record_success()
+                    response.raise_for_status()
+                    return response
+                if attempt >= self.config.max_retries:
+                    self.breaker.record_failure()
+                    response.raise_for_status()
+                retry_after = response.headers.get("Retry-After")
+
+            delay = self._retry_delay(attempt, retry_after)
+            logger.warning(
+                f"{self.config.provider.value} request failed, retrying in {delay:.1f}s",
+                attempt=attempt + 1,
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _encode(self, payload: dict[str, Any]) -> bytes:
+        """Encode a request body; canonical key order when prefix caching is on."""
+        if self.config.enable_prefix_cache:
+            return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        return orjson.dumps(payload)
+
+    @asynccontextmanager
+    async def _stream(self, url: str | httpx.URL, **kwargs) -> AsyncIterator[httpx.Response]:
+        """
+        Streaming POST through _post; use as ``async with ... as response``.
+
+        Retries and the circuit breaker apply until the response headers
+        arrive; once the body starts streaming a failure is not retried.
+        """
+        response = await self._post(url, stream=True, **kwargs)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    async def _post_json(
+        self, url: str | httpx.URL, fields: dict[str, str], **kwargs
+    ) -> dict[str, Any]:
+        """POST and extract the response fields named in ``fields`` (see _read_fields)."""
+        response = await self._post(url, stream=True, **kwargs)
+        try:
+            return await _read_fields(response, fields)
+        finally:
+            await response.aclose()
+
     async def __aenter__(self):
-        self._client = httpx.AsyncClient(timeout=self.config.timeout)
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.config.timeout)
+            self._owns_client = True
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._client:
+        if self._owns_client and self._client:
             await self._client.aclose()
+            self._client = None
+            self._owns_client = False
 
 
-class OpenAIProvider(AIProvider):
-    """OpenAI API provider (GPT-4, GPT-5.2)."""
+# Response fields of OpenAI-style /chat/completions endpoints
+_CHAT_COMPLETION_FIELDS = {
+    "content": "choices.item.message.content",
+    "finish_reason": "choices.item.finish_reason",
+    "model": "model",
+    "total_tokens": "usage.total_tokens",
+}
+
+
+class OpenAICompatibleProvider(AIProvider):
+    """
+    Shared implementation for OpenAI-style /chat/completions APIs.
+
+    Subclasses set the default base URL and model, and add any auth headers.
+    """
+
+    DEFAULT_BASE_URL = ""
+    DEFAULT_MODEL = ""
 
     def __init__(self, config: AIConfig):
         super().__init__(config)
-        self.config.base_url = config.base_url or "https://api.openai.com/v1"
-        self.config.model = config.model or "gpt-4-turbo-preview"
+        self.config.base_url = config.base_url or self.DEFAULT_BASE_URL
+        self.config.model = config.model or self.DEFAULT_MODEL
+        self._headers = {**_JSON_HEADERS, **self._auth_headers()}
+        self._chat_url = f"{self.config.base_url}/chat/completions"
 
-    @log_async_function_call
-    async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
-        headers = {
-            "Authorization": f"Bearer {self.config.api_key}",
-            "Content-Type": "application/json",
-        }
+    def _auth_headers(self) -> dict[str, str]:
+        return {}
 
-        payload = {
+    def _payload(self, messages: list[AIMessage], kwargs: dict[str, Any]) -> dict[str, Any]:
+        return {
             "model": kwargs.get("model", self.config.model),
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "messages": _to_wire(messages),
             "temperature": kwargs.get("temperature", self.config.temperature),
             "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
         }
 
-        response = await self._client.post(
-            f"{self.config.base_url}/chat/completions",
-            headers=headers,
-            json=payload,
+    @log_async_function_call
+    async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
+        data = await self._post_json(
+            self._chat_url,
+            _CHAT_COMPLETION_FIELDS,
+            headers=self._headers,
+            content=self._encode(self._payload(messages, kwargs)),
         )
-        response.raise_for_status()
-        data = response.json()
 
         return AIResponse(
-            content=data["choices"][0]["message"]["content"],
-            model=data["model"],
-            provider=ProviderType.OPENAI,
-            tokens_used=data.get("usage", {}).get("total_tokens", 0),
-            finish_reason=data["choices"][0].get("finish_reason", "stop"),
+            content=data["content"],
+            model=data.get("model", self.config.model),
+            provider=self.config.provider,
+            tokens_used=data.get("total_tokens", 0),
+            finish_reason=data.get("finish_reason", "stop"),
+        )
+
+    def _open_stream(self, messages: list[AIMessage], kwargs: dict[str, Any]):
+        """Start a streaming request; use the result as ``async with ... as response``."""
+        payload = self._payload(messages, kwargs)
+        payload["stream"] = True
+
+        return self._stream(
+            self._chat_url,
+            headers=self._headers,
+            content=self._encode(payload),
         )
 
     async def stream_chat(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[str]:
-        headers = {
-            "Authorization": f"Bearer {self.config.api_key}",
-            "Content-Type": "application/json",
-        }
+        async with self._open_stream(messages, kwargs) as response:
+            async for data in _iter_sse_data(response):
+                if content := data["choices"][0]["delta"].get("content"):
+                    yield content
 
-        payload = {
-            "model": kwargs.get("model", self.config.model),
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
-            "temperature": kwargs.get("temperature", self.config.temperature),
-            "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
-            "stream": True,
-        }
+    async def stream_chat_bytes(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[bytes]:
+        async with self._open_stream(messages, kwargs) as response:
+            async for content in _iter_delta_bytes(response):
+                yield content
 
-        async with self._client.stream(
-            "POST",
-            f"{self.config.base_url}/chat/completions",
-            headers=headers,
-            json=payload,
-        ) as response:
-            async for line in response.aiter_lines():
-                if line.startswith("data: ") and line != "data: [DONE]":
-                    data = json.loads(line[6:])
-                    if content := data["choices"][0]["delta"].get("content"):
-                        yield content
+
+class OpenAIProvider(OpenAICompatibleProvider):
+    """OpenAI API provider (GPT-4, GPT-5.2)."""
+
+    DEFAULT_BASE_URL = "https://api.openai.com/v1"
+    DEFAULT_MODEL = "gpt-4-turbo-preview"
+
+    def _auth_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.config.api_key}"}
 
 
 class AnthropicProvider(AIProvider):
     """Anthropic API provider (Claude Opus 4.5)."""
 
+    _RESPONSE_FIELDS = {
+        "content": "content.item.text",
+        "model": "model",
+        "stop_reason": "stop_reason",
+        "input_tokens": "usage.input_tokens",
+        "output_tokens": "usage.output_tokens",
+    }
+
     def __init__(self, config: AIConfig):
         super().__init__(config)
         self.config.base_url = config.base_url or "https://api.anthropic.com/v1"
         self.config.model = config.model or "claude-opus-4-5-20251101"
-
-    @log_async_function_call
-    async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
-        headers = {
+        self._headers = {
             "x-api-key": self.config.api_key,
             "Content-Type": "application/json",
             "anthropic-version": "2023-06-01",
         }
+        self._chat_url = f"{self.config.base_url}/messages"
 
-        # Extract system message
-        system_msg = ""
-        chat_messages = []
-        for m in messages:
-            if m.role == "system":
-                system_msg = m.content
-            else:
-                chat_messages.append({"role": m.role, "content": m.content})
+    def _system_field(self, system_msg: str) -> str | list[dict[str, Any]]:
+        """System prompt, marked as a cacheable prefix when prefix caching is on."""
+        if not self.config.enable_prefix_cache:
+            return system_msg
+        return [{"type": "text", "text": system_msg, "cache_control": {"type": "ephemeral"}}]
 
+    def _payload(self, messages: list[AIMessage], kwargs: dict[str, Any]) -> dict[str, Any]:
+        # Anthropic takes the system prompt separately from the messages
+        system_msg, chat_messages = _split_system(messages)
         payload = {
             "model": kwargs.get("model", self.config.model),
             "messages": chat_messages,
             "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
         }
         if system_msg:
-            payload["system"] = system_msg
+            payload["system"] = self._system_field(system_msg)
+        return payload
 
-        response = await self._client.post(
-            f"{self.config.base_url}/messages",
-            headers=headers,
-            json=payload,
+    @log_async_function_call
+    async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
+        data = await self._post_json(
+            self._chat_url,
+            self._RESPONSE_FIELDS,
+            headers=self._headers,
+            content=self._encode(self._payload(messages, kwargs)),
         )
-        response.raise_for_status()
-        data = response.json()
 
         return AIResponse(
-            content=data["content"][0]["text"],
+            content=data["content"],
             model=data["model"],
             provider=ProviderType.ANTHROPIC,
-            tokens_used=data.get("usage", {}).get("input_tokens", 0)
-            + data.get("usage", {}).get("output_tokens", 0),
+            tokens_used=data.get("input_tokens", 0) + data.get("output_tokens", 0),
             finish_reason=data.get("stop_reason", "end_turn"),
         )
 
-    async def stream_chat(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[str]:
-        headers = {
-            "x-api-key": self.config.api_key,
-            "Content-Type": "application/json",
-            "anthropic-version": "2023-06-01",
-        }
-
-        system_msg = ""
-        chat_messages = []
-        for m in messages:
-            if m.role == "system":
-                system_msg = m.content
-            else:
-                chat_messages.append({"role": m.role, "content": m.content})
+    def _open_stream(self, messages: list[AIMessage], kwargs: dict[str, Any]):
+        """Start a streaming request; use the result as ``async with ... as response``."""
+        payload = self._payload(messages, kwargs)
+        payload["stream"] = True
 
-        payload = {
-            "model": kwargs.get("model", self.config.model),
-            "messages": chat_messages,
-            "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
-            "stream": True,
-        }
-        if system_msg:
-            payload["system"] = system_msg
+        return self._stream(
+            self._chat_url,
+            headers=self._headers,
+            content=self._encode(payload),
+        )
 
-        async with self._client.stream(
-            "POST",
-            f"{self.config.base_url}/messages",
-            headers=headers,
-            json=payload,
-        ) as response:
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    data = json.loads(line[6:])
-                    if data["type"] == "content_block_delta":
-                        yield data["delta"].get("text", "")
+    async def stream_chat(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[str]:
+        async with self._open_stream(messages, kwargs) as response:
+            async for data in _iter_sse_data(response):
+                if data["type"] == "content_block_delta":
+                    yield data["delta"].get("text", "")
+
+    async def stream_chat_bytes(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[bytes]:
+        async with self._open_stream(messages, kwargs) as response:
+            async for data in _iter_sse_payloads(response):
+                if b'"content_block_delta"' not in data:
+                    continue
+                text = _raw_json_string(data, b'"text":"')
+                if text is None:
+                    text = orjson.loads(data)["delta"].get("text", "").encode()
+                if text:
+                    yield text
 
 
 class GoogleProvider(AIProvider):
@@ -265,137 +948,114 @@ class GoogleProvider(AIProvider):
         super().__init__(config)
         self.config.base_url = config.base_url or "https://generativelanguage.googleapis.com/v1beta"
         self.config.model = config.model or "gemini-pro"
-
-    @log_async_function_call
-    async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
-        # Convert to Gemini format
-        contents = []
-        for m in messages:
-            if m.role == "system":
-                contents.append({"role": "user", "parts": [{"text": f"[System]: {m.content}"}]})
-            else:
-                role = "user" if m.role == "user" else "model"
-                contents.append({"role": role, "parts": [{"text": m.content}]})
-
-        payload = {
-            "contents": contents,
+        # Key goes in a header so URLs stay constant and out of request logs
+        self._headers = {
+            "x-goog-api-key": self.config.api_key or "",
+            "Content-Type": "application/json",
+        }
+        model_url = f"{self.config.base_url}/models/{self.config.model}"
+        self._chat_url = httpx.URL(f"{model_url}:generateContent")
+        self._stream_url = httpx.URL(f"{model_url}:streamGenerateContent")
+
+    @staticmethod
+    def _to_gemini_contents(messages: list[AIMessage]) -> list[dict[str, Any]]:
+        """Convert messages to Gemini contents; system prompts become tagged user turns."""
+        return [
+            {"role": "user", "parts": [{"text": f"[System]: {content}"}]}
+            if role == "system"
+            else {"role": "user" if role == "user" else "model", "parts": [{"text": content}]}
+            for role, content in map(_role_content, messages)
+        ]
+
+    def _build_payload(self, messages: list[AIMessage], kwargs: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "contents": self._to_gemini_contents(messages),
             "generationConfig": {
                 "temperature": kwargs.get("temperature", self.config.temperature),
                 "maxOutputTokens": kwargs.get("max_tokens", self.config.max_tokens),
             },
         }
 
-        response = await self._client.post(
-            f"{self.config.base_url}/models/{self.config.model}:generateContent?key={self.config.api_key}",
-            json=payload,
+    @log_async_function_call
+    async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
+        payload = self._build_payload(messages, kwargs)
+
+        data = await self._post_json(
+            self._chat_url,
+            {
+                "content": "candidates.item.content.parts.item.text",
+                "finish_reason": "candidates.item.finishReason",
+                "total_tokens": "usageMetadata.totalTokenCount",
+            },
+            headers=self._headers,
+            content=self._encode(payload),
         )
-        response.raise_for_status()
-        data = response.json()
 
         return AIResponse(
-            content=data["candidates"][0]["content"]["parts"][0]["text"],
+            content=data["content"],
             model=self.config.model,
             provider=ProviderType.GOOGLE,
-            tokens_used=data.get("usageMetadata", {}).get("totalTokenCount", 0),
-            finish_reason=data["candidates"][0].get("finishReason", "STOP"),
+            tokens_used=data.get("total_tokens", 0),
+            finish_reason=data.get("finish_reason", "STOP"),
         )
 
     async def stream_chat(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[str]:
-        # Similar to chat but with streaming endpoint
-        contents = []
-        for m in messages:
-            if m.role == "system":
-                contents.append({"role": "user", "parts": [{"text": f"[System]: {m.content}"}]})
-            else:
-                role = "user" if m.role == "user" else "model"
-                contents.append({"role": role, "parts": [{"text": m.content}]})
+        payload = self._build_payload(messages, kwargs)
 
-        payload = {
-            "contents": contents,
-            "generationConfig": {
-                "temperature": kwargs.get("temperature", self.config.temperature),
-                "maxOutputTokens": kwargs.get("max_tokens", self.config.max_tokens),
-            },
-        }
-
-        async with self._client.stream(
-            "POST",
-            f"{self.config.base_url}/models/{self.config.model}:streamGenerateContent?key={self.config.api_key}",
-            json=payload,
+        async with self._stream(
+            self._stream_url,
+            headers=self._headers,
+            content=self._encode(payload),
         ) as response:
-            async for line in response.aiter_lines():
+            async for line in _iter_lines(response):
                 if line:
-                    data = json.loads(line)
+                    data = orjson.loads(line)
                     if "candidates" in data:
                         yield data["candidates"][0]["content"]["parts"][0]["text"]
 
 
-class LMStudioProvider(AIProvider):
+class LMStudioProvider(OpenAICompatibleProvider):
     """LM Studio local provider (OpenAI-compatible API)."""
 
-    def __init__(self, config: AIConfig):
-        super().__init__(config)
-        self.config.base_url = config.base_url or "http://localhost:1234/v1"
-        self.config.model = config.model or "local-model"
+    DEFAULT_BASE_URL = "http://localhost:1234/v1"
+    DEFAULT_MODEL = "local-model"
 
-    @log_async_function_call
-    async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
-        payload = {
-            "model": kwargs.get("model", self.config.model),
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
-            "temperature": kwargs.get("temperature", self.config.temperature),
-            "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
-        }
-
-        response = await self._client.post(
-            f"{self.config.base_url}/chat/completions",
-            json=payload,
-        )
-        response.raise_for_status()
-        data = response.json()
 
-        return AIResponse(
-            content=data["choices"][0]["message"]["content"],
-            model=data.get("model", self.config.model),
-            provider=ProviderType.LMSTUDIO,
-            tokens_used=data.get("usage", {}).get("total_tokens", 0),
-            finish_reason=data["choices"][0].get("finish_reason", "stop"),
-        )
-
-    async def stream_chat(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[str]:
-        payload = {
-            "model": kwargs.get("model", self.config.model),
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
-            "temperature": kwargs.get("temperature", self.config.temperature),
-            "max_tokens": kwargs.get("max_tokens", self.config.max_tokens),
-            "stream": True,
-        }
-
-        async with self._client.stream(
-            "POST",
-            f"{self.config.base_url}/chat/completions",
-            json=payload,
-        ) as response:
-            async for line in response.aiter_lines():
-                if line.startswith("data: ") and line != "data: [DONE]":
-                    data = json.loads(line[6:])
-                    if content := data["choices"][0]["delta"].get("content"):
-                        yield content
+class OllamaProvider(AIProvider):
+    """
+    Ollama local provider with GPU support.
 
+    With ``wire_format="msgpack"`` non-streaming chats are sent and received
+    as msgpack (Content-Type/Accept: application/msgpack). Ollama itself only
+    speaks JSON, so base_url must point at a colocated shim that converts
+    msgpack request bodies to JSON and JSON replies back to msgpack.
+    """
 
-class OllamaProvider(AIProvider):
-    """Ollama local provider with GPU support."""
+    _RESPONSE_FIELDS = {
+        "content": "message.content",
+        "model": "model",
+        "eval_count": "eval_count",
+        "prompt_eval_count": "prompt_eval_count",
+        "total_duration": "total_duration",
+        "load_duration": "load_duration",
+        "eval_duration": "eval_duration",
+    }
 
     def __init__(self, config: AIConfig):
         super().__init__(config)
         self.config.base_url = config.base_url or "http://localhost:11434"
         self.config.model = config.model or "llama3.2"
+        self._chat_url = f"{self.config.base_url}/api/chat"
+        self._msgpack = config.wire_format == "msgpack"
+        if self._msgpack and not MSGPACK_AVAILABLE:
+            logger.warning("msgpack not installed, Ollama falling back to JSON")
+            self._msgpack = False
 
     @log_async_function_call
     async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
         payload = {
             "model": kwargs.get("model", self.config.model),
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "messages": _to_wire(messages),
             "options": {
                 "temperature": kwargs.get("temperature", self.config.temperature),
                 "num_predict": kwargs.get("max_tokens", self.config.max_tokens),
@@ -404,15 +1064,21 @@ class OllamaProvider(AIProvider):
             "stream": False,
         }
 
-        response = await self._client.post(
-            f"{self.config.base_url}/api/chat",
-            json=payload,
-        )
-        response.raise_for_status()
-        data = response.json()
+        if self._msgpack:
+            response = await self._post(
+                self._chat_url, headers=_MSGPACK_HEADERS, content=msgpack.packb(payload)
+            )
+            data = _select_fields(msgpack.unpackb(response.content), self._RESPONSE_FIELDS)
+        else:
+            data = await self._post_json(
+                self._chat_url,
+                self._RESPONSE_FIELDS,
+                headers=_JSON_HEADERS,
+                content=self._encode(payload),
+            )
 
         return AIResponse(
-            content=data["message"]["content"],
+            content=data["content"],
             model=data.get("model", self.config.model),
             provider=ProviderType.OLLAMA,
             tokens_used=data.get("eval_count", 0) + data.get("prompt_eval_count", 0),
@@ -424,10 +1090,11 @@ class OllamaProvider(AIProvider):
             },
         )
 
-    async def stream_chat(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[str]:
+    def _open_stream(self, messages: list[AIMessage], kwargs: dict[str, Any]):
+        """Start a streaming request; use the result as ``async with ... as response``."""
         payload = {
             "model": kwargs.get("model", self.config.model),
-            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "messages": _to_wire(messages),
             "options": {
                 "temperature": kwargs.get("temperature", self.config.temperature),
                 "num_predict": kwargs.get("max_tokens", self.config.max_tokens),
@@ -436,17 +1103,31 @@ class OllamaProvider(AIProvider):
             "stream": True,
         }
 
-        async with self._client.stream(
-            "POST",
-            f"{self.config.base_url}/api/chat",
-            json=payload,
-        ) as response:
-            async for line in response.aiter_lines():
+        return self._stream(
+            self._chat_url,
+            headers=_JSON_HEADERS,
+            content=self._encode(payload),
+        )
+
+    async def stream_chat(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[str]:
+        async with self._open_stream(messages, kwargs) as response:
+            async for line in _iter_lines(response):
                 if line:
-                    data = json.loads(line)
+                    data = orjson.loads(line)
                     if content := data.get("message", {}).get("content"):
                         yield content
 
+    async def stream_chat_bytes(self, messages: list[AIMessage], **kwargs) -> AsyncIterator[bytes]:
+        async with self._open_stream(messages, kwargs) as response:
+            async for line in _iter_lines(response):
+                if line:
+                    content = _raw_json_string(line, b'"content":"')
+                    if content is None:
+                        message = orjson.loads(line).get("message", {})
+                        content = (message.get("content") or "").encode()
+                    if content:
+                        yield content
+
 
 class AnythingLLMProvider(AIProvider):
     """AnythingLLM provider."""
@@ -454,14 +1135,13 @@ class AnythingLLMProvider(AIProvider):
     def __init__(self, config: AIConfig):
         super().__init__(config)
         self.config.base_url = config.base_url or "http://localhost:3001/api/v1"
-
-    @log_async_function_call
-    async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
-        headers = {
+        self._headers = {
             "Authorization": f"Bearer {self.config.api_key}",
             "Content-Type": "application/json",
         }
 
+    @log_async_function_call
+    async def chat(self, messages: list[AIMessage], **kwargs) -> AIResponse:
         # AnythingLLM expects workspace-based chat
         workspace = kwargs.get("workspace", "default")
         payload = {
@@ -469,13 +1149,12 @@ class AnythingLLMProvider(AIProvider):
             "mode": "chat",
         }
 
-        response = await self._client.post(
+        data = await self._post_json(
             f"{self.config.base_url}/workspace/{workspace}/chat",
-            headers=headers,
-            json=payload,
+            {"textResponse": "textResponse"},
+            headers=self._headers,
+            content=self._encode(payload),
         )
-        response.raise_for_status()
-        data = response.json()
 
         return AIResponse(
             content=data.get("textResponse", ""),
@@ -491,6 +1170,75 @@ class AnythingLLMProvider(AIProvider):
         yield response.content
 
 
+_PROVIDER_CLASSES: dict[ProviderType, type[AIProvider]] = {
+    ProviderType.OPENAI: OpenAIProvider,
+    ProviderType.ANTHROPIC: AnthropicProvider,
+    ProviderType.GOOGLE: GoogleProvider,
+    ProviderType.LMSTUDIO: LMStudioProvider,
+    ProviderType.OLLAMA: OllamaProvider,
+    ProviderType.ANYTHINGLLM: AnythingLLMProvider,
+}
+
+
+@functools.cache
+def _load_env_configs() -> MappingProxyType[ProviderType, MappingProxyType[str, Any]]:
+    """
+    Read provider settings from the environment once per process.
+
+    Returns read-only AIConfig keyword arguments for each provider that is
+    configured; call ``_load_env_configs.cache_clear()`` after changing the
+    environment.
+    """
+    configs: dict[ProviderType, dict[str, Any]] = {}
+
+    # OpenAI
+    if api_key := os.getenv("OPENAI_API_KEY"):
+        configs[ProviderType.OPENAI] = {
+            "api_key": api_key,
+            "model": os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview"),
+        }
+
+    # Anthropic
+    if api_key := os.getenv("ANTHROPIC_API_KEY"):
+        configs[ProviderType.ANTHROPIC] = {
+            "api_key": api_key,
+            "model": os.getenv("ANTHROPIC_MODEL", "claude-opus-4-5-20251101"),
+        }
+
+    # Google
+    if api_key := os.getenv("GOOGLE_API_KEY"):
+        configs[ProviderType.GOOGLE] = {
+            "api_key": api_key,
+            "model": os.getenv("GOOGLE_MODEL", "gemini-pro"),
+        }
+
+    # LM Studio (local)
+    if os.getenv("LMSTUDIO_ENABLED", "").lower() == "true":
+        configs[ProviderType.LMSTUDIO] = {
+            "base_url": os.getenv("LMSTUDIO_URL", "http://localhost:1234/v1"),
+            "model": os.getenv("LMSTUDIO_MODEL", "local-model"),
+            "gpu_layers": int(os.getenv("LMSTUDIO_GPU_LAYERS", "-1")),
+        }
+
+    # Ollama (local)
+    if os.getenv("OLLAMA_ENABLED", "").lower() == "true":
+        configs[ProviderType.OLLAMA] = {
+            "base_url": os.getenv("OLLAMA_URL", "http://localhost:11434"),
+            "model": os.getenv("OLLAMA_MODEL", "llama3.2"),
+            "gpu_layers": int(os.getenv("OLLAMA_GPU_LAYERS", "-1")),
+            "wire_format": os.getenv("OLLAMA_WIRE_FORMAT", "json"),
+        }
+
+    # AnythingLLM
+    if api_key := os.getenv("ANYTHINGLLM_API_KEY"):
+        configs[ProviderType.ANYTHINGLLM] = {
+            "api_key": api_key,
+            "base_url": os.getenv("ANYTHINGLLM_URL", "http://localhost:3001/api/v1"),
+        }
+
+    return MappingProxyType({k: MappingProxyType(v) for k, v in configs.items()})
+
+
 class AIProviderManager:
     """
     Manager for multiple AI providers.
@@ -506,12 +1254,24 @@ class AIProviderManager:
         self._providers: dict[ProviderType, AIConfig] = {}
         self._active_connections: dict[ProviderType, AIProvider] = {}
         self._default_provider: ProviderType | None = None
+        # Pooled clients and concurrency limits belong to the loop that created them
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._clients: dict[tuple[str, str], httpx.AsyncClient] = {}
+        self._semaphores: dict[ProviderType, asyncio.Semaphore] = {}
+        self.cache = LLMCache(
+            max_entries=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", "3600")),
+        )
+        self.semantic_cache = SemanticCache(
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        )
 
     def register_provider(
         self, provider_type: ProviderType, config: AIConfig, set_default: bool = False
     ) -> None:
         """Register an AI provider."""
         self._providers[provider_type] = config
+        self._semaphores.pop(provider_type, None)
         if set_default or self._default_provider is None:
             self._default_provider = provider_type
         logger.info(f"Registered provider: {provider_type.value}", model=config.model)
@@ -526,119 +1286,244 @@ class AIProviderManager:
         if config is None:
             raise ValueError(f"Provider {pt.value} not registered")
 
-        provider_classes = {
-            ProviderType.OPENAI: OpenAIProvider,
-            ProviderType.ANTHROPIC: AnthropicProvider,
-            ProviderType.GOOGLE: GoogleProvider,
-            ProviderType.LMSTUDIO: LMStudioProvider,
-            ProviderType.OLLAMA: OllamaProvider,
-            ProviderType.ANYTHINGLLM: AnythingLLMProvider,
-        }
-
-        provider_class = provider_classes.get(pt)
-        if provider_class is None:
-            raise ValueError(f"Unsupported provider: {pt.value}")
+        # Providers hold no per-request state, so one instance per config is reused
+        provider = self._active_connections.get(pt)
+        if provider is None or provider.config is not config:
+            provider_class = _PROVIDER_CLASSES.get(pt)
+            if provider_class is None:
+                raise ValueError(f"Unsupported provider: {pt.value}")
+            provider = provider_class(config)
+            self._active_connections[pt] = provider
+
+        provider._client = self._client_for(provider.config)
+        return provider
+
+    def _bind_loop(self) -> None:
+        """Drop loop-bound state created under a different event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not self._loop:
+            # A previous loop's connections cannot be reused (or closed) here
+            self._clients = {}
+            self._semaphores = {}
+            self._loop = loop
+
+    def _semaphore_for(self, provider_type: ProviderType) -> asyncio.Semaphore:
+        """Get the semaphore capping in-flight requests to a provider."""
+        self._bind_loop()
+        semaphore = self._semaphores.get(provider_type)
+        if semaphore is None:
+            limit = self._providers[provider_type].max_concurrency
+            semaphore = self._semaphores[provider_type] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _client_for(self, config: AIConfig) -> httpx.AsyncClient:
+        """Get the pooled client for a provider's base URL, creating it on first use."""
+        self._bind_loop()
+        key = (config.http_backend, config.base_url)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._new_client(config)
+            self._clients[key] = client
+        return client
+
+    @staticmethod
+    def _new_client(config: AIConfig) -> httpx.AsyncClient:
+        if config.http_backend == "httpxr":
+            if HTTPXR_AVAILABLE:
+                # API-compatible with httpx.AsyncClient; pools natively
+                return httpxr.AsyncClient(timeout=config.timeout)
+            logger.warning("httpxr not installed, falling back to httpx")
+        return httpx.AsyncClient(
+            timeout=config.timeout,
+            http2=HTTP2_AVAILABLE,
+            limits=_POOL_LIMITS,
+        )
 
-        return provider_class(config)
+    async def aclose(self) -> None:
+        """Close all pooled HTTP clients."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    @staticmethod
+    def _cache_key(
+        messages: list[AIMessage],
+        provider: AIProvider,
+        kwargs: dict[str, Any],
+    ) -> tuple[str, str | None] | None:
+        """
+        Cache keys for a request, or None if it should not be cached.
+
+        Returns the exact-match key plus, for providers with semantic_cache
+        enabled, the namespace (everything but the last message) for
+        SemanticCache. Pops the ``cache`` kwarg: True forces caching, False
+        bypasses it, and by default only temperature-0 requests are cached.
+        Takes the provider, not its type, so its default model is already
+        filled into the config and every call keys on the same model.
+        """
+        use_cache = kwargs.pop("cache", None)
+        if use_cache is False:
+            return None
+        config = provider.config
+        pt = config.provider
+
+        temperature = kwargs.get("temperature", config.temperature)
+        if not use_cache and temperature != 0:
+            return None
+
+        model = kwargs.get("model") or config.model
+        max_tokens = kwargs.get("max_tokens", config.max_tokens)
+        options = {
+            k: v for k, v in kwargs.items() if k not in ("model", "temperature", "max_tokens")
+        }
+        key = LLMCache.make_key(pt, messages, model, temperature, max_tokens, options)
+        namespace = None
+        if config.semantic_cache:
+            namespace = LLMCache.make_key(
+                pt, messages[:-1], model, temperature, max_tokens, options
+            )
+        return key, namespace
+
+    async def _cache_lookup(
+        self, messages: list[AIMessage], keys: tuple[str, str | None]
+    ) -> AIResponse | None:
+        """Check the exact cache, then the semantic cache if enabled."""
+        key, namespace = keys
+        cached = self.cache.get(key)
+        if cached is None and namespace is not None:
+            if (text := _last_user_message(messages)) is not None:
+                cached = await asyncio.to_thread(self.semantic_cache.lookup, text, namespace)
+        if cached is not None:
+            logger.debug("LLM cache hit", hits=self.cache.hits, misses=self.cache.misses)
+        return cached
+
+    async def _cache_store(
+        self, messages: list[AIMessage], keys: tuple[str, str | None], response: AIResponse
+    ) -> None:
+        """Store a response in the exact cache and, if enabled, the semantic cache."""
+        key, namespace = keys
+        self.cache.set(key, response)
+        if namespace is not None:
+            if (text := _last_user_message(messages)) is not None:
+                await asyncio.to_thread(self.semantic_cache.add, text, namespace, response)
 
     async def chat(
         self, messages: list[AIMessage], provider_type: ProviderType | None = None, **kwargs
     ) -> AIResponse:
-        """Send a chat request to a provider."""
-        provider = self.get_provider(provider_type)
-        async with provider:
-            return await provider.chat(messages, **kwargs)
+        """Send a chat request to a provider, serving repeats from the cache."""
+        pt = provider_type or self._default_provider
+        provider = self.get_provider(pt)
+        cache_keys = self._cache_key(messages, provider, kwargs)
+        if cache_keys is not None:
+            if (cached := await self._cache_lookup(messages, cache_keys)) is not None:
+                return cached
+
+        async with self._semaphore_for(pt), provider:
+            response = await provider.chat(messages, **kwargs)
+
+        if cache_keys is not None:
+            await self._cache_store(messages, cache_keys, response)
+        return response
 
     async def stream_chat(
         self, messages: list[AIMessage], provider_type: ProviderType | None = None, **kwargs
     ) -> AsyncIterator[str]:
-        """Stream a chat response from a provider."""
-        provider = self.get_provider(provider_type)
-        async with provider:
+        """Stream a chat response from a provider; cached responses arrive as one chunk."""
+        pt = provider_type or self._default_provider
+        provider = self.get_provider(pt)
+        cache_keys = self._cache_key(messages, provider, kwargs)
+        if cache_keys is not None:
+            if (cached := await self._cache_lookup(messages, cache_keys)) is not None:
+                yield cached.content
+                return
+
+        chunks = []
+        async with self._semaphore_for(pt), provider:
             async for chunk in provider.stream_chat(messages, **kwargs):
+                chunks.append(chunk)
                 yield chunk
 
-    def configure_from_env(self) -> None:
-        """Configure providers from environment variables."""
-        # OpenAI
-        if api_key := os.getenv("OPENAI_API_KEY"):
-            self.register_provider(
-                ProviderType.OPENAI,
-                AIConfig(
-                    provider=ProviderType.OPENAI,
-                    api_key=api_key,
-                    model=os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview"),
+        if cache_keys is not None:
+            await self._cache_store(
+                messages,
+                cache_keys,
+                AIResponse(
+                    content="".join(chunks),
+                    model=kwargs.get("model") or provider.config.model,
+                    provider=provider.config.provider,
                 ),
             )
 
-        # Anthropic
-        if api_key := os.getenv("ANTHROPIC_API_KEY"):
-            self.register_provider(
-                ProviderType.ANTHROPIC,
-                AIConfig(
-                    provider=ProviderType.ANTHROPIC,
-                    api_key=api_key,
-                    model=os.getenv("ANTHROPIC_MODEL", "claude-opus-4-5-20251101"),
-                ),
-            )
-
-        # Google
-        if api_key := os.getenv("GOOGLE_API_KEY"):
-            self.register_provider(
-                ProviderType.GOOGLE,
-                AIConfig(
-                    provider=ProviderType.GOOGLE,
-                    api_key=api_key,
-                    model=os.getenv("GOOGLE_MODEL", "gemini-pro"),
-                ),
-            )
+    async def stream_chat_bytes(
+        self, messages: list[AIMessage], provider_type: ProviderType | None = None, **kwargs
+    ) -> AsyncIterator[bytes]:
+        """Like stream_chat, but yields UTF-8 bytes without a str round trip per chunk."""
+        pt = provider_type or self._default_provider
+        provider = self.get_provider(pt)
+        cache_keys = self._cache_key(messages, provider, kwargs)
+        if cache_keys is not None:
+            if (cached := await self._cache_lookup(messages, cache_keys)) is not None:
+                yield cached.content.encode()
+                return
+
+        chunks = []
+        async with self._semaphore_for(pt), provider:
+            async for chunk in provider.stream_chat_bytes(messages, **kwargs):
+                chunks.append(chunk)
+                yield chunk
 
-        # LM Studio (local)
-        if os.getenv("LMSTUDIO_ENABLED", "").lower() == "true":
-            self.register_provider(
-                ProviderType.LMSTUDIO,
-                AIConfig(
-                    provider=ProviderType.LMSTUDIO,
-                    base_url=os.getenv("LMSTUDIO_URL", "http://localhost:1234/v1"),
-                    model=os.getenv("LMSTUDIO_MODEL", "local-model"),
-                    gpu_layers=int(os.getenv("LMSTUDIO_GPU_LAYERS", "-1")),
+        if cache_keys is not None:
+            await self._cache_store(
+                messages,
+                cache_keys,
+                AIResponse(
+                    content=b"".join(chunks).decode(),
+                    model=kwargs.get("model") or provider.config.model,
+                    provider=provider.config.provider,
                 ),
             )
 
-        # Ollama (local)
-        if os.getenv("OLLAMA_ENABLED", "").lower() == "true":
-            self.register_provider(
-                ProviderType.OLLAMA,
-                AIConfig(
-                    provider=ProviderType.OLLAMA,
-                    base_url=os.getenv("OLLAMA_URL", "http://localhost:11434"),
-                    model=os.getenv("OLLAMA_MODEL", "llama3.2"),
-                    gpu_layers=int(os.getenv("OLLAMA_GPU_LAYERS", "-1")),
-                ),
+    async def batch_chat(
+        self,
+        batches: list[list[AIMessage]],
+        provider_type: ProviderType | None = None,
+        **kwargs,
+    ) -> list[AIResponse]:
+        """
+        Run several independent chats concurrently; results keep input order.
+
+        Concurrency is capped by the provider's max_concurrency.
+        """
+        return list(
+            await asyncio.gather(
+                *(self.chat(messages, provider_type, **kwargs) for messages in batches)
             )
+        )
 
-        # AnythingLLM
-        if api_key := os.getenv("ANYTHINGLLM_API_KEY"):
-            self.register_provider(
-                ProviderType.ANYTHINGLLM,
-                AIConfig(
-                    provider=ProviderType.ANYTHINGLLM,
-                    api_key=api_key,
-                    base_url=os.getenv("ANYTHINGLLM_URL", "http://localhost:3001/api/v1"),
-                ),
-            )
+    def configure_from_env(self) -> None:
+        """Configure providers from environment variables."""
+        for provider_type, settings in _load_env_configs().items():
+            self.register_provider(provider_type, AIConfig(provider=provider_type, **settings))
 
         logger.info(f"Configured {len(self._providers)} providers from environment")
 
 
 # Global provider manager
 _provider_manager: AIProviderManager | None = None
+_provider_manager_lock = threading.Lock()
 
 
 def get_ai_manager() -> AIProviderManager:
     """Get the global AI provider manager."""
     global _provider_manager
     if _provider_manager is None:
-        _provider_manager = AIProviderManager()
-        _provider_manager.configure_from_env()
+        with _provider_manager_lock:
+            if _provider_manager is None:
+                manager = AIProviderManager()
+                manager.configure_from_env()
+                _provider_manager = manager
     return _provider_manager
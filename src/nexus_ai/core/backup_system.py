@@ -12,20 +12,50 @@ Provides:
 
 from __future__ import annotations
 
+import errno
+import functools
 import gzip
 import hashlib
-import json
+import mmap
+import os
 import shutil
+import stat
 import threading
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
+
+import numpy as np
+import orjson
+import psutil
 
 from nexus_ai.core.logging_config import LogPerformance, get_logger
 
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import blake3
+
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+try:
+    import pgzip
+
+    PGZIP_AVAILABLE = True
+except ImportError:
+    PGZIP_AVAILABLE = False
+
 logger = get_logger("backup_system")
 
 
@@ -143,11 +173,25 @@ class BackupConfig:
 
     # Verification
     verify_after_backup: bool = True
+    # Any hashlib name, or "blake3" (needs blake3) for multithreaded hashing of large files
     verify_hash_algorithm: str = "sha256"
+    # "hash" re-hashes backups to verify them; "fs_checksum" trusts the size where the
+    # filesystem checksums file data (Btrfs, ZFS, ReFS integrity streams) and hashes
+    # elsewhere; "size_only" never hashes
+    verify_mode: Literal["hash", "fs_checksum", "size_only"] = "hash"
+    # Trust the backup hash taken while writing; False re-reads each backup to hash it
+    skip_backup_rehash: bool = True
 
     # Compression
     compress_backups: bool = True
-    compression_level: int = 6
+    compression_level: int = 6  # gzip 1-9, zstd 1-22
+    # "zstd" writes .zst (needs zstandard, else falls back to gzip); "gzip" writes .gz
+    compression_backend: Literal["gzip", "zstd"] = "zstd"
+    # gzip files larger than this are split into blocks compressed on all cores
+    # (needs pgzip; output is still plain gzip)
+    parallel_compression_blocksize: int = 2 * 10**7
+    # zstd: train one dictionary per backed-up directory tree from its small files
+    zstd_dictionary: bool = True
 
     # Automation
     auto_restore_points: bool = True
@@ -160,30 +204,296 @@ class BackupConfig:
     prefer_different_drives: bool = True
 
 
+def _hasher_factory(algorithm: str) -> Callable[[], Any]:
+    """
+    Return a constructor for ``algorithm``, resolved once.
+
+    The named hashlib constructors are OpenSSL-backed; OpenSSL probes CPUID
+    at startup and uses SHA-NI or AVX2 code for SHA-1/SHA-256 where the CPU
+    has them, and releases the GIL while hashing large buffers. BLAKE3 comes
+    from the blake3 package and splits large inputs across cores itself.
+    """
+    if algorithm == "blake3":
+        if not BLAKE3_AVAILABLE:
+            raise RuntimeError("blake3 is required for the blake3 hash algorithm")
+        return functools.partial(blake3.blake3, max_threads=blake3.blake3.AUTO)
+    constructor = getattr(hashlib, algorithm, None)
+    if algorithm in hashlib.algorithms_guaranteed and callable(constructor):
+        return constructor
+    # Other OpenSSL digests: look the name up once and clone the empty hasher,
+    # which skips hashlib.new's name resolution on every file
+    return hashlib.new(algorithm).copy
+
+
+# Filesystems that checksum file data and fail reads of corrupted blocks
+_CHECKSUMMING_FILESYSTEMS = frozenset({"btrfs", "zfs", "bcachefs", "refs"})
+
+_FSCTL_GET_INTEGRITY_INFORMATION = 0x9027C
+
+
+def _refs_integrity_enabled(path: str) -> bool:
+    """True if ReFS integrity streams (per-cluster checksums) are on for path."""
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateFileW.argtypes = [
+        wintypes.LPCWSTR,
+        wintypes.DWORD,
+        wintypes.DWORD,
+        wintypes.LPVOID,
+        wintypes.DWORD,
+        wintypes.DWORD,
+        wintypes.HANDLE,
+    ]
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.DeviceIoControl.argtypes = [
+        wintypes.HANDLE,
+        wintypes.DWORD,
+        wintypes.LPVOID,
+        wintypes.DWORD,
+        wintypes.LPVOID,
+        wintypes.DWORD,
+        ctypes.POINTER(wintypes.DWORD),
+        wintypes.LPVOID,
+    ]
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+
+    # GENERIC_READ, share read/write/delete, OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS
+    handle = kernel32.CreateFileW(path, 0x80000000, 7, None, 3, 0x02000000, None)
+    if handle is None or handle == wintypes.HANDLE(-1).value:
+        return False
+    try:
+        # FSCTL_GET_INTEGRITY_INFORMATION_BUFFER; the first WORD is ChecksumAlgorithm
+        info = (ctypes.c_uint16 * 8)()
+        returned = wintypes.DWORD()
+        ok = kernel32.DeviceIoControl(
+            handle,
+            _FSCTL_GET_INTEGRITY_INFORMATION,
+            None,
+            0,
+            info,
+            ctypes.sizeof(info),
+            ctypes.byref(returned),
+            None,
+        )
+        return bool(ok) and info[0] != 0
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+# Files of one directory backed up concurrently (per location)
+_FILE_CONCURRENCY = 8
+
+# Fold the state WAL into a full snapshot after this many logged changes
+_WAL_COMPACT_EVERY = 256
+
+# Read size for hashing and the fused hash/copy/compress loop: few syscalls per file,
+# and large enough for kernel readahead to overlap with hashing
+HASH_CHUNK = 1 << 20
+
+# zstd dictionary training: files sampled, largest sample, fewest samples worth
+# training on, and dictionary size
+_DICT_SAMPLES = 128
+_DICT_SAMPLE_MAX = 128 << 10
+_DICT_MIN_SAMPLES = 16
+_DICT_SIZE = 64 << 10
+# Files at least this large are hashed straight out of a read-only mapping
+MMAP_HASH_MIN = 8 << 20
+# Pre-fault the whole mapping in one call where the platform allows it
+_MMAP_FLAGS = (
+    mmap.MAP_SHARED | getattr(mmap, "MAP_POPULATE", 0) if os.name != "nt" else 0
+)
+
+
+# Largest single in-kernel copy call; the loop repeats until EOF
+_KERNEL_COPY_CHUNK = 1 << 30
+# errnos meaning "no in-kernel copy between these files", not a real I/O error
+_NO_KERNEL_COPY = frozenset(
+    {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSOCK}
+)
+
+
+def _kernel_copy(src_fd: int, dst_fd: int) -> int | None:
+    """
+    Copy src_fd to dst_fd without passing the bytes through userspace.
+
+    Tries copy_file_range (reflink/server-side copy where the filesystem
+    supports it), then sendfile. Both advance the file offsets, so sendfile
+    can finish a copy copy_file_range started. Returns the bytes copied, or
+    None if neither call works here and nothing was copied.
+    """
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while n := os.copy_file_range(src_fd, dst_fd, _KERNEL_COPY_CHUNK):
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in _NO_KERNEL_COPY:
+                raise
+    if hasattr(os, "sendfile"):
+        try:
+            while n := os.sendfile(dst_fd, src_fd, None, _KERNEL_COPY_CHUNK):
+                copied += n
+            return copied
+        except OSError as e:
+            if e.errno not in _NO_KERNEL_COPY or copied:
+                raise
+    if copied:
+        raise OSError(errno.EIO, "in-kernel copy stopped part way")
+    return None
+
+
+# Uncompressed copies at least this large get their full size reserved up front
+_PREALLOCATE_MIN = 8 << 20
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """
+    Reserve size bytes for fd so the copy doesn't extend the file block by block.
+
+    posix_fallocate where the filesystem supports it; on Windows, setting the
+    end of file makes NTFS allocate the clusters (zero-filled lazily).
+    """
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError as e:
+            if e.errno not in (errno.EINVAL, errno.EOPNOTSUPP, errno.ENOSYS):
+                raise
+    elif os.name == "nt":
+        os.ftruncate(fd, size)
+
+
+class _HashingWriter:
+    """Write-through file wrapper that hashes every byte written."""
+
+    def __init__(self, raw: Any, hasher: Any):
+        self._raw = raw
+        self.hasher = hasher
+        self.bytes_written = 0
+
+    def write(self, data: bytes | memoryview) -> int:
+        self.hasher.update(data)
+        written = self._raw.write(data)
+        self.bytes_written += written
+        return written
+
+    def flush(self) -> None:
+        self._raw.flush()
+
+
 class BackupVerifier:
     """Verifies backup integrity."""
 
-    def __init__(self, hash_algorithm: str = "sha256"):
+    def __init__(self, hash_algorithm: str = "sha256", verify_mode: str = "hash"):
         self.hash_algorithm = hash_algorithm
+        self.verify_mode = verify_mode
+        self.new_hasher = _hasher_factory(hash_algorithm)
+        self._mounts: list[tuple[str, str]] | None = None
+
+    def _fs_checksummed(self, path: str) -> bool:
+        """True if the filesystem holding path checksums its data blocks."""
+        if self._mounts is None:
+            # Longest mount point first, so the first prefix match is the owning mount
+            self._mounts = sorted(
+                (
+                    (os.path.normcase(p.mountpoint), p.fstype.lower())
+                    for p in psutil.disk_partitions(all=True)
+                ),
+                key=lambda m: len(m[0]),
+                reverse=True,
+            )
+        path = os.path.normcase(os.path.abspath(path))
+        for mountpoint, fstype in self._mounts:
+            if path == mountpoint or path.startswith(mountpoint.rstrip(os.sep) + os.sep):
+                if fstype == "refs":
+                    # ReFS only checksums data where integrity streams are enabled
+                    return _refs_integrity_enabled(path)
+                return fstype in _CHECKSUMMING_FILESYSTEMS
+        return False
+
+    def _needs_hash(self, path: str) -> bool:
+        """Whether verify_mode requires re-hashing the backup at path."""
+        if self.verify_mode == "size_only":
+            return False
+        if self.verify_mode == "fs_checksum":
+            # Falls back to hashing on filesystems without data checksums
+            return not self._fs_checksummed(path)
+        return True
 
     def compute_hash(self, file_path: Path) -> str:
         """Compute hash of a file."""
-        hasher = hashlib.new(self.hash_algorithm)
-        with open(file_path, "rb") as f:
-            while chunk := f.read(65536):
-                hasher.update(chunk)
+        hasher = self.new_hasher()
+        # Unbuffered reads straight into one reusable buffer, no per-chunk allocation
+        with open(file_path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= MMAP_HASH_MIN:
+                if self.hash_algorithm == "blake3":
+                    # Maps the file and hashes it on all cores in one call
+                    return hasher.update_mmap(file_path).hexdigest()
+                if self._update_mmap(hasher, f.fileno()):
+                    return hasher.hexdigest()
+            buf = bytearray(max(1, min(HASH_CHUNK, size)))
+            view = memoryview(buf)
+            while n := f.readinto(buf):
+                hasher.update(view[:n])
         return hasher.hexdigest()
 
+    def compute_hash_mmap(self, file_path: Path) -> str:
+        """
+        Compute hash of a file through a read-only memory map.
+
+        The hasher reads the page cache directly instead of a copy of it in
+        a Python buffer. Falls back to compute_hash if the file can't be
+        mapped (empty, a pipe, or an unsupported filesystem).
+        """
+        hasher = self.new_hasher()
+        with open(file_path, "rb", buffering=0) as f:
+            if self._update_mmap(hasher, f.fileno()):
+                return hasher.hexdigest()
+        return self.compute_hash(file_path)
+
+    @staticmethod
+    def _update_mmap(hasher: Any, fd: int) -> bool:
+        """Feed the whole of fd to hasher from a mapping; False if it can't be mapped."""
+        try:
+            if os.name == "nt":
+                mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            else:
+                mm = mmap.mmap(fd, 0, flags=_MMAP_FLAGS, prot=mmap.PROT_READ)
+        except (OSError, ValueError):
+            return False
+        with mm:
+            # hashlib releases the GIL and chunks internally over the buffer
+            hasher.update(mm)
+        return True
+
+    def compute_hashes_batch(self, file_paths: list[Path]) -> list[str]:
+        """
+        Hash several files in parallel; results keep input order.
+
+        hashlib drops the GIL while hashing each buffer, so a thread per
+        file keeps several cores busy on directories of many files.
+        """
+        if len(file_paths) < 2:
+            return [self.compute_hash(p) for p in file_paths]
+        with ThreadPoolExecutor() as pool:
+            return list(pool.map(self.compute_hash, file_paths))
+
     def verify_entry(self, entry: BackupEntry) -> VerificationResult:
         """Verify a single backup entry."""
         backup_path = Path(entry.backup_path)
 
-        if not backup_path.exists():
+        try:
+            actual_size = backup_path.stat().st_size
+        except FileNotFoundError:
             return VerificationResult.FILE_MISSING
-
-        actual_size = backup_path.stat().st_size
         if actual_size != entry.backup_size:
             return VerificationResult.SIZE_MISMATCH
+        if not self._needs_hash(entry.backup_path):
+            return VerificationResult.SUCCESS
 
         actual_hash = self.compute_hash(backup_path)
         if actual_hash != entry.hash_backup:
@@ -195,18 +505,107 @@ class BackupVerifier:
         self, record: BackupRecord
     ) -> tuple[bool, list[tuple[str, VerificationResult]]]:
         """Verify all entries in a backup record."""
-        results = []
-        all_success = True
-
-        for entry in record.entries:
-            result = self.verify_entry(entry)
-            results.append((entry.source_path, result))
-            if result != VerificationResult.SUCCESS:
-                all_success = False
+        # Cheap existence/size checks first, then hash the survivors in one batch
+        checks: list[VerificationResult | None] = []
+        to_hash: list[int] = []
+        for i, entry in enumerate(record.entries):
+            try:
+                actual_size = os.stat(entry.backup_path).st_size
+            except FileNotFoundError:
+                checks.append(VerificationResult.FILE_MISSING)
+                continue
+            if actual_size != entry.backup_size:
+                checks.append(VerificationResult.SIZE_MISMATCH)
+            elif not self._needs_hash(entry.backup_path):
+                checks.append(VerificationResult.SUCCESS)
+            else:
+                checks.append(None)
+                to_hash.append(i)
+
+        hashes = self.compute_hashes_batch([Path(record.entries[i].backup_path) for i in to_hash])
+        for i, actual_hash in zip(to_hash, hashes, strict=True):
+            checks[i] = (
+                VerificationResult.SUCCESS
+                if actual_hash == record.entries[i].hash_backup
+                else VerificationResult.HASH_MISMATCH
+            )
 
+        results = [(entry.source_path, r) for entry, r in zip(record.entries, checks, strict=True)]
+        all_success = all(r == VerificationResult.SUCCESS for _, r in results)
         return all_success, results
 
 
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_STATUSES = list(BackupStatus)
+_STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+
+
+def _to_us(moment: datetime) -> int:
+    """Naive datetime as integer microseconds since 1970, for vector comparisons."""
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+class _RecordIndex:
+    """
+    Struct-of-arrays copy of the record fields that retention scans filter on.
+
+    Rows follow record insertion order. expires_at, status and total_size
+    sit in contiguous arrays so scans are vectorized comparisons rather
+    than attribute lookups on every BackupRecord.
+    """
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._expires = np.empty(64, dtype=np.int64)
+        self._status = np.empty(64, dtype=np.uint8)
+        self._size = np.empty(64, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def expires(self) -> np.ndarray:
+        return self._expires[: len(self.ids)]
+
+    @property
+    def status(self) -> np.ndarray:
+        return self._status[: len(self.ids)]
+
+    @property
+    def size(self) -> np.ndarray:
+        return self._size[: len(self.ids)]
+
+    def upsert(self, record: BackupRecord) -> None:
+        """Add a record, or refresh its row after a change."""
+        row = self._rows.get(record.id)
+        if row is None:
+            row = len(self.ids)
+            if row == len(self._expires):
+                capacity = 2 * row
+                self._expires = np.resize(self._expires, capacity)
+                self._status = np.resize(self._status, capacity)
+                self._size = np.resize(self._size, capacity)
+            self._rows[record.id] = row
+            self.ids.append(record.id)
+        self._expires[row] = _to_us(record.expires_at)
+        self._status[row] = _STATUS_CODES[record.status]
+        self._size[row] = record.total_size
+
+    def has_status(self, *statuses: BackupStatus) -> np.ndarray:
+        """Boolean mask of rows in any of statuses."""
+        return np.isin(self.status, [_STATUS_CODES[s] for s in statuses])
+
+    def expires_by(self, moment: datetime) -> np.ndarray:
+        """Boolean mask of rows expiring at or before moment."""
+        return self.expires <= _to_us(moment)
+
+    def select(self, mask: np.ndarray) -> list[str]:
+        """Record ids of the rows set in mask."""
+        return [self.ids[i] for i in np.flatnonzero(mask)]
+
+
 class BackupManager:
     """
     Enterprise backup management system.
@@ -221,12 +620,24 @@ class BackupManager:
 
     def __init__(self, config: BackupConfig | None = None):
         self.config = config or BackupConfig()
-        self.verifier = BackupVerifier(self.config.verify_hash_algorithm)
+        self.verifier = BackupVerifier(
+            self.config.verify_hash_algorithm, self.config.verify_mode
+        )
+        self._compression = self.config.compression_backend
+        if self._compression == "zstd" and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed, compressing backups with gzip")
+            self._compression = "gzip"
         self._locations: dict[str, BackupLocation] = {}
         self._records: dict[str, BackupRecord] = {}
         self._restore_points: dict[str, RestorePoint] = {}
         self._lock = threading.Lock()
         self._alert_callbacks: list[Callable[[str, dict], None]] = []
+        self._wal_entries = 0
+        self._index = _RecordIndex()
+        self._pool: ThreadPoolExecutor | None = None
+        # Trained zstd dictionaries by file name (None: tree too small) and by id
+        self._dicts: dict[str, Any] = {}
+        self._dicts_by_id: dict[int, Any] = {}
 
         self._initialize_locations()
         self._load_state()
@@ -277,7 +688,7 @@ class BackupManager:
                 drive_letter=drive,
                 priority=priority,
                 is_primary=is_primary,
-                is_available=path.exists(),
+                is_available=True,  # mkdir above succeeded
             )
             self._locations[location.id] = location
             logger.info(f"Added backup location: {path}", drive=drive, primary=is_primary)
@@ -298,14 +709,15 @@ class BackupManager:
             # Ensure we have locations on different drives
             drives_seen = set()
             diverse_locations = []
+            remaining = []
             for loc in available:
                 if loc.drive_letter not in drives_seen:
                     diverse_locations.append(loc)
                     drives_seen.add(loc.drive_letter)
+                else:
+                    remaining.append(loc)
             # Add remaining if we don't have enough
-            for loc in available:
-                if loc not in diverse_locations:
-                    diverse_locations.append(loc)
+            diverse_locations.extend(remaining)
             return diverse_locations
 
         return available
@@ -314,63 +726,61 @@ class BackupManager:
         """Get path to state file."""
         return self.config.primary_backup_path / "backup_state.json"
 
+    def _wal_file_path(self) -> Path:
+        """Get path to the append-only log of record changes since the last snapshot."""
+        return self.config.primary_backup_path / "backup_state.wal.jsonl"
+
     def _save_state(self) -> None:
-        """Save backup state to disk."""
-        state = {
-            "records": {
-                id: {
-                    "id": r.id,
-                    "type": r.type.value,
-                    "status": r.status.value,
-                    "created_at": r.created_at.isoformat(),
-                    "expires_at": r.expires_at.isoformat(),
-                    "source_paths": r.source_paths,
-                    "backup_locations": r.backup_locations,
-                    "total_size": r.total_size,
-                    "verified": r.verified,
-                    "verification_time": (
-                        r.verification_time.isoformat() if r.verification_time else None
-                    ),
-                    "verification_result": (
-                        r.verification_result.value if r.verification_result else None
-                    ),
-                    "error_message": r.error_message,
-                    "metadata": r.metadata,
-                    "entries": [
-                        {
-                            "source_path": e.source_path,
-                            "backup_path": e.backup_path,
-                            "original_size": e.original_size,
-                            "backup_size": e.backup_size,
-                            "hash_original": e.hash_original,
-                            "hash_backup": e.hash_backup,
-                            "backup_time": e.backup_time.isoformat(),
-                            "is_compressed": e.is_compressed,
-                        }
-                        for e in r.entries
-                    ],
-                }
-                for id, r in self._records.items()
-            },
-            "restore_points": {
-                id: {
-                    "id": rp.id,
-                    "name": rp.name,
-                    "created_at": rp.created_at.isoformat(),
-                    "backup_record_id": rp.backup_record_id,
-                    "description": rp.description,
-                    "auto_created": rp.auto_created,
-                    "is_valid": rp.is_valid,
-                }
-                for id, rp in self._restore_points.items()
-            },
-        }
+        """Save a full snapshot of backup state to disk and reset the WAL."""
+        # Records and restore points are dataclasses; orjson serializes them
+        # (with their enums and datetimes) directly
+        state = {"records": self._records, "restore_points": self._restore_points}
 
         state_file = self._state_file_path()
         state_file.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(state_file, "w") as f:
-            json.dump(state, f, indent=2)
+        tmp_file = state_file.with_suffix(".json.tmp")
+        tmp_file.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+        tmp_file.replace(state_file)
+        self._wal_file_path().unlink(missing_ok=True)
+        self._wal_entries = 0
+
+    def _append_wal(self, changes: list[dict[str, Any]]) -> None:
+        """
+        Persist record field changes without rewriting the whole state file.
+
+        Each change is one JSON line holding a record id and the changed
+        fields; the log is folded into a snapshot every _WAL_COMPACT_EVERY lines.
+        """
+        if not changes:
+            return
+        self._wal_entries += len(changes)
+        if self._wal_entries >= _WAL_COMPACT_EVERY:
+            self._save_state()
+            return
+        with open(self._wal_file_path(), "ab") as f:
+            f.write(b"".join(orjson.dumps(change) + b"\n" for change in changes))
+
+    def _replay_wal(self) -> None:
+        """Apply logged record changes on top of the loaded snapshot."""
+        wal_file = self._wal_file_path()
+        if not wal_file.exists():
+            return
+
+        with open(wal_file, "rb") as f:
+            for line in f:
+                try:
+                    change = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    break  # Torn final write
+                record = self._records.get(change.get("id"))
+                if record is None:
+                    continue
+                if "status" in change:
+                    record.status = BackupStatus(change["status"])
+                if "expires_at" in change:
+                    record.expires_at = datetime.fromisoformat(change["expires_at"])
+                self._wal_entries += 1
 
     def _load_state(self) -> None:
         """Load backup state from disk."""
@@ -379,8 +789,7 @@ class BackupManager:
             return
 
         try:
-            with open(state_file) as f:
-                state = json.load(f)
+            state = orjson.loads(state_file.read_bytes())
 
             # Load records
             for id, data in state.get("records", {}).items():
@@ -437,6 +846,10 @@ class BackupManager:
                 )
                 self._restore_points[id] = rp
 
+            self._replay_wal()
+            for record in self._records.values():
+                self._index.upsert(record)
+
             logger.info(
                 f"Loaded {len(self._records)} backup records, {len(self._restore_points)} restore points"
             )
@@ -541,6 +954,8 @@ class BackupManager:
                 for path in paths:
                     self._backup_path(path, record, locations[: self.config.min_backup_copies])
 
+            if record.error_message is not None:
+                raise OSError(f"Incomplete backup: {record.error_message}")
             record.status = BackupStatus.COMPLETED
 
             # Verify if configured
@@ -561,6 +976,7 @@ class BackupManager:
 
         with self._lock:
             self._records[record.id] = record
+            self._index.upsert(record)
             self._save_state()
 
         return record
@@ -571,48 +987,228 @@ class BackupManager:
         record: BackupRecord,
         locations: list[BackupLocation],
     ) -> None:
-        """Backup a single path to multiple locations."""
-        for location in locations:
+        """Backup a single path to multiple locations, one thread per location."""
+        if not locations:
+            return
+        zdict = self._dict_for(source) if source.is_dir() else None
+        # Locations are usually on different drives, so their I/O overlaps
+        with ThreadPoolExecutor(max_workers=len(locations)) as pool:
+            futures = [
+                pool.submit(self._backup_to_location, source, record.id, location, zdict)
+                for location in locations
+            ]
+        # Entries are merged here, in location order, so record isn't shared across threads
+        for location, future in zip(locations, futures, strict=True):
             try:
-                backup_dir = location.path / record.id
-                backup_dir.mkdir(parents=True, exist_ok=True)
-
-                if source.is_file():
-                    self._backup_file(source, backup_dir, record, location)
-                elif source.is_dir():
-                    self._backup_directory(source, backup_dir, record, location)
-
+                for entry in future.result():
+                    self._add_entry(record, entry)
             except Exception as e:
                 logger.error(f"Failed to backup {source} to {location.path}: {e}")
+                # A copy with missing files must not pass as COMPLETED
+                record.error_message = record.error_message or f"{location.path}: {e}"
+
+    def _backup_to_location(
+        self,
+        source: Path,
+        record_id: str,
+        location: BackupLocation,
+        zdict: Any = None,
+    ) -> list[BackupEntry]:
+        """Backup one path into a location's directory for this record."""
+        backup_dir = location.path / record_id
+        backup_dir.mkdir(parents=True, exist_ok=True)
+
+        if zdict is not None:
+            # Each location keeps the dictionary its own backups need to restore
+            dict_path = location.path / "dicts" / self._dict_name(source)
+            if not dict_path.exists():
+                dict_path.parent.mkdir(exist_ok=True)
+                dict_path.write_bytes(zdict.as_bytes())
+
+        if source.is_file():
+            return [self._backup_file(source, backup_dir)]
+        if source.is_dir():
+            return self._backup_directory(source, backup_dir, zdict)
+        return []
+
+    @staticmethod
+    def _dict_name(source_root: Path) -> str:
+        """File name of the zstd dictionary trained for a directory tree."""
+        key = hashlib.sha256(str(source_root.resolve()).encode()).hexdigest()[:16]
+        return f"{key}.zdict"
+
+    def _dict_for(self, source_root: Path) -> Any:
+        """
+        zstd dictionary for the files under source_root, or None.
+
+        Trained once from up to _DICT_SAMPLES small files and kept under
+        <primary>/dicts, so later backups of the same tree reuse it. Many
+        small, similar files (configs, registry exports) compress several
+        times smaller against a shared dictionary than on their own.
+        """
+        if self._compression != "zstd" or not self.config.zstd_dictionary:
+            return None
+        name = self._dict_name(source_root)
+        with self._lock:
+            if name in self._dicts:
+                return self._dicts[name]
+
+        dict_path = self.config.primary_backup_path / "dicts" / name
+        zdict = None
+        if dict_path.exists():
+            zdict = zstandard.ZstdCompressionDict(dict_path.read_bytes())
+        else:
+            samples = self._dict_samples(source_root)
+            if len(samples) >= _DICT_MIN_SAMPLES:
+                try:
+                    zdict = zstandard.train_dictionary(_DICT_SIZE, samples)
+                except zstandard.ZstdError as e:
+                    logger.debug(f"No zstd dictionary for {source_root}: {e}")
+                else:
+                    dict_path.parent.mkdir(parents=True, exist_ok=True)
+                    dict_path.write_bytes(zdict.as_bytes())
+        if zdict is not None:
+            # Digest the dictionary once rather than in every compressor
+            zdict.precompute_compress(level=self.config.compression_level)
+
+        with self._lock:
+            self._dicts[name] = zdict
+            if zdict is not None:
+                self._dicts_by_id[zdict.dict_id()] = zdict
+        return zdict
+
+    def _dict_samples(self, source_root: Path) -> list[bytes]:
+        """Contents of up to _DICT_SAMPLES small files under source_root."""
+        samples: list[bytes] = []
+        for _, entries in self._walk_files(str(source_root)):
+            for entry in entries:
+                if 0 < entry.stat().st_size <= _DICT_SAMPLE_MAX:
+                    try:
+                        with open(entry.path, "rb") as f:
+                            samples.append(f.read(_DICT_SAMPLE_MAX))
+                    except OSError:
+                        continue
+                    if len(samples) == _DICT_SAMPLES:
+                        return samples
+        return samples
+
+    def _dict_by_id(self, dict_id: int) -> Any:
+        """zstd dictionary a compressed backup was written with, from any location."""
+        with self._lock:
+            zdict = self._dicts_by_id.get(dict_id)
+        if zdict is not None:
+            return zdict
+        for location in self._locations.values():
+            for dict_path in (location.path / "dicts").glob("*.zdict"):
+                candidate = zstandard.ZstdCompressionDict(dict_path.read_bytes())
+                if candidate.dict_id() == dict_id:
+                    with self._lock:
+                        self._dicts_by_id[dict_id] = candidate
+                    return candidate
+        raise RuntimeError(f"zstd dictionary {dict_id} not found in any backup location")
+
+    @property
+    def _io_pool(self) -> ThreadPoolExecutor:
+        """Shared worker pool for per-file backup work, created on first use."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=_FILE_CONCURRENCY * max(1, len(self._locations)),
+                        thread_name_prefix="backup-io",
+                    )
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the backup worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
 
     def _backup_file(
         self,
         source: Path,
         backup_dir: Path,
-        record: BackupRecord,
-        location: BackupLocation,
-    ) -> None:
-        """Backup a single file."""
-        hash_original = self.verifier.compute_hash(source)
-        original_size = source.stat().st_size
+        src_stat: os.stat_result | None = None,
+        zdict: Any = None,
+    ) -> BackupEntry:
+        """
+        Copy (or compress) source into backup_dir.
+
+        Compression is a single fused pass: each chunk is read once and fed
+        to the source hasher and the compressor, whose output is hashed and
+        counted on its way to disk. Plain copies stay in the kernel where
+        possible; the source is then hashed once from the page cache.
+        """
+        new_hasher = self.verifier.new_hasher
+        hasher_src = new_hasher()
+        src_stat = src_stat or source.stat()
+        size = src_stat.st_size
+        buf = bytearray(max(1, min(HASH_CHUNK, size)))
+        view = memoryview(buf)
+        original_size = 0
 
         if self.config.compress_backups:
-            backup_path = backup_dir / (source.name + ".gz")
-            with open(source, "rb") as f_in:
-                with gzip.open(
-                    backup_path, "wb", compresslevel=self.config.compression_level
-                ) as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+            suffix = ".zst" if self._compression == "zstd" else ".gz"
+            backup_path = backup_dir / (source.name + suffix)
+            with (
+                open(source, "rb", buffering=0) as f_in,
+                open(backup_path, "wb", buffering=HASH_CHUNK) as raw,
+            ):
+                sink = _HashingWriter(raw, new_hasher())
+                with self._open_compressor(sink, backup_path, size, zdict) as f_out:
+                    while n := f_in.readinto(buf):
+                        chunk = view[:n]
+                        hasher_src.update(chunk)
+                        f_out.write(chunk)
+                        original_size += n
+            hash_original = hasher_src.hexdigest()
+            hash_backup = sink.hasher.hexdigest()
+            backup_size = sink.bytes_written
             is_compressed = True
         else:
             backup_path = backup_dir / source.name
-            shutil.copy2(source, backup_path)
+            digest = None
+            with (
+                open(source, "rb", buffering=0) as f_in,
+                open(backup_path, "wb", buffering=HASH_CHUNK) as f_out,
+            ):
+                if size >= _PREALLOCATE_MIN:
+                    _preallocate(f_out.fileno(), size)
+                copied = _kernel_copy(f_in.fileno(), f_out.fileno())
+                if copied is not None:
+                    original_size = copied
+                else:
+                    # No in-kernel copy on this platform: fused read/hash/write
+                    while n := f_in.readinto(buf):
+                        chunk = view[:n]
+                        hasher_src.update(chunk)
+                        f_out.write(chunk)
+                        original_size += n
+                    digest = hasher_src.hexdigest()
+                if original_size < size:
+                    # Source shrank while copying; drop the unused reservation
+                    f_out.flush()
+                    f_out.truncate(original_size)
+            if digest is None:
+                # The kernel copied without us seeing the bytes: hash the source
+                # while it is still in the page cache. hash_original must describe
+                # the source, or a bad copy would verify against itself.
+                digest = self.verifier.compute_hash(source)
+            # Times and mode, as copy2 kept them, from the stat we already have
+            os.utime(backup_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+            os.chmod(backup_path, stat.S_IMODE(src_stat.st_mode))
+            # An uncompressed backup is byte-identical to the source; unless the
+            # read-back below runs, its hash is taken to be the source's
+            hash_original = hash_backup = digest
+            backup_size = original_size
             is_compressed = False
 
-        backup_size = backup_path.stat().st_size
-        hash_backup = self.verifier.compute_hash(backup_path)
+        if not self.config.skip_backup_rehash:
+            # Read-back check: hash the backup as stored, not as it was written
+            hash_backup = self.verifier.compute_hash(backup_path)
 
-        entry = BackupEntry(
+        return BackupEntry(
             source_path=str(source),
             backup_path=str(backup_path),
             original_size=original_size,
@@ -623,23 +1219,121 @@ class BackupManager:
             is_compressed=is_compressed,
         )
 
+    def _open_compressor(
+        self, sink: _HashingWriter, backup_path: Path, size: int, zdict: Any = None
+    ) -> Any:
+        """Compressing writer over sink for the configured backend."""
+        if self._compression == "zstd":
+            compressor = zstandard.ZstdCompressor(
+                level=self.config.compression_level, dict_data=zdict, threads=-1
+            )
+            return compressor.stream_writer(sink, closefd=False)
+        blocksize = self.config.parallel_compression_blocksize
+        if PGZIP_AVAILABLE and size > blocksize:
+            return pgzip.PgzipFile(
+                filename=backup_path,
+                mode="wb",
+                compresslevel=self.config.compression_level,
+                fileobj=sink,
+                thread=os.cpu_count(),
+                blocksize=blocksize,
+            )
+        return gzip.GzipFile(
+            filename=backup_path,
+            mode="wb",
+            compresslevel=self.config.compression_level,
+            fileobj=sink,
+        )
+
+    def _open_decompressed(self, backup_path: Path) -> Any:
+        """Readable decompressed stream of a backup, chosen by its suffix."""
+        if backup_path.suffix == ".zst":
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError(f"zstandard is required to restore {backup_path}")
+            f_in = open(backup_path, "rb", buffering=HASH_CHUNK)
+            try:
+                # The frame header names the dictionary it was compressed with, if any
+                dict_id = zstandard.get_frame_parameters(f_in.peek(18)).dict_id
+                zdict = self._dict_by_id(dict_id) if dict_id else None
+            except BaseException:
+                f_in.close()
+                raise
+            return zstandard.ZstdDecompressor(dict_data=zdict).stream_reader(f_in)
+        if PGZIP_AVAILABLE:
+            # Block-indexed members from pgzip decompress in parallel
+            return pgzip.open(backup_path, "rb", thread=os.cpu_count())
+        return gzip.open(backup_path, "rb")
+
+    @staticmethod
+    def _add_entry(record: BackupRecord, entry: BackupEntry) -> None:
+        """Record a written backup file."""
         record.entries.append(entry)
-        record.total_size += backup_size
+        record.total_size += entry.backup_size
+
+    @staticmethod
+    def _walk_files(root: str, rel: str = "") -> Iterator[tuple[str, list[os.DirEntry]]]:
+        """
+        Yield (relative dir, file entries) for root and its subdirectories.
+
+        One os.scandir per directory; DirEntry caches the file type from the
+        directory read, so no per-item stat is needed to tell files apart.
+        Symlinked directories are not followed, matching Path.rglob.
+        """
+        files = []
+        subdirs = []
+        with os.scandir(os.path.join(root, rel)) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(os.path.join(rel, entry.name))
+                elif entry.is_file():
+                    files.append(entry)
+        if files:
+            yield rel, files
+        for subdir in subdirs:
+            yield from BackupManager._walk_files(root, subdir)
 
     def _backup_directory(
-        self,
-        source: Path,
-        backup_dir: Path,
-        record: BackupRecord,
-        location: BackupLocation,
-    ) -> None:
-        """Backup a directory recursively."""
-        for item in source.rglob("*"):
-            if item.is_file():
-                rel_path = item.relative_to(source)
-                item_backup_dir = backup_dir / source.name / rel_path.parent
-                item_backup_dir.mkdir(parents=True, exist_ok=True)
-                self._backup_file(item, item_backup_dir, record, location)
+        self, source: Path, backup_dir: Path, zdict: Any = None
+    ) -> list[BackupEntry]:
+        """
+        Backup a directory recursively.
+
+        A file that fails is logged, and once every other file has finished
+        its error is raised so the location fails instead of silently
+        recording an incomplete backup.
+        """
+        sources: list[Path] = []
+        target_dirs: list[Path] = []
+        stats: list[os.stat_result] = []
+        for rel, entries in self._walk_files(str(source)):
+            item_backup_dir = backup_dir / source.name / rel
+            item_backup_dir.mkdir(parents=True, exist_ok=True)
+            for entry in entries:
+                sources.append(Path(entry.path))
+                target_dirs.append(item_backup_dir)
+                stats.append(entry.stat())
+
+        # Files are independent and hashing, zlib and file I/O all release the GIL.
+        # At most _FILE_CONCURRENCY files per directory are in flight to avoid disk thrash.
+        gate = threading.BoundedSemaphore(_FILE_CONCURRENCY)
+        futures = []
+        for args in zip(sources, target_dirs, stats, strict=True):
+            gate.acquire()
+            future = self._io_pool.submit(self._backup_file, *args, zdict)
+            future.add_done_callback(lambda _: gate.release())
+            futures.append(future)
+
+        entries = []
+        first_error: OSError | None = None
+        for item, future in zip(sources, futures, strict=True):
+            try:
+                entries.append(future.result())
+            except OSError as e:
+                logger.error(f"Failed to backup {item}: {e}")
+                first_error = first_error or e
+        if first_error is not None:
+            raise first_error
+        return entries
 
     def restore(
         self,
@@ -701,9 +1395,9 @@ class BackupManager:
         restore_path.parent.mkdir(parents=True, exist_ok=True)
 
         if entry.is_compressed:
-            with gzip.open(backup_path, "rb") as f_in:
-                with open(restore_path, "wb") as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+            with self._open_decompressed(backup_path) as f_in:
+                with open(restore_path, "wb", buffering=HASH_CHUNK) as f_out:
+                    shutil.copyfileobj(f_in, f_out, HASH_CHUNK)
         else:
             shutil.copy2(backup_path, restore_path)
 
@@ -724,25 +1418,29 @@ class BackupManager:
     def check_expiring_backups(self) -> list[BackupRecord]:
         """Check for backups that will expire soon and need review."""
         expiring = []
+        changes = []
         alert_threshold = datetime.now() + timedelta(days=self.config.alert_before_delete_days)
 
-        for record in self._records.values():
-            if record.status in [BackupStatus.COMPLETED, BackupStatus.VERIFIED]:
-                if record.expires_at <= alert_threshold:
-                    record.status = BackupStatus.PENDING_REVIEW
-                    expiring.append(record)
-
-                    self._send_alert(
-                        "backup_expiring",
-                        {
-                            "record_id": record.id,
-                            "expires_at": record.expires_at.isoformat(),
-                            "source_paths": record.source_paths,
-                        },
-                    )
+        index = self._index
+        mask = index.has_status(BackupStatus.COMPLETED, BackupStatus.VERIFIED)
+        mask &= index.expires_by(alert_threshold)
+        for record_id in index.select(mask):
+            record = self._records[record_id]
+            record.status = BackupStatus.PENDING_REVIEW
+            index.upsert(record)
+            expiring.append(record)
+            changes.append({"id": record.id, "status": record.status})
+
+            self._send_alert(
+                "backup_expiring",
+                {
+                    "record_id": record.id,
+                    "expires_at": record.expires_at.isoformat(),
+                    "source_paths": record.source_paths,
+                },
+            )
 
-        if expiring:
-            self._save_state()
+        self._append_wal(changes)
 
         return expiring
 
@@ -758,25 +1456,29 @@ class BackupManager:
         """
         now = datetime.now()
         cleaned = 0
-
-        for _record_id, record in list(self._records.items()):
-            if record.expires_at <= now:
-                if record.status == BackupStatus.PENDING_REVIEW and not force:
-                    continue  # Skip pending review unless forced
-
-                # Delete backup files
-                for loc_id in record.backup_locations:
-                    loc = self._locations.get(loc_id)
-                    if loc:
-                        backup_dir = loc.path / record.id
-                        if backup_dir.exists():
-                            shutil.rmtree(backup_dir, ignore_errors=True)
-
-                record.status = BackupStatus.DELETED
-                cleaned += 1
-
-        if cleaned:
-            self._save_state()
+        changes = []
+
+        index = self._index
+        mask = index.expires_by(now)
+        if not force:
+            mask &= ~index.has_status(BackupStatus.PENDING_REVIEW)  # Skip pending review
+        for record_id in index.select(mask):
+            record = self._records[record_id]
+
+            # Delete backup files
+            for loc_id in record.backup_locations:
+                loc = self._locations.get(loc_id)
+                if loc:
+                    backup_dir = loc.path / record.id
+                    if backup_dir.exists():
+                        shutil.rmtree(backup_dir, ignore_errors=True)
+
+            record.status = BackupStatus.DELETED
+            index.upsert(record)
+            changes.append({"id": record.id, "status": record.status})
+            cleaned += 1
+
+        self._append_wal(changes)
 
         logger.info(f"Cleaned up {cleaned} expired backups")
         return cleaned
@@ -790,8 +1492,11 @@ class BackupManager:
         record.expires_at = record.expires_at + timedelta(days=days)
         if record.status == BackupStatus.PENDING_REVIEW:
             record.status = BackupStatus.VERIFIED if record.verified else BackupStatus.COMPLETED
+        self._index.upsert(record)
 
-        self._save_state()
+        self._append_wal(
+            [{"id": record.id, "status": record.status, "expires_at": record.expires_at}]
+        )
         logger.info(f"Extended retention for {record_id} by {days} days")
         return True
 
@@ -810,10 +1515,8 @@ class BackupManager:
             ],
             "records_count": len(self._records),
             "restore_points_count": len(self._restore_points),
-            "pending_review": sum(
-                1 for r in self._records.values() if r.status == BackupStatus.PENDING_REVIEW
-            ),
-            "total_backup_size_gb": sum(r.total_size for r in self._records.values()) / (1024**3),
+            "pending_review": int(self._index.has_status(BackupStatus.PENDING_REVIEW).sum()),
+            "total_backup_size_gb": int(self._index.size.sum()) / (1024**3),
         }
 
     def list_restore_points(self) -> list[RestorePoint]:
@@ -826,9 +1529,11 @@ class BackupManager:
 
     def list_backups(self, status: BackupStatus | None = None) -> list[BackupRecord]:
         """List backup records, optionally filtered by status."""
-        records = list(self._records.values())
         if status:
-            records = [r for r in records if r.status == status]
+            ids = self._index.select(self._index.has_status(status))
+            records = [self._records[record_id] for record_id in ids]
+        else:
+            records = list(self._records.values())
         return sorted(records, key=lambda x: x.created_at, reverse=True)
 
 
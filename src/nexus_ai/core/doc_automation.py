@@ -12,18 +12,68 @@ Agents that automatically:
 from __future__ import annotations
 
 import ast
+import asyncio
+import inspect
+import os
 import re
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from nexus_ai.core.ai_providers import AIMessage, get_ai_manager
 from nexus_ai.core.logging_config import get_logger
 
 logger = get_logger("doc_automation")
 
+# A comment (from the first "#" on its line) mentioning TODO or FIXME
+_TODO_RE = re.compile(r"#[^\n]*(?:TODO|FIXME)[^\n]*")
+
+# Rust and C# declarations (basic regex parsing). Each pattern opens with a zero-width
+# guard that rejects start positions which can never begin a match (mid-word, or inside
+# a whitespace run whose first character was already tried), so the engine skips them
+# instead of backtracking through every optional group; the matches are unchanged.
+_RUST_FN_RE = re.compile(r"(?=pub|async|fn)(pub\s+)?(async\s+)?fn\s+(\w+)\s*\([^)]*\)")
+_RUST_STRUCT_RE = re.compile(r"(?=pub|struct)(pub\s+)?struct\s+(\w+)")
+_RUST_IMPL_RE = re.compile(r"impl\s+(\w+)")
+_CS_CLASS_RE = re.compile(
+    r"(?:(?=\s)(?<!\s)|(?=public|internal|private|class|interface))"
+    r"(public|internal|private)?\s*(class|interface)\s+(\w+)"
+)
+_CS_METHOD_RE = re.compile(
+    r"(?:(?=\s)(?<!\s)|(?=[\w<>])(?<![\w<>])|(?=public|private|protected|internal|async))"
+    r"(public|private|protected|internal)?\s*(async\s+)?([\w<>]+)\s+(\w+)\s*\([^)]*\)"
+)
+
+# Comments and string/char literals, whose contents the declaration patterns must ignore
+_RUST_MASK_RE = re.compile(
+    r'//[^\n]*|/\*[\s\S]*?\*/|r(#*)"[\s\S]*?"\1|"(?:\\[\s\S]|[^"\\])*"'
+    r"|'(?:\\.|[^'\\\n])'"
+)
+_CS_MASK_RE = re.compile(
+    r'//[^\n]*|/\*[\s\S]*?\*/|"""[\s\S]*?"""|@"(?:[^"]|"")*"|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])'"
+)
+
+# Longest signature or docstring worth interning; boilerplate text is far shorter
+_INTERN_MAX = 4096
+
+# Bump when analysis output changes, so persisted caches from older code are dropped
+_CACHE_VERSION = 4
+
+# Fewest changed files worth a process pool for, and files handed to a worker at once
+_PARALLEL_MIN_FILES = 64
+_PARALLEL_CHUNKSIZE = 16
+
 
 class DocType(Enum):
     """Types of documentation."""
@@ -50,7 +100,7 @@ class DiagramType(Enum):
     ARCHITECTURE = "architecture"
 
 
-@dataclass
+@dataclass(slots=True)
 class CodeElement:
     """Represents a code element (class, function, module)."""
 
@@ -64,7 +114,7 @@ class CodeElement:
     children: list[CodeElement] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class IssueEntry:
     """Represents a detected issue."""
 
@@ -78,7 +128,7 @@ class IssueEntry:
     detected_at: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
+@dataclass(slots=True)
 class DocSection:
     """A section of documentation."""
 
@@ -89,276 +139,690 @@ class DocSection:
     last_updated: datetime = field(default_factory=datetime.now)
 
 
-class CodeAnalyzer:
-    """Analyzes code structure for documentation."""
+# A file's extracted elements and the issues found in it
+_FileAnalysis = tuple[list[CodeElement], list[IssueEntry]]
 
-    def __init__(self):
-        self.elements: dict[str, CodeElement] = {}
-        self.issues: list[IssueEntry] = []
 
-    def analyze_python_file(self, file_path: Path) -> list[CodeElement]:
-        """Analyze a Python file and extract code elements."""
-        elements = []
+def _read_source(file_path: Path) -> str:
+    """
+    Read a source file as UTF-8 text with universal newlines, like read_text.
 
-        try:
-            source = file_path.read_text(encoding="utf-8")
-            tree = ast.parse(source, filename=str(file_path))
+    One unbuffered read of the whole file and one decode, with no text-layer
+    wrapper; newlines are only rewritten when the file has carriage returns.
+    """
+    with open(file_path, "rb", buffering=0) as f:
+        source = f.readall().decode("utf-8")
+    if "\r" in source:
+        source = source.replace("\r\n", "\n").replace("\r", "\n")
+    return source
+
+
+# Fields holding nested statement blocks, in the order ast node types declare them
+_BLOCK_FIELDS = ("body", "handlers", "orelse", "finalbody", "cases")
+_SCOPES = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def _walk_statements(tree: ast.Module) -> Iterator[tuple[ast.AST, bool]]:
+    """
+    Yield (node, at_module_scope) for the statements of tree, breadth first.
+
+    Like ast.walk, but only follows statement blocks (and the except/case
+    clauses holding them): expressions can't contain classes, functions or
+    docstrings, so most of the tree is never visited. at_module_scope is
+    True for statements not nested in any class or function, including
+    those inside module-level if/try/with blocks.
+    """
+    todo: deque[tuple[ast.AST, bool]] = deque([(tree, True)])
+    while todo:
+        node, at_module_scope = todo.popleft()
+        inner_scope = at_module_scope and not isinstance(node, _SCOPES)
+        for name in _BLOCK_FIELDS:
+            block = getattr(node, name, None)
+            if block:
+                todo.extend((child, inner_scope) for child in block)
+        yield node, at_module_scope
+
+
+def _analyze_python(file_path: Path) -> _FileAnalysis:
+    """Extract a Python file's code elements and issues."""
+    elements = []
+    # One string per file, shared by every element and issue from it
+    path = str(file_path)
+    issues = []
+
+    try:
+        source = _read_source(file_path)
+        tree = ast.parse(source, filename=path)
+        # For slicing annotations out of the source in signatures
+        newlines = _newline_offsets(source)
+
+        # One traversal extracts elements and flags docstring/TODO issues
+        docstrings: dict[ast.AST, str | None] = {}
+        for node, at_module_scope in _walk_statements(tree):
+            if isinstance(node, ast.ClassDef | ast.FunctionDef):
+                if node in docstrings:
+                    docstring = docstrings.pop(node)
+                else:
+                    docstring = _docstring(node)
+                if not docstring:
+                    issues.append(_missing_doc_issue(path, node))
 
-            for node in ast.walk(tree):
                 if isinstance(node, ast.ClassDef):
                     element = CodeElement(
                         name=node.name,
                         type="class",
-                        file_path=str(file_path),
+                        file_path=path,
                         line_number=node.lineno,
-                        docstring=ast.get_docstring(node),
+                        docstring=docstring,
                     )
 
                     # Analyze methods
                     for item in node.body:
                         if isinstance(item, ast.FunctionDef):
+                            # Kept for the missing-docstring check when the walk reaches it
+                            docstrings[item] = _docstring(item)
                             method = CodeElement(
                                 name=item.name,
                                 type="method",
-                                file_path=str(file_path),
+                                file_path=path,
                                 line_number=item.lineno,
-                                docstring=ast.get_docstring(item),
-                                signature=self._get_function_signature(item),
+                                docstring=docstrings[item],
+                                signature=_function_signature(item, source, newlines),
                             )
                             element.children.append(method)
 
                     elements.append(element)
-                    self.elements[f"{file_path}:{node.name}"] = element
 
-                elif isinstance(node, ast.FunctionDef) and node.col_offset == 0:
-                    # Top-level function
+                elif at_module_scope:
+                    # Top-level function, including ones under module-level if/try blocks
                     element = CodeElement(
                         name=node.name,
                         type="function",
-                        file_path=str(file_path),
+                        file_path=path,
                         line_number=node.lineno,
-                        docstring=ast.get_docstring(node),
-                        signature=self._get_function_signature(node),
+                        docstring=docstring,
+                        signature=_function_signature(node, source, newlines),
                     )
                     elements.append(element)
-                    self.elements[f"{file_path}:{node.name}"] = element
 
-            # Check for issues
-            self._check_for_issues(file_path, tree, source)
-
-        except Exception as e:
-            logger.error(f"Failed to analyze {file_path}: {e}")
-            self.issues.append(
-                IssueEntry(
-                    id=f"parse_error_{file_path.name}",
-                    type="bug",
-                    severity="high",
-                    file_path=str(file_path),
-                    line_number=None,
-                    description=f"Failed to parse file: {e}",
-                )
-            )
-
-        return elements
-
-    def _get_function_signature(self, node: ast.FunctionDef) -> str:
-        """Extract function signature."""
-        args = []
-        for arg in node.args.args:
-            arg_str = arg.arg
-            if arg.annotation:
-                arg_str += f": {ast.unparse(arg.annotation)}"
-            args.append(arg_str)
-
-        returns = ""
-        if node.returns:
-            returns = f" -> {ast.unparse(node.returns)}"
-
-        return f"def {node.name}({', '.join(args)}){returns}"
-
-    def _check_for_issues(self, file_path: Path, tree: ast.AST, source: str) -> None:
-        """Check for common issues in code."""
-        lines = source.split("\n")
-
-        for node in ast.walk(tree):
-            # Missing docstrings
-            if isinstance(node, ast.ClassDef | ast.FunctionDef):
-                if not ast.get_docstring(node):
-                    self.issues.append(
-                        IssueEntry(
-                            id=f"missing_doc_{file_path.name}_{node.name}",
-                            type="warning",
-                            severity="medium",
-                            file_path=str(file_path),
-                            line_number=node.lineno,
-                            description=f"Missing docstring for {node.__class__.__name__} '{node.name}'",
-                            suggestion="Add a docstring describing the purpose and usage",
-                        )
-                    )
-
-            # TODO comments
-            if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            # TODO docstrings and bare string statements
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
                 if isinstance(node.value.value, str) and "TODO" in node.value.value:
-                    self.issues.append(
+                    issues.append(
                         IssueEntry(
                             id=f"todo_{file_path.name}_{node.lineno}",
                             type="improvement",
                             severity="low",
-                            file_path=str(file_path),
+                            file_path=path,
                             line_number=node.lineno,
                             description=node.value.value,
                         )
                     )
 
-        # Check for TODO/FIXME in comments
-        for i, line in enumerate(lines, 1):
-            if "#" in line:
-                comment = line[line.index("#") :]
-                if "TODO" in comment or "FIXME" in comment:
-                    self.issues.append(
-                        IssueEntry(
-                            id=f"comment_{file_path.name}_{i}",
-                            type="improvement" if "TODO" in comment else "bug",
-                            severity="low" if "TODO" in comment else "medium",
-                            file_path=str(file_path),
-                            line_number=i,
-                            description=comment.strip("# "),
-                        )
-                    )
+        # Check for issues
+        issues.extend(_comment_issues(path, source))
+
+    except Exception as e:
+        logger.error(f"Failed to analyze {file_path}: {e}")
+        issues.append(
+            IssueEntry(
+                id=f"parse_error_{file_path.name}",
+                type="bug",
+                severity="high",
+                file_path=path,
+                line_number=None,
+                description=f"Failed to parse file: {e}",
+            )
+        )
 
-    def analyze_rust_file(self, file_path: Path) -> list[CodeElement]:
-        """Analyze a Rust file (basic parsing)."""
-        elements = []
+    return elements, issues
 
-        try:
-            source = file_path.read_text(encoding="utf-8")
-
-            # Basic regex patterns for Rust
-            # Functions
-            for match in re.finditer(r"(pub\s+)?(async\s+)?fn\s+(\w+)\s*\([^)]*\)", source):
-                line_num = source[: match.start()].count("\n") + 1
-                elements.append(
-                    CodeElement(
-                        name=match.group(3),
-                        type="function",
-                        file_path=str(file_path),
-                        line_number=line_num,
-                        signature=match.group(0),
-                    )
+
+def _shared_text(text: str | None) -> str | None:
+    """The interned copy of text, so repeated signatures and docstrings share one object."""
+    if text is None or len(text) > _INTERN_MAX:
+        return text
+    return sys.intern(text)
+
+
+def _share_strings(element: CodeElement) -> None:
+    """Swap element's and its children's signatures and docstrings for the shared copies."""
+    element.signature = _shared_text(element.signature)
+    element.docstring = _shared_text(element.docstring)
+    for child in element.children:
+        _share_strings(child)
+
+
+def _reshared(analysis: _FileAnalysis) -> _FileAnalysis:
+    """Re-share the strings of an analysis unpickled from a worker process."""
+    for element in analysis[0]:
+        _share_strings(element)
+    return analysis
+
+
+def _docstring(node: ast.ClassDef | ast.FunctionDef) -> str | None:
+    """
+    Same result as ast.get_docstring(node), with less work per node.
+
+    A single-line docstring only needs the leading-whitespace strip that
+    inspect.cleandoc would apply; multi-line ones still go through cleandoc.
+    """
+    body = node.body
+    if not body or not isinstance(body[0], ast.Expr):
+        return None
+    value = body[0].value
+    if not isinstance(value, ast.Constant) or not isinstance(value.value, str):
+        return None
+    text = value.value
+    if "\n" in text or "\t" in text:
+        return _shared_text(inspect.cleandoc(text))
+    return _shared_text(text.lstrip())
+
+
+def _source_segment(node: ast.expr, source: str, newlines: list[int]) -> str:
+    """
+    Source text of node as written, for a node on one line; unparsed otherwise.
+
+    Column offsets count UTF-8 bytes, so only non-ASCII lines are encoded.
+    """
+    if node.end_lineno != node.lineno:
+        return ast.unparse(node)
+    index = node.lineno - 1
+    start = newlines[index - 1] + 1 if index else 0
+    end = newlines[index] if index < len(newlines) else len(source)
+    line = source[start:end]
+    if line.isascii():
+        return line[node.col_offset : node.end_col_offset]
+    return line.encode()[node.col_offset : node.end_col_offset].decode()
+
+
+def _function_signature(node: ast.FunctionDef, source: str, newlines: list[int]) -> str:
+    """Extract function signature, with annotations as they appear in source."""
+    args = []
+    for arg in node.args.args:
+        arg_str = arg.arg
+        if arg.annotation:
+            arg_str += f": {_source_segment(arg.annotation, source, newlines)}"
+        args.append(arg_str)
+
+    returns = ""
+    if node.returns:
+        returns = f" -> {_source_segment(node.returns, source, newlines)}"
+
+    return sys.intern(f"def {node.name}({', '.join(args)}){returns}")
+
+
+def _missing_doc_issue(path: str, node: ast.ClassDef | ast.FunctionDef) -> IssueEntry:
+    """Issue for a class or function without a docstring."""
+    return IssueEntry(
+        id=f"missing_doc_{os.path.basename(path)}_{node.name}",
+        type="warning",
+        severity="medium",
+        file_path=path,
+        line_number=node.lineno,
+        description=f"Missing docstring for {node.__class__.__name__} '{node.name}'",
+        suggestion="Add a docstring describing the purpose and usage",
+    )
+
+
+def _comment_issues(path: str, source: str) -> list[IssueEntry]:
+    """Issues for TODO/FIXME comments; AST issues are found during analysis."""
+    issues = []
+    file_name = os.path.basename(path)
+    # One regex scan of the whole source; line numbers are counted incrementally
+    line = 1
+    pos = 0
+    for match in _TODO_RE.finditer(source):
+        line += source.count("\n", pos, match.start())
+        pos = match.start()
+        comment = match.group(0)
+        is_todo = "TODO" in comment
+        issues.append(
+            IssueEntry(
+                id=f"comment_{file_name}_{line}",
+                type="improvement" if is_todo else "bug",
+                severity="low" if is_todo else "medium",
+                file_path=path,
+                line_number=line,
+                description=comment.strip("# "),
+            )
+        )
+    return issues
+
+
+def _newline_offsets(source: str) -> list[int]:
+    """Offsets of every newline in source, for bisecting match positions to lines."""
+    offsets = []
+    pos = source.find("\n")
+    while pos != -1:
+        offsets.append(pos)
+        pos = source.find("\n", pos + 1)
+    return offsets
+
+
+def _masked_spans(pattern: re.Pattern[str], source: str) -> tuple[list[int], list[int]]:
+    """Start and end offsets of the comments and literals pattern finds in source."""
+    starts = []
+    ends = []
+    for match in pattern.finditer(source):
+        starts.append(match.start())
+        ends.append(match.end())
+    return starts, ends
+
+
+def _is_masked(spans: tuple[list[int], list[int]], offset: int) -> bool:
+    """Whether offset lies inside one of the spans from _masked_spans."""
+    starts, ends = spans
+    i = bisect_right(starts, offset) - 1
+    return i >= 0 and offset < ends[i]
+
+
+def _analyze_rust(file_path: Path) -> _FileAnalysis:
+    """Extract a Rust file's code elements (basic parsing)."""
+    elements = []
+    # One string per file, shared by every element and issue from it
+    path = str(file_path)
+
+    try:
+        source = _read_source(file_path)
+        # Line of a match = newlines before it + 1
+        newlines = _newline_offsets(source)
+        # Declarations named inside comments or strings are not code
+        masked = _masked_spans(_RUST_MASK_RE, source)
+
+        # Basic regex patterns for Rust
+        # Functions
+        for match in _RUST_FN_RE.finditer(source):
+            if _is_masked(masked, match.start(3)):
+                continue
+            line_num = bisect_left(newlines, match.start()) + 1
+            elements.append(
+                CodeElement(
+                    name=match.group(3),
+                    type="function",
+                    file_path=path,
+                    line_number=line_num,
+                    signature=match.group(0),
                 )
+            )
 
-            # Structs
-            for match in re.finditer(r"(pub\s+)?struct\s+(\w+)", source):
-                line_num = source[: match.start()].count("\n") + 1
-                elements.append(
-                    CodeElement(
-                        name=match.group(2),
-                        type="struct",
-                        file_path=str(file_path),
-                        line_number=line_num,
-                    )
+        # Structs
+        for match in _RUST_STRUCT_RE.finditer(source):
+            if _is_masked(masked, match.start(2)):
+                continue
+            line_num = bisect_left(newlines, match.start()) + 1
+            elements.append(
+                CodeElement(
+                    name=match.group(2),
+                    type="struct",
+                    file_path=path,
+                    line_number=line_num,
                 )
+            )
 
-            # Impl blocks
-            for match in re.finditer(r"impl\s+(\w+)", source):
-                line_num = source[: match.start()].count("\n") + 1
-                elements.append(
-                    CodeElement(
-                        name=match.group(1),
-                        type="impl",
-                        file_path=str(file_path),
-                        line_number=line_num,
-                    )
+        # Impl blocks
+        for match in _RUST_IMPL_RE.finditer(source):
+            if _is_masked(masked, match.start(1)):
+                continue
+            line_num = bisect_left(newlines, match.start()) + 1
+            elements.append(
+                CodeElement(
+                    name=match.group(1),
+                    type="impl",
+                    file_path=path,
+                    line_number=line_num,
                 )
+            )
 
-        except Exception as e:
-            logger.error(f"Failed to analyze Rust file {file_path}: {e}")
+    except Exception as e:
+        logger.error(f"Failed to analyze Rust file {file_path}: {e}")
 
-        return elements
+    return elements, []
+
+
+def _analyze_csharp(file_path: Path) -> _FileAnalysis:
+    """Extract a C# file's code elements (basic parsing)."""
+    elements = []
+    # One string per file, shared by every element and issue from it
+    path = str(file_path)
+
+    try:
+        source = _read_source(file_path)
+        # Line of a match = newlines before it + 1
+        newlines = _newline_offsets(source)
+        # Declarations named inside comments or strings are not code
+        masked = _masked_spans(_CS_MASK_RE, source)
+
+        # Classes
+        for match in _CS_CLASS_RE.finditer(source):
+            if _is_masked(masked, match.start(3)):
+                continue
+            line_num = bisect_left(newlines, match.start()) + 1
+            elements.append(
+                CodeElement(
+                    name=match.group(3),
+                    type=sys.intern(match.group(2)),
+                    file_path=path,
+                    line_number=line_num,
+                )
+            )
+
+        # Methods
+        for match in _CS_METHOD_RE.finditer(source):
+            if _is_masked(masked, match.start(4)):
+                continue
+            line_num = bisect_left(newlines, match.start()) + 1
+            elements.append(
+                CodeElement(
+                    name=match.group(4),
+                    type="method",
+                    file_path=path,
+                    line_number=line_num,
+                    signature=match.group(0),
+                )
+            )
+
+    except Exception as e:
+        logger.error(f"Failed to analyze C# file {file_path}: {e}")
+
+    return elements, []
+
+
+# Analyzer per file suffix, and whether its elements are tracked in CodeAnalyzer.elements
+_ANALYZERS: dict[str, tuple[Callable[[Path], _FileAnalysis], bool]] = {
+    ".py": (_analyze_python, True),
+    ".rs": (_analyze_rust, False),
+    ".cs": (_analyze_csharp, False),
+}
+
+
+# Directories never descended into when scanning for sources: caches, VCS data and
+# dependencies, excluded for every language
+_SKIP_DIRS = frozenset({"__pycache__", ".git", "node_modules"})
+
+# Build output excluded per language: a directory with one of these names anywhere
+# below the scan root hides only that language's files (Cargo's src/bin/ holds real
+# Rust sources, and bin/ is a common home for Python scripts)
+_SKIP_DIRS_BY_SUFFIX = {
+    ".rs": frozenset({"target"}),
+    ".cs": frozenset({"bin", "obj"}),
+}
+
+
+def _iter_source_files(root: Path) -> Iterator[tuple[str, Path]]:
+    """
+    Yield (suffix, path) for every analyzable source file under root.
+
+    A single os.walk; excluded directories are pruned in place, so their
+    subtrees are never listed. Per-language build directories are matched
+    by path component, once per directory rather than per file.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS]
+        parts = Path(dirpath).relative_to(root).parts
+        skipped = {
+            suffix for suffix, names in _SKIP_DIRS_BY_SUFFIX.items() if not names.isdisjoint(parts)
+        }
+        for filename in filenames:
+            suffix = os.path.splitext(filename)[1]
+            if suffix in _ANALYZERS and suffix not in skipped:
+                yield suffix, Path(dirpath, filename)
+
+
+def _analyze_file(file_path: Path) -> _FileAnalysis:
+    """Analyze a file with the analyzer for its suffix (module-level for process pools)."""
+    return _ANALYZERS[file_path.suffix][0](file_path)
+
+
+class CodeAnalyzer:
+    """Analyzes code structure for documentation."""
+
+    def __init__(self):
+        self.elements: dict[str, CodeElement] = {}
+        self.issues: list[IssueEntry] = []
+        # Per file: ((mtime_ns, size), elements, issues) from its last analysis
+        self._file_cache: dict[
+            Path, tuple[tuple[int, int], list[CodeElement], list[IssueEntry]]
+        ] = {}
+
+    def analyze_python_file(self, file_path: Path) -> list[CodeElement]:
+        """Analyze a Python file and extract code elements."""
+        return self._analyze(file_path, _analyze_python, register=True)
+
+    def analyze_rust_file(self, file_path: Path) -> list[CodeElement]:
+        """Analyze a Rust file (basic parsing)."""
+        return self._analyze(file_path, _analyze_rust, register=False)
 
     def analyze_csharp_file(self, file_path: Path) -> list[CodeElement]:
         """Analyze a C# file (basic parsing)."""
-        elements = []
+        return self._analyze(file_path, _analyze_csharp, register=False)
+
+    def analyze_files(self, file_paths: list[Path]) -> list[list[CodeElement]]:
+        """
+        Analyze .py, .rs and .cs files by suffix; results follow input order.
 
+        Files that changed since their cached analysis are parsed in a process
+        pool once there are enough of them to pay for starting it; parsing
+        holds the GIL, so threads would not help.
+        """
+        jobs = [
+            (file_path, self._stat_key(file_path), _ANALYZERS[file_path.suffix][1])
+            for file_path in file_paths
+        ]
+        stale = [file_path for file_path, key, _ in jobs if not self._is_cached(file_path, key)]
+
+        parallel = len(stale) >= _PARALLEL_MIN_FILES and (os.cpu_count() or 1) > 1
+        pool = ProcessPoolExecutor() if parallel else None
         try:
-            source = file_path.read_text(encoding="utf-8")
-
-            # Classes
-            for match in re.finditer(
-                r"(public|internal|private)?\s*(class|interface)\s+(\w+)", source
-            ):
-                line_num = source[: match.start()].count("\n") + 1
-                elements.append(
-                    CodeElement(
-                        name=match.group(3),
-                        type=match.group(2),
-                        file_path=str(file_path),
-                        line_number=line_num,
-                    )
+            if pool is not None:
+                analyses = map(
+                    _reshared, pool.map(_analyze_file, stale, chunksize=_PARALLEL_CHUNKSIZE)
                 )
+            else:
+                analyses = map(_analyze_file, stale)
+            # Merge in input order so elements and issues match a sequential scan
+            results = []
+            for file_path, key, register in jobs:
+                elements = self._replay(file_path, key, register)
+                if elements is None:
+                    elements = self._record(file_path, key, *next(analyses), register)
+                results.append(elements)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return results
 
-            # Methods
-            for match in re.finditer(
-                r"(public|private|protected|internal)?\s*(async\s+)?([\w<>]+)\s+(\w+)\s*\([^)]*\)",
-                source,
-            ):
-                line_num = source[: match.start()].count("\n") + 1
-                elements.append(
-                    CodeElement(
-                        name=match.group(4),
-                        type="method",
-                        file_path=str(file_path),
-                        line_number=line_num,
-                        signature=match.group(0),
-                    )
-                )
+    def _analyze(
+        self,
+        file_path: Path,
+        analyze: Callable[[Path], _FileAnalysis],
+        register: bool,
+    ) -> list[CodeElement]:
+        """Run analyze on file_path unless the file is unchanged since last time."""
+        key = self._stat_key(file_path)
+        elements = self._replay(file_path, key, register)
+        if elements is None:
+            elements = self._record(file_path, key, *analyze(file_path), register)
+        return elements
 
-        except Exception as e:
-            logger.error(f"Failed to analyze C# file {file_path}: {e}")
+    @staticmethod
+    def _stat_key(file_path: Path) -> tuple[int, int] | None:
+        """Cache key for a file's current contents: (mtime_ns, size)."""
+        try:
+            st = file_path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _is_cached(self, file_path: Path, key: tuple[int, int] | None) -> bool:
+        """Whether the cached analysis of file_path is still current."""
+        cached = self._file_cache.get(file_path)
+        return key is not None and cached is not None and cached[0] == key
+
+    def _replay(
+        self, file_path: Path, key: tuple[int, int] | None, register: bool
+    ) -> list[CodeElement] | None:
+        """
+        Re-add a cached analysis as a fresh parse would have; None if stale.
+
+        Elements go into self.elements when register is set, and the file's
+        issues are appended to self.issues.
+        """
+        if not self._is_cached(file_path, key):
+            return None
+        _, elements, issues = self._file_cache[file_path]
+        self._merge(file_path, elements, issues, register)
+        return list(elements)
 
+    def _record(
+        self,
+        file_path: Path,
+        key: tuple[int, int] | None,
+        elements: list[CodeElement],
+        issues: list[IssueEntry],
+        register: bool,
+    ) -> list[CodeElement]:
+        """Cache a fresh analysis of file_path and merge it in."""
+        if key is not None:
+            self._file_cache[file_path] = (key, elements, issues)
+        self._merge(file_path, elements, issues, register)
         return elements
 
+    def _merge(
+        self,
+        file_path: Path,
+        elements: list[CodeElement],
+        issues: list[IssueEntry],
+        register: bool,
+    ) -> None:
+        """Add one file's analysis to self.elements and self.issues."""
+        if register:
+            for element in elements:
+                self.elements[f"{file_path}:{element.name}"] = element
+        self.issues.extend(issues)
+
+    def save_cache(self, cache_path: Path) -> None:
+        """Persist the per-file analysis cache for reuse by a later process."""
+        files = [
+            {
+                "path": str(file_path),
+                "key": key,
+                "elements": elements,
+                "issues": issues,
+            }
+            for file_path, (key, elements, issues) in self._file_cache.items()
+        ]
+        cache = {"version": _CACHE_VERSION, "files": files}
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_bytes(orjson.dumps(cache))
+
+    def load_cache(self, cache_path: Path) -> None:
+        """Load a cache written by save_cache; a missing or corrupt file is ignored."""
+        try:
+            cache = orjson.loads(cache_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return
+        if not isinstance(cache, dict) or cache.get("version") != _CACHE_VERSION:
+            return
+
+        def element(data: dict[str, Any], path: str) -> CodeElement:
+            data["file_path"] = path
+            data["type"] = sys.intern(data["type"])
+            data["signature"] = _shared_text(data["signature"])
+            data["docstring"] = _shared_text(data["docstring"])
+            data["children"] = [element(child, path) for child in data["children"]]
+            return CodeElement(**data)
+
+        loaded = {}
+        try:
+            for entry in cache["files"]:
+                # Share one path string per file, as a fresh analysis does
+                path = entry["path"]
+                issues = []
+                for data in entry["issues"]:
+                    data["file_path"] = path
+                    data["detected_at"] = datetime.fromisoformat(data["detected_at"])
+                    issues.append(IssueEntry(**data))
+                loaded[Path(path)] = (
+                    tuple(entry["key"]),
+                    [element(data, path) for data in entry["elements"]],
+                    issues,
+                )
+        except (KeyError, TypeError, ValueError) as e:
+            # Valid JSON of the wrong shape: drop all of it rather than trust part
+            logger.warning(f"Ignoring malformed analysis cache {cache_path}: {e}")
+            return
+        self._file_cache.update(loaded)
+
+
+# Characters Mermaid does not accept in node ids
+_MERMAID_ID_TABLE = str.maketrans({" ": "_", "-": "_"})
+
+
+def _safe_id(name: str) -> str:
+    """Mermaid node id for a code element name."""
+    return name.translate(_MERMAID_ID_TABLE)
+
 
 class DiagramGenerator:
     """Generates diagrams from code analysis."""
 
     def __init__(self, ai_manager=None):
-        self.ai_manager = ai_manager or get_ai_manager()
+        self._ai_manager = ai_manager
+
+    @property
+    def ai_manager(self):
+        """AI provider manager, fetched on first use so offline analysis never configures one."""
+        if self._ai_manager is None:
+            self._ai_manager = get_ai_manager()
+        return self._ai_manager
+
+    @ai_manager.setter
+    def ai_manager(self, ai_manager) -> None:
+        self._ai_manager = ai_manager
 
     def generate_mermaid_flowchart(
         self, elements: list[CodeElement], title: str = "Code Flow"
     ) -> str:
         """Generate a Mermaid flowchart from code elements."""
-        lines = ["```mermaid", "flowchart TD", f"    subgraph {title}"]
+        return "\n".join(self._flowchart_lines(elements, title))
+
+    def _flowchart_lines(self, elements: list[CodeElement], title: str) -> Iterator[str]:
+        """Yield the Mermaid flowchart lines for elements."""
+        yield "```mermaid"
+        yield "flowchart TD"
+        yield f"    subgraph {title}"
 
         for elem in elements:
-            node_id = elem.name.replace(" ", "_")
             if elem.type == "class":
-                lines.append(f"    {node_id}[{elem.name}]")
+                node_id = _safe_id(elem.name)
+                yield f"    {node_id}[{elem.name}]"
                 for child in elem.children:
-                    child_id = f"{node_id}_{child.name}"
-                    lines.append(f"    {node_id} --> {child_id}(({child.name}))")
+                    yield f"    {node_id} --> {node_id}_{child.name}(({child.name}))"
             elif elem.type == "function":
-                lines.append(f"    {node_id}({elem.name})")
+                yield f"    {_safe_id(elem.name)}({elem.name})"
 
-        lines.append("    end")
-        lines.append("```")
-        return "\n".join(lines)
+        yield "    end"
+        yield "```"
 
     def generate_mermaid_class_diagram(self, elements: list[CodeElement]) -> str:
         """Generate a Mermaid class diagram."""
-        lines = ["```mermaid", "classDiagram"]
+        return "\n".join(self._class_diagram_lines(elements))
+
+    def _class_diagram_lines(self, elements: list[CodeElement]) -> Iterator[str]:
+        """Yield the Mermaid class diagram lines for elements."""
+        yield "```mermaid"
+        yield "classDiagram"
 
         for elem in elements:
             if elem.type == "class":
-                lines.append(f"    class {elem.name} {{")
+                yield f"    class {elem.name} {{"
                 for child in elem.children:
                     if child.type == "method":
-                        lines.append(f"        +{child.name}()")
-                lines.append("    }")
+                        yield f"        +{child.name}()"
+                yield "    }"
 
-        lines.append("```")
-        return "\n".join(lines)
+        yield "```"
 
     def generate_architecture_diagram(self, project_path: Path) -> str:
         """Generate architecture diagram from project structure."""
@@ -421,10 +885,21 @@ class DocGenerator:
     """Generates documentation from code analysis."""
 
     def __init__(self, ai_manager=None):
-        self.ai_manager = ai_manager or get_ai_manager()
+        self._ai_manager = ai_manager
         self.analyzer = CodeAnalyzer()
         self.diagram_gen = DiagramGenerator(ai_manager)
 
+    @property
+    def ai_manager(self):
+        """AI provider manager, fetched on first use so offline analysis never configures one."""
+        if self._ai_manager is None:
+            self._ai_manager = get_ai_manager()
+        return self._ai_manager
+
+    @ai_manager.setter
+    def ai_manager(self, ai_manager) -> None:
+        self._ai_manager = ai_manager
+
     def generate_api_reference(self, elements: list[CodeElement]) -> str:
         """Generate API reference documentation."""
         sections = ["# API Reference\n"]
@@ -446,7 +921,7 @@ class DocGenerator:
                     for method in cls.children:
                         sections.append(f"- `{method.signature or method.name}`")
                         if method.docstring:
-                            sections.append(f"  - {method.docstring.split(chr(10))[0]}")
+                            sections.append(f"  - {method.docstring.partition(chr(10))[0]}")
                         sections.append("")
 
         if functions:
@@ -468,9 +943,9 @@ class DocGenerator:
         ]
 
         # Group by severity
-        by_severity = {}
+        by_severity: defaultdict[str, list[IssueEntry]] = defaultdict(list)
         for issue in issues:
-            by_severity.setdefault(issue.severity, []).append(issue)
+            by_severity[issue.severity].append(issue)
 
         for severity in ["critical", "high", "medium", "low"]:
             if severity in by_severity:
@@ -493,10 +968,14 @@ class DocGenerator:
         """Generate a changelog entry."""
         sections = [f"## [{datetime.now().strftime('%Y-%m-%d')}]\n"]
 
-        added = [c for c in changes if c.get("type") == "added"]
-        changed = [c for c in changes if c.get("type") == "changed"]
-        fixed = [c for c in changes if c.get("type") == "fixed"]
-        removed = [c for c in changes if c.get("type") == "removed"]
+        # One pass over changes, bucketed by type
+        by_type: defaultdict[Any, list[dict[str, Any]]] = defaultdict(list)
+        for change in changes:
+            by_type[change.get("type")].append(change)
+        added = by_type["added"]
+        changed = by_type["changed"]
+        fixed = by_type["fixed"]
+        removed = by_type["removed"]
 
         if added:
             sections.append("### Added")
@@ -567,6 +1046,9 @@ class DocumentationAgent:
         self.generator = DocGenerator()
         self.analyzer = CodeAnalyzer()
         self._last_scan: datetime | None = None
+        # Unchanged files are not re-parsed, across scans and across runs
+        self._cache_path = self.docs_path / ".doc_cache.json"
+        self.analyzer.load_cache(self._cache_path)
 
     async def full_scan(self) -> dict[str, Any]:
         """
@@ -581,67 +1063,55 @@ class DocumentationAgent:
             "docs_generated": [],
         }
 
-        # Scan Python files
-        for py_file in self.project_path.rglob("*.py"):
-            if "__pycache__" in str(py_file):
-                continue
-            elements = self.analyzer.analyze_python_file(py_file)
-            results["files_scanned"] += 1
-            results["elements_found"] += len(elements)
+        # One walk of the tree; files are still analyzed Python, then Rust, then C#
+        by_suffix: dict[str, list[Path]] = {suffix: [] for suffix in _ANALYZERS}
+        for suffix, file_path in _iter_source_files(self.project_path):
+            by_suffix[suffix].append(file_path)
+        file_paths = [file_path for paths in by_suffix.values() for file_path in paths]
 
-        # Scan Rust files
-        for rs_file in self.project_path.rglob("*.rs"):
-            if "target" in str(rs_file):
-                continue
-            elements = self.analyzer.analyze_rust_file(rs_file)
-            results["files_scanned"] += 1
-            results["elements_found"] += len(elements)
-
-        # Scan C# files
-        for cs_file in self.project_path.rglob("*.cs"):
-            if "bin" in str(cs_file) or "obj" in str(cs_file):
-                continue
-            elements = self.analyzer.analyze_csharp_file(cs_file)
+        # Parsing is blocking; keep the event loop free for other agent work
+        for elements in await asyncio.to_thread(self.analyzer.analyze_files, file_paths):
             results["files_scanned"] += 1
             results["elements_found"] += len(elements)
 
         results["issues_found"] = len(self.analyzer.issues)
         self._last_scan = datetime.now()
+        try:
+            self.analyzer.save_cache(self._cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to save analysis cache: {e}")
 
         return results
 
     async def generate_all_docs(self) -> list[Path]:
         """Generate all documentation files."""
-        generated = []
-
-        self.docs_path.mkdir(parents=True, exist_ok=True)
+        docs: list[tuple[Path, str]] = []
 
         # API Reference
         api_doc = self.generator.generate_api_reference(list(self.analyzer.elements.values()))
-        api_path = self.docs_path / "API_REFERENCE_AUTO.md"
-        api_path.write_text(api_doc)
-        generated.append(api_path)
+        docs.append((self.docs_path / "API_REFERENCE_AUTO.md", api_doc))
 
         # Issue Report
         if self.analyzer.issues:
             issue_doc = self.generator.generate_issue_report(self.analyzer.issues)
-            issue_path = self.docs_path / "ISSUE_REPORT_AUTO.md"
-            issue_path.write_text(issue_doc)
-            generated.append(issue_path)
+            docs.append((self.docs_path / "ISSUE_REPORT_AUTO.md", issue_doc))
 
         # Architecture Diagram
         arch_diagram = self.generator.diagram_gen.generate_architecture_diagram(self.project_path)
-        diag_path = self.docs_path / "ARCHITECTURE_DIAGRAM.md"
-        diag_path.write_text(f"# Architecture Diagram\n\n{arch_diagram}")
-        generated.append(diag_path)
+        docs.append(
+            (self.docs_path / "ARCHITECTURE_DIAGRAM.md", f"# Architecture Diagram\n\n{arch_diagram}")
+        )
 
         # Class Diagrams
         classes = [e for e in self.analyzer.elements.values() if e.type == "class"]
         if classes:
             class_diag = self.generator.diagram_gen.generate_mermaid_class_diagram(classes)
-            class_path = self.docs_path / "CLASS_DIAGRAM.md"
-            class_path.write_text(f"# Class Diagram\n\n{class_diag}")
-            generated.append(class_path)
+            docs.append((self.docs_path / "CLASS_DIAGRAM.md", f"# Class Diagram\n\n{class_diag}"))
+
+        # Write off the event loop, all files at once
+        await asyncio.to_thread(self.docs_path.mkdir, parents=True, exist_ok=True)
+        await asyncio.gather(*(asyncio.to_thread(path.write_text, text) for path, text in docs))
+        generated = [path for path, _ in docs]
 
         logger.info(f"Generated {len(generated)} documentation files")
         return generated
@@ -659,12 +1129,15 @@ class DocumentationAgent:
 
 # Global documentation agent
 _doc_agent: DocumentationAgent | None = None
+_doc_agent_lock = threading.Lock()
 
 
 def get_doc_agent(project_path: Path | None = None) -> DocumentationAgent:
     """Get the global documentation agent."""
     global _doc_agent
     if _doc_agent is None:
-        project_path = project_path or Path("D:/Winhance-FS-Repo")
-        _doc_agent = DocumentationAgent(project_path)
+        with _doc_agent_lock:
+            if _doc_agent is None:
+                project_path = project_path or Path("D:/Winhance-FS-Repo")
+                _doc_agent = DocumentationAgent(project_path)
     return _doc_agent
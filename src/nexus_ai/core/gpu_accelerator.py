@@ -10,16 +10,106 @@ Leverages CUDA for:
 
 from __future__ import annotations
 
+import asyncio
+import gc
+import hashlib
+import math
+import mmap
 import os
 import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
+from itertools import repeat
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 from nexus_ai.core.logging_config import get_logger
 
+try:
+    import blake3
+
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
 logger = get_logger("gpu_accelerator")
 
+# Sentence-transformer model used when callers don't name one
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# llama.cpp context window and prompt-processing batch for local inference
+LLAMA_CONTEXT_SIZE = 4096
+LLAMA_BATCH_SIZE = 512
+
+# pHash recipe, as imagehash.phash: 32x32 grayscale, low-frequency 8x8 of its DCT
+PHASH_IMAGE_SIZE = 32
+PHASH_HASH_SIZE = 8
+
+# Images per GPU dispatch; a 32x32 float32 image is 4 KiB on the device
+PHASH_BATCH_SIZE = 4096
+
+# Read size for file hashing: large reads keep HDD readahead streaming, and each
+# worker thread reuses one buffer of this size for every file it hashes
+HASH_READ_CHUNK = 4 << 20
+
+# Files at least this large are hashed straight from a memory map
+MMAP_HASH_MIN = 8 << 20
+# Unix only; doubles the kernel readahead window for the mapping
+_MADV_SEQUENTIAL = getattr(mmap, "MADV_SEQUENTIAL", None)
+
+# One read buffer per worker thread (or process), not per file
+_read_buffers = threading.local()
+
+
+def _update_mmap(hasher: Any, fd: int) -> bool:
+    """Feed the whole of fd to hasher from a mapping; False if it can't be mapped."""
+    try:
+        mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return False
+    with mm:
+        if _MADV_SEQUENTIAL is not None:
+            mm.madvise(_MADV_SEQUENTIAL)
+        # One C-level update over the page cache, no copy into a Python buffer
+        hasher.update(mm)
+    return True
+
+
+def _hash_file(path: Path, algorithm: str) -> tuple[str, str | None]:
+    """Hash one file; module-level so process pools can pickle it."""
+    try:
+        if algorithm == "blake3" and BLAKE3_AVAILABLE:
+            # SIMD compression, and large inputs are split across cores
+            hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        elif algorithm in ("blake3", "xxhash"):
+            try:
+                import xxhash
+
+                hasher = xxhash.xxh64()
+            except ImportError:
+                hasher = hashlib.md5()
+        else:
+            hasher = hashlib.new(algorithm)
+
+        # Unbuffered: the large buffer replaces BufferedReader's own
+        with open(path, "rb", buffering=0) as f:
+            fd = f.fileno()
+            if os.fstat(fd).st_size >= MMAP_HASH_MIN and _update_mmap(hasher, fd):
+                return str(path), hasher.hexdigest()
+
+            view = getattr(_read_buffers, "view", None)
+            if view is None:
+                view = _read_buffers.view = memoryview(bytearray(HASH_READ_CHUNK))
+            while n := f.readinto(view):
+                hasher.update(view[:n])
+
+        return str(path), hasher.hexdigest()
+    except Exception as e:
+        logger.debug(f"Failed to hash {path}: {e}")
+        return str(path), None
+
 
 @dataclass
 class GPUInfo:
@@ -63,6 +153,15 @@ class GPUAccelerator:
         self._device = None
         self._gpu_info: GPUInfo | None = None
         self._lock = threading.Lock()
+        self._dct_basis = None
+        # Two (pinned host, device) pHash batch buffers, ping-ponged; one run at a time
+        self._phash_buffers = None
+        self._phash_lock = threading.Lock()
+        # Loaded sentence-transformer models by name, kept for reuse across calls
+        self._st_models: dict[str, Any] = {}
+        # Loaded llama.cpp models by (model_path, n_ctx, n_gpu_layers), each with
+        # the lock that serializes calls into it
+        self._llama_cache: dict[tuple[str, int, int], tuple[Any, threading.Lock]] = {}
 
         self._initialize()
 
@@ -134,8 +233,8 @@ class GPUAccelerator:
     async def compute_embeddings_batch(
         self,
         texts: list[str],
-        model_name: str = "all-MiniLM-L6-v2",
-    ) -> list[list[float]]:
+        model_name: str = DEFAULT_EMBEDDING_MODEL,
+    ) -> np.ndarray:
         """
         Compute embeddings for a batch of texts using GPU.
 
@@ -144,31 +243,66 @@ class GPUAccelerator:
             model_name: Sentence transformer model name
 
         Returns:
-            List of embedding vectors
+            Array of shape (len(texts), dim), float16 when config.use_fp16;
+            call .tolist() on it where plain lists are needed
         """
         if not self._cuda_available:
             logger.warning("GPU not available for embeddings, using CPU")
 
         try:
-            from sentence_transformers import SentenceTransformer
-
-            # Load model with GPU support
-            device = "cuda" if self._cuda_available else "cpu"
-            model = SentenceTransformer(model_name, device=device)
+            model = self._get_st_model(model_name)
 
-            # Compute embeddings in batches
+            # Compute embeddings in batches, kept as one tensor on the device
             embeddings = model.encode(
                 texts,
                 batch_size=self.config.batch_size,
                 show_progress_bar=False,
-                convert_to_numpy=True,
+                convert_to_tensor=True,
             )
+            if self.config.use_fp16:
+                # Half the device-to-host copy and the host memory
+                embeddings = embeddings.half()
 
-            return embeddings.tolist()
+            return embeddings.cpu().numpy()
 
         except ImportError:
             logger.error("sentence-transformers not installed")
-            return []
+            return np.empty((0, 0), dtype=np.float32)
+
+    def _get_st_model(self, model_name: str) -> Any:
+        """Cached SentenceTransformer for model_name, loaded on first use."""
+        with self._lock:
+            model = self._st_models.get(model_name)
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+
+                # Load model with GPU support
+                device = "cuda" if self._cuda_available else "cpu"
+                model = SentenceTransformer(model_name, device=device)
+                if self._cuda_available and self.config.use_fp16:
+                    # Half-precision weights: half the VRAM and bandwidth per batch
+                    model.half()
+                self._st_models[model_name] = model
+            return model
+
+    def warmup(self, model_name: str = DEFAULT_EMBEDDING_MODEL) -> bool:
+        """Load an embedding model ahead of the first batch; False if it can't be loaded."""
+        try:
+            self._get_st_model(model_name)
+        except ImportError:
+            logger.error("sentence-transformers not installed")
+            return False
+        return True
+
+    def unload_model(self, model_name: str) -> bool:
+        """Drop a cached embedding model and release its VRAM; False if not loaded."""
+        with self._lock:
+            model = self._st_models.pop(model_name, None)
+        if model is None:
+            return False
+        del model
+        self.clear_cache()
+        return True
 
     async def compute_image_hashes_batch(
         self,
@@ -177,6 +311,9 @@ class GPUAccelerator:
         """
         Compute perceptual hashes for images using GPU.
 
+        With CUDA, the DCTs of a whole batch run as one matmul on the GPU;
+        otherwise each image goes through imagehash.phash on the CPU.
+
         Args:
             image_paths: List of image file paths
 
@@ -186,9 +323,17 @@ class GPUAccelerator:
         results = {}
 
         try:
-            import imagehash
             from PIL import Image
 
+            if self._cuda_available:
+                try:
+                    return await asyncio.to_thread(self._phash_batched, image_paths)
+                except Exception as e:
+                    # CUDA errors and OOM leave the CPU path as a working fallback
+                    logger.warning(f"GPU image hashing failed, falling back to CPU: {e}")
+
+            import imagehash
+
             for path in image_paths:
                 try:
                     img = Image.open(path)
@@ -203,44 +348,136 @@ class GPUAccelerator:
 
         return results
 
-    def accelerate_hash_computation(
-        self,
-        file_paths: list[Path],
-        algorithm: str = "xxhash",
-    ) -> dict[str, str]:
+    def _phash_batched(self, image_paths: list[Path]) -> dict[str, str]:
         """
-        Accelerate file hashing using GPU/multi-threading.
-
-        Note: Pure file hashing is I/O bound, but we parallelize reading.
+        Batched pHash on the GPU, bit-compatible with imagehash.phash.
+
+        Decoding and the LANCZOS resize stay in PIL on worker threads so the
+        pixels match imagehash exactly; the DCT, median threshold and bit
+        packing run per batch on the device. The DCT runs in float64, as
+        scipy's does, so neither TF32 matmuls (see optimize_for_rtx3090) nor
+        float32 rounding can flip a bit near the median.
+
+        Batches alternate between two pinned host/device buffer pairs. Each
+        host-to-device copy runs on its own stream, and a batch's results are
+        only read back once the next batch has been decoded, so decoding,
+        transfer and the DCT kernels of neighbouring batches overlap.
         """
-        import hashlib
-        from concurrent.futures import ThreadPoolExecutor
+        from PIL import Image
 
+        torch = self._torch
+        size = PHASH_IMAGE_SIZE
         results = {}
 
-        def hash_file(path: Path) -> tuple:
+        def load(path: Path) -> np.ndarray | None:
             try:
-                if algorithm == "xxhash":
-                    try:
-                        import xxhash
+                with Image.open(path) as img:
+                    gray = img.convert("L").resize((size, size), Image.Resampling.LANCZOS)
+                return np.asarray(gray, dtype=np.float32)
+            except Exception as e:
+                logger.debug(f"Failed to hash image {path}: {e}")
+                return None
+
+        def collect(paths: list[str], bits: Any) -> None:
+            # Blocks until the batch's kernels finish; first coefficient is the
+            # most significant bit, as in imagehash
+            packed = np.packbits(bits.cpu().numpy(), axis=1)
+            for path, row in zip(paths, packed):
+                results[path] = row.tobytes().hex()
+
+        with self._phash_lock, ThreadPoolExecutor(max_workers=self.config.num_workers) as executor:
+            basis = self._get_dct_basis()
+            host_slots, device_slots = self._get_phash_buffers()
+            copy_stream = torch.cuda.Stream(self._device)
+            compute_stream = torch.cuda.current_stream(self._device)
+            pending = None
+            slot = 0
+
+            for start in range(0, len(image_paths), PHASH_BATCH_SIZE):
+                paths = image_paths[start : start + PHASH_BATCH_SIZE]
+                loaded = [
+                    (str(path), pixels)
+                    for path, pixels in zip(paths, executor.map(load, paths))
+                    if pixels is not None
+                ]
+                if not loaded:
+                    continue
+
+                # This slot's last batch was read back an iteration ago, so both
+                # of its buffers are free; the copy can overlap the previous batch
+                count = len(loaded)
+                staging = host_slots[slot].numpy()
+                for i, (_, pixels) in enumerate(loaded):
+                    staging[i] = pixels
+                # 0-255 pixels are exact in float32; the DCT itself runs in float64
+                batch = device_slots[slot][:count]
+                with torch.cuda.stream(copy_stream):
+                    batch.copy_(host_slots[slot][:count], non_blocking=True)
+
+                if pending is not None:
+                    # The previous batch ran on the GPU while this one decoded
+                    collect(*pending)
+
+                compute_stream.wait_stream(copy_stream)
+                dct = basis @ batch.double() @ basis.T
+                low = dct[:, :PHASH_HASH_SIZE, :PHASH_HASH_SIZE].reshape(count, -1)
+                bits = low > low.median(dim=1, keepdim=True).values
+                pending = ([path for path, _ in loaded], bits)
+                slot ^= 1
+
+            if pending is not None:
+                collect(*pending)
 
-                        hasher = xxhash.xxh64()
-                    except ImportError:
-                        hasher = hashlib.md5()
-                else:
-                    hasher = hashlib.new(algorithm)
+        return results
 
-                with open(path, "rb") as f:
-                    while chunk := f.read(65536):
-                        hasher.update(chunk)
+    def _get_phash_buffers(self) -> tuple[list[Any], list[Any]]:
+        """Two pinned host and two device pHash batch buffers, allocated once."""
+        if self._phash_buffers is None:
+            torch = self._torch
+            shape = (PHASH_BATCH_SIZE, PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE)
+            host = [torch.empty(shape, dtype=torch.float32, pin_memory=True) for _ in range(2)]
+            device = [
+                torch.empty(shape, dtype=torch.float32, device=self._device) for _ in range(2)
+            ]
+            self._phash_buffers = (host, device)
+        return self._phash_buffers
+
+    def _get_dct_basis(self):
+        """float64 DCT-II basis matrix on the device, built once (scale is irrelevant to pHash)."""
+        if self._dct_basis is None:
+            torch = self._torch
+            n = torch.arange(PHASH_IMAGE_SIZE, dtype=torch.float64, device=self._device)
+            self._dct_basis = torch.cos(
+                math.pi / (2 * PHASH_IMAGE_SIZE) * n[:, None] * (2 * n[None, :] + 1)
+            )
+        return self._dct_basis
 
-                return str(path), hasher.hexdigest()
-            except Exception as e:
-                logger.debug(f"Failed to hash {path}: {e}")
-                return str(path), None
+    def accelerate_hash_computation(
+        self,
+        file_paths: list[Path],
+        algorithm: str = "blake3",
+        use_processes: bool = False,
+    ) -> dict[str, str]:
+        """
+        Accelerate file hashing using GPU/multi-threading.
 
-        with ThreadPoolExecutor(max_workers=self.config.num_workers) as executor:
-            for path, hash_val in executor.map(hash_file, file_paths):
+        Note: Pure file hashing is I/O bound, but we parallelize reading.
+        BLAKE3 is the default; without the blake3 package it falls back to
+        xxhash, then MD5, as the "xxhash" algorithm does.
+        hashlib and xxhash release the GIL while digesting large reads, so
+        threads already use several cores on big files. use_processes helps
+        with many small, page-cached files, where the per-file Python work
+        holds the GIL.
+        """
+        results = {}
+        workers = self.config.num_workers
+        executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        # Paths per pickled task; ignored by the thread pool
+        chunksize = max(1, len(file_paths) // (workers * 4))
+
+        with executor_cls(max_workers=workers) as executor:
+            hashed = executor.map(_hash_file, file_paths, repeat(algorithm), chunksize=chunksize)
+            for path, hash_val in hashed:
                 if hash_val:
                     results[path] = hash_val
 
@@ -263,39 +500,23 @@ class GPUAccelerator:
         try:
             from llama_cpp import Llama
 
-            # Find default model if not specified
+            model_path = self._find_model(model_path)
             if model_path is None:
-                model_dirs = [
-                    Path.home() / ".lmstudio" / "models",
-                    Path.home() / ".ollama" / "models",
-                ]
-                for dir in model_dirs:
-                    if dir.exists():
-                        gguf_files = list(dir.rglob("*.gguf"))
-                        if gguf_files:
-                            model_path = gguf_files[0]
-                            break
-
-            if model_path is None or not model_path.exists():
                 return "Error: No model found"
 
-            # Load with GPU layers
-            llm = Llama(
-                model_path=str(model_path),
-                n_gpu_layers=-1 if self._cuda_available else 0,
-                n_ctx=4096,
-                verbose=False,
-            )
+            llm, llm_lock = self._get_llama(Llama, model_path)
 
-            # Generate
-            output = llm(
-                prompt,
-                max_tokens=max_tokens,
-                temperature=0.7,
-                echo=False,
-            )
+            def generate() -> str:
+                with llm_lock:
+                    output = llm(
+                        prompt,
+                        max_tokens=max_tokens,
+                        temperature=0.7,
+                        echo=False,
+                    )
+                return output["choices"][0]["text"]
 
-            return output["choices"][0]["text"]
+            return await asyncio.to_thread(generate)
 
         except ImportError:
             logger.error("llama-cpp-python not installed")
@@ -304,6 +525,125 @@ class GPUAccelerator:
             logger.error(f"Inference error: {e}")
             return f"Error: {e}"
 
+    async def run_local_inference_batch(
+        self,
+        prompts: list[str],
+        model_path: Path | None = None,
+        max_tokens: int = 512,
+    ) -> list[str]:
+        """
+        Run several prompts against one resident local model.
+
+        The model is loaded once and the prompts run back to back in a
+        worker thread, off the event loop. A Llama instance must not be
+        called from several threads at once, so every call holds the
+        model's lock and concurrent requests queue behind each other.
+
+        Returns:
+            One completion (or error string) per prompt, in order
+        """
+        if not self._cuda_available:
+            logger.warning("GPU not available for inference")
+
+        try:
+            from llama_cpp import Llama
+
+            model_path = self._find_model(model_path)
+            if model_path is None:
+                return ["Error: No model found"] * len(prompts)
+
+            llm, llm_lock = self._get_llama(Llama, model_path)
+
+            def generate() -> list[str]:
+                texts = []
+                for prompt in prompts:
+                    with llm_lock:
+                        output = llm(prompt, max_tokens=max_tokens, temperature=0.7, echo=False)
+                    texts.append(output["choices"][0]["text"])
+                return texts
+
+            return await asyncio.to_thread(generate)
+
+        except ImportError:
+            logger.error("llama-cpp-python not installed")
+            return ["Error: llama-cpp-python not installed"] * len(prompts)
+        except Exception as e:
+            logger.error(f"Inference error: {e}")
+            return [f"Error: {e}"] * len(prompts)
+
+    @staticmethod
+    def _find_model(model_path: Path | None) -> Path | None:
+        """model_path if it exists, else the first GGUF in the LM Studio/Ollama stores."""
+        # Find default model if not specified
+        if model_path is None:
+            model_dirs = [
+                Path.home() / ".lmstudio" / "models",
+                Path.home() / ".ollama" / "models",
+            ]
+            for dir in model_dirs:
+                if dir.exists():
+                    gguf_files = list(dir.rglob("*.gguf"))
+                    if gguf_files:
+                        model_path = gguf_files[0]
+                        break
+
+        if model_path is None or not model_path.exists():
+            return None
+        return model_path
+
+    def _get_llama(self, llama_cls: type, model_path: Path) -> tuple[Any, threading.Lock]:
+        """
+        Resident Llama for model_path and its call lock.
+
+        The model is loaded and offloaded on first use only. Hold the lock
+        around every call into it.
+        """
+        n_gpu_layers = -1 if self._cuda_available else 0
+        key = (str(model_path), LLAMA_CONTEXT_SIZE, n_gpu_layers)
+        with self._lock:
+            cached = self._llama_cache.get(key)
+            if cached is None:
+                # Load with GPU layers; KV cache and flash attention on the GPU too
+                llm = llama_cls(
+                    model_path=key[0],
+                    n_gpu_layers=n_gpu_layers,
+                    n_ctx=LLAMA_CONTEXT_SIZE,
+                    n_batch=LLAMA_BATCH_SIZE,
+                    use_mmap=True,
+                    use_mlock=False,
+                    flash_attn=self._cuda_available,
+                    offload_kqv=self._cuda_available,
+                    verbose=False,
+                )
+                cached = (llm, threading.Lock())
+                self._llama_cache[key] = cached
+            return cached
+
+    def unload_llm(self, model_path: Path | None = None) -> int:
+        """
+        Drop cached llama.cpp models and free their memory.
+
+        Args:
+            model_path: Model to unload; all cached models when None
+
+        Returns:
+            Number of models unloaded
+        """
+        with self._lock:
+            if model_path is None:
+                unloaded = list(self._llama_cache.values())
+                self._llama_cache.clear()
+            else:
+                keys = [key for key in self._llama_cache if key[0] == str(model_path)]
+                unloaded = [self._llama_cache.pop(key) for key in keys]
+        count = len(unloaded)
+        if count:
+            # llama.cpp frees the model when the last reference goes
+            del unloaded
+            gc.collect()
+            self.clear_cache()
+        return count
+
     def optimize_for_rtx3090(self) -> None:
         """Apply RTX 3090 Ti specific optimizations."""
         if not self._cuda_available or not self._torch:
@@ -11,12 +11,11 @@ Real-time logging with multiple outputs:
 from __future__ import annotations
 
 import atexit
-import queue
 import sys
 import threading
+import time
 from collections.abc import Callable
 from dataclasses import dataclass, field
-from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from typing import Any
@@ -68,13 +67,15 @@ class RealTimeLogHandler:
     - WebSocket streaming
     - UI callbacks
     - Event aggregation
+
+    Records arrive on loguru's enqueue worker thread (see setup_logging),
+    which does the queuing, so callbacks run there and never block the
+    thread that logged.
     """
 
     def __init__(self):
         self._callbacks: list[Callable[[dict[str, Any]], None]] = []
-        self._queue: queue.Queue = queue.Queue()
         self._running = False
-        self._thread: threading.Thread | None = None
         self._lock = threading.Lock()
 
     def add_callback(self, callback: Callable[[dict[str, Any]], None]) -> None:
@@ -90,41 +91,61 @@ class RealTimeLogHandler:
 
     def start(self) -> None:
         """Start the real-time handler."""
-        if self._running:
-            return
         self._running = True
-        self._thread = threading.Thread(target=self._process_queue, daemon=True)
-        self._thread.start()
 
     def stop(self) -> None:
         """Stop the handler."""
         self._running = False
-        if self._thread:
-            self._thread.join(timeout=1.0)
 
     def emit(self, record: dict[str, Any]) -> None:
         """Emit a log record to all callbacks."""
-        if self._running:
-            self._queue.put(record)
-
-    def _process_queue(self) -> None:
-        """Process log records from queue."""
-        while self._running:
-            try:
-                record = self._queue.get(timeout=0.1)
-                with self._lock:
-                    for callback in self._callbacks:
-                        try:
-                            callback(record)
-                        except Exception:
-                            pass  # Don't let callback errors break logging
-            except queue.Empty:
-                continue
+        if not self._running:
+            return
+        with self._lock:
+            for callback in self._callbacks:
+                try:
+                    callback(record)
+                except Exception:
+                    pass  # Don't let callback errors break logging
 
 
 # Global real-time handler
 _realtime_handler = RealTimeLogHandler()
 
+# Loguru id of the realtime sink; it is only registered while callbacks exist
+_realtime_sink_id: int | None = None
+_realtime_sink_lock = threading.Lock()
+
+# Levels of the sinks setup_logging added; None until it has run, while loguru's
+# default sink is still in place
+_configured_level_nos: list[int] | None = None
+# Lowest level any sink accepts; 0 (everything) until setup_logging has run
+_min_level_no = 0
+
+
+def _update_min_level() -> None:
+    """Recompute _min_level_no from the configured sinks and the realtime sink."""
+    global _min_level_no
+    if _configured_level_nos is None:
+        _min_level_no = 0
+        return
+    levels = list(_configured_level_nos)
+    if _realtime_sink_id is not None:
+        levels.append(LogLevel.DEBUG.value)
+    # No sinks at all: nothing is enabled
+    _min_level_no = min(levels, default=LogLevel.CRITICAL.value + 1)
+
+
+def log_enabled(level_no: int) -> bool:
+    """
+    Whether a record at level_no would reach any sink.
+
+    One integer compare, for hot paths to skip building log calls that
+    every sink would drop. Only sinks added by setup_logging and the
+    realtime sink are tracked, not ones added straight through logger.add.
+    """
+    return level_no >= _min_level_no
+
 
 def _serialize_record(record) -> dict[str, Any]:
     """Serialize a loguru record to dict."""
@@ -144,8 +165,26 @@ def _serialize_record(record) -> dict[str, Any]:
 
 def _realtime_sink(message):
     """Sink for real-time logging."""
-    record = message.record
-    _realtime_handler.emit(_serialize_record(record))
+    handler = _realtime_handler
+    if not handler._callbacks or not handler._running:
+        return
+    handler.emit(_serialize_record(message.record))
+
+
+def _sync_realtime_sink() -> None:
+    """Register the realtime sink while callbacks exist and drop it once none do."""
+    global _realtime_sink_id
+    with _realtime_sink_lock:
+        if _realtime_handler._callbacks:
+            if _realtime_sink_id is None:
+                _realtime_sink_id = logger.add(_realtime_sink, level="DEBUG", enqueue=True)
+        elif _realtime_sink_id is not None:
+            try:
+                logger.remove(_realtime_sink_id)
+            except ValueError:
+                pass  # Already removed by a logger.remove() elsewhere
+            _realtime_sink_id = None
+        _update_min_level()
 
 
 def setup_logging(config: LogConfig | None = None) -> None:
@@ -155,11 +194,15 @@ def setup_logging(config: LogConfig | None = None) -> None:
     Args:
         config: Logging configuration (uses defaults if None)
     """
+    global _realtime_sink_id, _configured_level_nos
     if config is None:
         config = LogConfig()
+    level_nos = []
 
     # Remove default handler
     logger.remove()
+    with _realtime_sink_lock:
+        _realtime_sink_id = None
 
     # Console handler
     if config.console_enabled:
@@ -169,6 +212,7 @@ def setup_logging(config: LogConfig | None = None) -> None:
             level=config.console_level.name,
             colorize=True,
         )
+        level_nos.append(config.console_level.value)
 
     # File handler
     if config.file_enabled:
@@ -182,6 +226,7 @@ def setup_logging(config: LogConfig | None = None) -> None:
             compression=config.file_compression,
             enqueue=True,  # Thread-safe
         )
+        level_nos.append(config.file_level.value)
 
     # JSON handler
     if config.json_enabled:
@@ -195,10 +240,14 @@ def setup_logging(config: LogConfig | None = None) -> None:
             serialize=True,
             enqueue=True,
         )
+        level_nos.append(config.file_level.value)
 
-    # Real-time handler
-    logger.add(_realtime_sink, level="DEBUG")
+    # Real-time handler; loguru's queue and worker thread deliver to the callbacks.
+    # Without callbacks no sink is added, so records skip it entirely.
     _realtime_handler.start()
+    with _realtime_sink_lock:
+        _configured_level_nos = level_nos
+    _sync_realtime_sink()
 
     # Register cleanup
     atexit.register(_realtime_handler.stop)
@@ -232,11 +281,13 @@ def add_realtime_callback(callback: Callable[[dict[str, Any]], None]) -> None:
         callback: Function that receives log records as dicts
     """
     _realtime_handler.add_callback(callback)
+    _sync_realtime_sink()
 
 
 def remove_realtime_callback(callback: Callable[[dict[str, Any]], None]) -> None:
     """Remove a real-time callback."""
     _realtime_handler.remove_callback(callback)
+    _sync_realtime_sink()
 
 
 # Convenience decorators
@@ -244,15 +295,22 @@ def log_function_call(func):
     """Decorator to log function calls."""
     import functools
 
+    func_logger = get_logger(func.__module__)
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        func_logger = get_logger(func.__module__)
-        func_logger.debug(
-            f"Calling {func.__name__}", args=str(args)[:100], kwargs=str(kwargs)[:100]
-        )
+        debug = log_enabled(LogLevel.DEBUG.value)
+        if debug:
+            # Lazy: the argument reprs are only built if a sink takes DEBUG records
+            func_logger.opt(lazy=True).debug(
+                f"Calling {func.__name__}",
+                args=lambda: str(args)[:100],
+                kwargs=lambda: str(kwargs)[:100],
+            )
         try:
             result = func(*args, **kwargs)
-            func_logger.debug(f"Completed {func.__name__}", result_type=type(result).__name__)
+            if debug:
+                func_logger.debug(f"Completed {func.__name__}", result_type=type(result).__name__)
             return result
         except Exception as e:
             func_logger.exception(f"Error in {func.__name__}: {e}")
@@ -265,15 +323,24 @@ def log_async_function_call(func):
     """Decorator to log async function calls."""
     import functools
 
+    func_logger = get_logger(func.__module__)
+
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
-        func_logger = get_logger(func.__module__)
-        func_logger.debug(
-            f"Calling async {func.__name__}", args=str(args)[:100], kwargs=str(kwargs)[:100]
-        )
+        debug = log_enabled(LogLevel.DEBUG.value)
+        if debug:
+            # Lazy: the argument reprs are only built if a sink takes DEBUG records
+            func_logger.opt(lazy=True).debug(
+                f"Calling async {func.__name__}",
+                args=lambda: str(args)[:100],
+                kwargs=lambda: str(kwargs)[:100],
+            )
         try:
             result = await func(*args, **kwargs)
-            func_logger.debug(f"Completed async {func.__name__}", result_type=type(result).__name__)
+            if debug:
+                func_logger.debug(
+                    f"Completed async {func.__name__}", result_type=type(result).__name__
+                )
             return result
         except Exception as e:
             func_logger.exception(f"Error in async {func.__name__}: {e}")
@@ -289,17 +356,19 @@ class LogPerformance:
     def __init__(self, operation: str, logger_name: str = "performance"):
         self.operation = operation
         self.logger = get_logger(logger_name)
-        self.start_time: datetime | None = None
+        self.start_time: int | None = None  # perf_counter_ns() at entry
 
     def __enter__(self):
-        self.start_time = datetime.now()
-        self.logger.debug(f"Starting: {self.operation}")
+        self.start_time = time.perf_counter_ns()
+        if log_enabled(LogLevel.DEBUG.value):
+            # Formatted by loguru, and only if a sink takes DEBUG records
+            self.logger.debug("Starting: {}", self.operation)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         duration = 0.0
         if self.start_time is not None:
-            duration = (datetime.now() - self.start_time).total_seconds() * 1000
+            duration = (time.perf_counter_ns() - self.start_time) / 1e6
         if exc_type:
             self.logger.error(f"Failed: {self.operation}", duration_ms=duration, error=str(exc_val))
         else:
@@ -63,9 +63,41 @@ class TestAgentTypes:
         assert agent is not None
         assert agent.config.type == AgentType.SEARCH
 
+    @pytest.mark.asyncio
+    async def test_organizer_batch_isolates_failing_task(self, tmp_path, monkeypatch):
+        """Test one failing scan only gives its own task an error result."""
+        from nexus_ai.core.agents import OrganizerAgent, AgentConfig, AgentTask, AgentType
+
+        (tmp_path / "a.txt").write_text("a")
+        agent = OrganizerAgent(
+            AgentConfig(type=AgentType.ORGANIZER, name="organizer", description="Test")
+        )
+        scan = agent._scan
+
+        async def failing_scan(task):
+            if task.parameters["path"] == "bad":
+                raise PermissionError("denied")
+            return await scan(task)
+
+        async def fake_chat(prompt, system_prompt=None):
+            return '[{"moves": []}]'
+
+        monkeypatch.setattr(agent, "_scan", failing_scan)
+        monkeypatch.setattr(agent, "ai_chat", fake_chat)
+        tasks = [
+            AgentTask(type=AgentType.ORGANIZER, parameters={"path": "bad"}),
+            AgentTask(type=AgentType.ORGANIZER, parameters={"path": str(tmp_path)}),
+        ]
+
+        results = await agent.execute_batch(tasks)
+
+        assert results[0] == {"error": "denied"}
+        assert results[1]["file_count"] == 1
+        assert results[1]["suggestions"] == {"moves": []}
+
 
 class TestAgentTask:
-    """Tests for AgentTask dataclass."""
+    """Tests for AgentTask struct."""
 
     def test_task_creation(self):
         """Test AgentTask can be created with defaults."""
@@ -96,6 +128,29 @@ class TestAgentTask:
         assert task.parameters["dry_run"] is True
         assert task.priority == TaskPriority.HIGH
 
+    def test_task_roundtrip(self):
+        """Test AgentTask survives to_dict/from_dict."""
+        from nexus_ai.core.agents import AgentTask, AgentType, TaskPriority
+
+        task = AgentTask(
+            type=AgentType.SEARCH,
+            parameters={"query": "*.py"},
+            priority=TaskPriority.URGENT,
+        )
+
+        restored = AgentTask.from_dict(task.to_dict())
+
+        assert restored == task
+        assert restored.priority == TaskPriority.URGENT
+
+    def test_task_json_roundtrip(self):
+        """Test AgentTask survives to_json/from_json."""
+        from nexus_ai.core.agents import AgentTask, AgentType
+
+        task = AgentTask(type=AgentType.REPAIR, parameters={"path": "/tmp"})
+
+        assert AgentTask.from_json(task.to_json()) == task
+
 
 class TestAgentOrchestrator:
     """Tests for AgentOrchestrator."""
@@ -170,6 +225,77 @@ class TestAgentOrchestrator:
         status = orchestrator.get_status()
         assert status["running"] is False
 
+    @pytest.mark.asyncio
+    async def test_worker_batches_same_type_tasks(self, tmp_path):
+        """Test queued tasks of one type are coalesced into one batch."""
+        from nexus_ai.core.agents import (
+            AgentConfig, AgentOrchestrator, AgentStatus, AgentTask, AgentType, MonitorAgent
+        )
+
+        batch_sizes = []
+
+        class BatchingMonitor(MonitorAgent):
+            BATCH_SIZE = 4
+
+            async def execute_batch(self, tasks):
+                batch_sizes.append(len(tasks))
+                return [{"ok": True} for _ in tasks]
+
+        orchestrator = AgentOrchestrator()
+        orchestrator._agents[AgentType.MONITOR] = BatchingMonitor(
+            AgentConfig(type=AgentType.MONITOR, name="monitor", description="Test monitor")
+        )
+        orchestrator.register_agent(AgentType.REPAIR)
+
+        tasks = [AgentTask(type=AgentType.MONITOR) for _ in range(3)]
+        await orchestrator.submit_task(tasks[0])
+        await orchestrator.submit_task(
+            AgentTask(type=AgentType.REPAIR, parameters={"path": str(tmp_path)})
+        )
+        for task in tasks[1:]:
+            await orchestrator.submit_task(task)
+
+        await orchestrator.start(num_workers=1)
+        await asyncio.wait_for(orchestrator._task_queue.join(), timeout=5)
+        await orchestrator.stop()
+
+        assert batch_sizes == [3]
+        assert all(task.status == AgentStatus.COMPLETED for task in tasks)
+
+    async def test_batch_does_not_jump_higher_priority_tasks(self):
+        """Test a batch stops before lower-priority tasks queued behind a deferred one."""
+        from nexus_ai.core.agents import AgentOrchestrator, AgentTask, AgentType, TaskPriority
+
+        orchestrator = AgentOrchestrator()
+        first = AgentTask(type=AgentType.MONITOR, priority=TaskPriority.HIGH)
+        same_high = AgentTask(type=AgentType.MONITOR, priority=TaskPriority.HIGH)
+        other_high = AgentTask(type=AgentType.REPAIR, priority=TaskPriority.HIGH)
+        same_low = AgentTask(type=AgentType.MONITOR, priority=TaskPriority.LOW)
+        for task in (other_high, same_high, same_low):
+            await orchestrator.submit_task(task)
+
+        batch = orchestrator._take_batch(first, limit=8)
+
+        assert batch == [first, same_high]
+        remaining = [orchestrator._task_queue.get_nowait()[-1] for _ in range(2)]
+        assert remaining == [other_high, same_low]
+
+    async def test_batch_lookahead_is_bounded(self, monkeypatch):
+        """Test one batch looks at a bounded number of other-type entries."""
+        from nexus_ai.core import agents
+        from nexus_ai.core.agents import AgentOrchestrator, AgentTask, AgentType
+
+        monkeypatch.setattr(agents, "_BATCH_LOOKAHEAD", 4)
+        orchestrator = AgentOrchestrator()
+        for _ in range(10):
+            await orchestrator.submit_task(AgentTask(type=AgentType.REPAIR))
+        late = AgentTask(type=AgentType.MONITOR)
+        await orchestrator.submit_task(late)
+
+        first = AgentTask(type=AgentType.MONITOR)
+        assert orchestrator._take_batch(first, limit=8) == [first]
+        assert orchestrator._task_queue.qsize() == 11
+
 
 class TestAgentExecution:
     """Tests for agent task execution."""
@@ -195,6 +321,46 @@ class TestAgentExecution:
         assert result.result is not None
         assert "watchers" in result.result
 
+    @pytest.mark.asyncio
+    async def test_run_task_records_timing(self):
+        """Test run_task stores monotonic timestamps convertible to ISO."""
+        from nexus_ai.core.agents import MonitorAgent, AgentConfig, AgentType, AgentTask
+
+        config = AgentConfig(
+            type=AgentType.MONITOR,
+            name="test_monitor",
+            description="Test monitor",
+        )
+        agent = MonitorAgent(config)
+
+        task = await agent.run_task(AgentTask(type=AgentType.MONITOR))
+
+        assert task.duration_ms >= 0
+        assert datetime.fromisoformat(task.started_at_iso) <= datetime.fromisoformat(
+            task.completed_at_iso
+        )
+
+    @pytest.mark.asyncio
+    async def test_task_history_is_bounded(self):
+        """Test task history keeps only the newest history_size tasks."""
+        from nexus_ai.core.agents import MonitorAgent, AgentConfig, AgentType, AgentTask
+
+        config = AgentConfig(
+            type=AgentType.MONITOR,
+            name="test_monitor",
+            description="Test monitor",
+            history_size=2,
+        )
+        agent = MonitorAgent(config)
+
+        tasks = [AgentTask(type=AgentType.MONITOR) for _ in range(3)]
+        for task in tasks:
+            await agent.run_task(task)
+
+        history = agent.get_task_history()
+        assert [t["id"] for t in history] == [tasks[1].id, tasks[2].id]
+        assert agent._tasks_completed == 3
+
     @pytest.mark.asyncio
     async def test_repair_agent_scan(self, file_generator: DummyFileGenerator):
         """Test RepairAgent scanning for issues."""
@@ -219,6 +385,30 @@ class TestAgentExecution:
         assert result.result is not None
         assert "issues_found" in result.result
 
+    @pytest.mark.asyncio
+    async def test_repair_agent_finds_nested_shortcuts(self, file_generator: DummyFileGenerator):
+        """Test RepairAgent reports .lnk files in subdirectories."""
+        from nexus_ai.core.agents import RepairAgent, AgentConfig, AgentType, AgentTask
+
+        file_generator.create_file("top.lnk", 10)
+        file_generator.create_file("nested.lnk", 10, subdir="a/b")
+        file_generator.create_file("notes.txt", 10)
+
+        config = AgentConfig(
+            type=AgentType.REPAIR,
+            name="test_repair",
+            description="Test repair",
+        )
+        agent = RepairAgent(config)
+
+        task = AgentTask(
+            type=AgentType.REPAIR,
+            parameters={"path": str(file_generator.base_dir)},
+        )
+
+        result = await agent.run_task(task)
+        assert result.result["issues_found"] == 2
+
 
 class TestGlobalOrchestrator:
     """Tests for global orchestrator instance."""
@@ -344,3 +534,20 @@ class TestAgentErrorHandling:
 
         assert task.status == AgentStatus.CANCELLED
         assert task.error is not None
+
+
+class TestResponseParsing:
+    """Tests for AI response JSON parsing."""
+
+    def test_parse_plain_json(self):
+        """Test parsing a bare JSON response."""
+        from nexus_ai.core.agents import _parse_json_response
+
+        assert _parse_json_response('{"keywords": ["a"]}') == {"keywords": ["a"]}
+
+    def test_parse_fenced_json(self):
+        """Test parsing JSON wrapped in a markdown code fence."""
+        from nexus_ai.core.agents import _parse_json_response
+
+        response = 'Here you go:\n```json\n{"suggestions": []}\n```'
+        assert _parse_json_response(response) == {"suggestions": []}
@@ -0,0 +1,466 @@
+"""
+Tests for AI Providers
+
+Tests for response caching and the provider request path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+
+def _response(content: str):
+    from nexus_ai.core.ai_providers import AIResponse, ProviderType
+
+    return AIResponse(content=content, model="test-model", provider=ProviderType.OLLAMA)
+
+
+class _FakeEncoder:
+    """Stands in for a SentenceTransformer with fixed, normalized vectors."""
+
+    VECTORS = {
+        "list large files": [1.0, 0.0, 0.0],
+        "show the large files": [0.99, 0.14, 0.0],
+        "delete temp files": [0.0, 1.0, 0.0],
+        "find duplicates": [0.0, 0.0, 1.0],
+    }
+
+    def encode(self, text, normalize_embeddings=True, convert_to_numpy=True):
+        vector = np.asarray(self.VECTORS[text], dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+
+class TestLLMCache:
+    """Tests for the exact-match response cache."""
+
+    def test_hit_and_miss(self):
+        """Test a stored key is served and an unknown key misses."""
+        from nexus_ai.core.ai_providers import LLMCache
+
+        cache = LLMCache()
+        cache.set("a", _response("cached"))
+
+        assert cache.get("a").content == "cached"
+        assert cache.get("b") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_depends_on_request_fields(self):
+        """Test make_key changes with the fields that determine a response."""
+        from nexus_ai.core.ai_providers import AIMessage, LLMCache, ProviderType
+
+        messages = [AIMessage(role="user", content="hi")]
+        key = LLMCache.make_key(ProviderType.OLLAMA, messages, "m", 0.0, 100)
+
+        assert key == LLMCache.make_key(ProviderType.OLLAMA, messages, "m", 0.0, 100)
+        assert key != LLMCache.make_key(ProviderType.OLLAMA, messages, "m", 0.5, 100)
+        assert key != LLMCache.make_key(ProviderType.OPENAI, messages, "m", 0.0, 100)
+
+    def test_expired_entry_misses(self):
+        """Test entries past their TTL are dropped on lookup."""
+        from nexus_ai.core.ai_providers import LLMCache
+
+        cache = LLMCache(ttl_seconds=0)
+        cache.set("a", _response("stale"))
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry goes first when full."""
+        from nexus_ai.core.ai_providers import LLMCache
+
+        cache = LLMCache(max_entries=2)
+        cache.set("a", _response("a"))
+        cache.set("b", _response("b"))
+        cache.get("a")
+        cache.set("c", _response("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a").content == "a"
+        assert cache.get("c").content == "c"
+        assert len(cache) == 2
+
+
+class TestSemanticCache:
+    """Tests for the embedding-similarity response cache."""
+
+    @pytest.fixture
+    def cache(self):
+        from nexus_ai.core.ai_providers import SemanticCache
+
+        cache = SemanticCache(threshold=0.95, max_entries=3)
+        cache._model = _FakeEncoder()
+        return cache
+
+    def test_paraphrase_hits(self, cache):
+        """Test a prompt close enough to a cached one is served from it."""
+        cache.add("list large files", "ns", _response("big"))
+
+        assert cache.lookup("show the large files", "ns").content == "big"
+        assert cache.hits == 1
+
+    def test_dissimilar_prompt_misses(self, cache):
+        """Test a prompt below the similarity threshold misses."""
+        cache.add("list large files", "ns", _response("big"))
+
+        assert cache.lookup("delete temp files", "ns") is None
+        assert cache.misses == 1
+
+    def test_other_namespace_misses(self, cache):
+        """Test entries only match within their own namespace."""
+        cache.add("list large files", "ns", _response("big"))
+
+        assert cache.lookup("list large files", "other") is None
+
+    def test_ring_buffer_evicts_oldest(self, cache):
+        """Test the oldest entry is overwritten once max_entries is reached."""
+        cache.add("list large files", "old", _response("big"))
+        cache.add("delete temp files", "ns", _response("temp"))
+        cache.add("find duplicates", "ns", _response("dupes"))
+        cache.add("show the large files", "ns", _response("large"))
+
+        assert len(cache) == 3
+        assert cache.lookup("list large files", "old") is None
+        assert cache.lookup("delete temp files", "ns").content == "temp"
+        assert cache.lookup("list large files", "ns").content == "large"
+
+    def test_evicted_namespace_is_forgotten(self, cache):
+        """Test a namespace is dropped once its last entry is overwritten."""
+        for i in range(10):
+            cache.add("find duplicates", f"ns{i}", _response(str(i)))
+
+        assert set(cache._namespace_ids) == {"ns7", "ns8", "ns9"}
+        assert cache.lookup("find duplicates", "ns9").content == "9"
+
+    def test_clear(self, cache):
+        """Test clear drops every entry and namespace."""
+        cache.add("list large files", "ns", _response("big"))
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.lookup("list large files", "ns") is None
+
+
+_COMPLETION = {
+    "model": "local-model",
+    "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"total_tokens": 3},
+}
+
+
+def _provider(handler, **overrides):
+    """LM Studio provider whose client answers through handler."""
+    from nexus_ai.core.ai_providers import AIConfig, LMStudioProvider, ProviderType
+
+    settings = {"max_retries": 2, "breaker_threshold": 2, "breaker_reset_seconds": 60.0}
+    settings.update(overrides)
+    provider = LMStudioProvider(AIConfig(provider=ProviderType.LMSTUDIO, **settings))
+    provider._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return provider
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record retry backoff delays instead of waiting them out."""
+    from nexus_ai.core import ai_providers
+
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(ai_providers.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+class TestProviderRetries:
+    """Tests for retries and backoff on transient failures."""
+
+    async def test_retries_server_errors_then_succeeds(self, sleeps):
+        """Test 5xx responses are retried with growing backoff."""
+        from nexus_ai.core.ai_providers import AIMessage, CircuitState
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 3:
+                return httpx.Response(503)
+            return httpx.Response(200, json=_COMPLETION)
+
+        provider = _provider(handler, retry_base_delay=0.5)
+        response = await provider.chat([AIMessage(role="user", content="hi")])
+
+        assert response.content == "ok"
+        assert len(calls) == 3
+        assert 0.5 <= sleeps[0] <= 1.0
+        assert 1.0 <= sleeps[1] <= 1.5
+        assert provider.breaker.state is CircuitState.CLOSED
+
+    async def test_honors_retry_after(self, sleeps):
+        """Test a numeric Retry-After header sets the delay, capped at retry_max_delay."""
+        responses = iter(
+            [
+                httpx.Response(429, headers={"Retry-After": "7"}),
+                httpx.Response(429, headers={"Retry-After": "120"}),
+                httpx.Response(200, json=_COMPLETION),
+            ]
+        )
+        provider = _provider(lambda request: next(responses), retry_max_delay=30.0)
+
+        response = await provider._post("http://test/chat")
+
+        assert response.status_code == 200
+        assert sleeps == [7.0, 30.0]
+
+    async def test_retries_transport_errors(self, sleeps):
+        """Test connection errors are retried and re-raised once retries run out."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ConnectError("refused", request=request)
+
+        provider = _provider(handler)
+
+        with pytest.raises(httpx.ConnectError):
+            await provider._post("http://test/chat")
+        assert len(calls) == 3
+        assert len(sleeps) == 2
+
+    async def test_client_errors_are_not_retried(self, sleeps):
+        """Test 4xx responses other than 429 fail at once without tripping the breaker."""
+        from nexus_ai.core.ai_providers import CircuitState
+
+        provider = _provider(lambda request: httpx.Response(400))
+
+        for _ in range(3):
+            with pytest.raises(httpx.HTTPStatusError):
+                await provider._post("http://test/chat")
+        assert sleeps == []
+        assert provider.breaker.state is CircuitState.CLOSED
+
+
+class TestCircuitBreaker:
+    """Tests for circuit breaker state changes on the request path."""
+
+    async def test_open_half_open_closed(self, sleeps):
+        """Test the circuit opens on failures, probes after the reset and closes."""
+        from nexus_ai.core.ai_providers import CircuitState, ProviderUnavailable
+
+        healthy = False
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200 if healthy else 500)
+
+        provider = _provider(handler, max_retries=0)
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await provider._post("http://test/chat")
+        assert provider.breaker.state is CircuitState.OPEN
+
+        # Open: rejected without reaching the provider
+        with pytest.raises(ProviderUnavailable):
+            await provider._post("http://test/chat")
+        assert len(calls) == 2
+
+        # After the reset one probe goes out; a failed probe re-opens at once
+        provider.breaker.reset_seconds = 0
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider._post("http://test/chat")
+        assert provider.breaker.state is CircuitState.OPEN
+
+        healthy = True
+        response = await provider._post("http://test/chat")
+        assert response.status_code == 200
+        assert provider.breaker.state is CircuitState.CLOSED
+
+    def test_single_probe_while_half_open(self):
+        """Test only one request is let through while half-open."""
+        from nexus_ai.core.ai_providers import CircuitBreaker, CircuitState
+
+        breaker = CircuitBreaker(threshold=1, reset_seconds=0)
+        breaker.record_failure()
+
+        assert breaker.allow()
+        assert breaker.state is CircuitState.HALF_OPEN
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state is CircuitState.CLOSED
+        assert breaker.allow()
+
+    async def test_cancelled_probe_releases_circuit(self):
+        """Test a cancelled half-open probe lets the next request probe again."""
+        from nexus_ai.core.ai_providers import CircuitState
+
+        hang = True
+        started = asyncio.Event()
+
+        async def handler(request):
+            if hang:
+                started.set()
+                await asyncio.Event().wait()
+            return httpx.Response(200)
+
+        provider = _provider(handler, breaker_threshold=1, breaker_reset_seconds=0)
+        provider.breaker.record_failure()
+        assert provider.breaker.state is CircuitState.OPEN
+
+        probe = asyncio.create_task(provider._post("http://test/chat"))
+        await started.wait()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        hang = False
+        response = await provider._post("http://test/chat")
+        assert response.status_code == 200
+        assert provider.breaker.state is CircuitState.CLOSED
+
+    async def test_unexpected_probe_error_releases_circuit(self):
+        """Test a probe failing with a non-transport error does not wedge the circuit."""
+        from nexus_ai.core.ai_providers import CircuitState
+
+        fail = True
+
+        def handler(request):
+            if fail:
+                raise RuntimeError("broken handler")
+            return httpx.Response(200)
+
+        provider = _provider(handler, breaker_threshold=1, breaker_reset_seconds=0)
+        provider.breaker.record_failure()
+
+        with pytest.raises(RuntimeError):
+            await provider._post("http://test/chat")
+
+        fail = False
+        response = await provider._post("http://test/chat")
+        assert response.status_code == 200
+        assert provider.breaker.state is CircuitState.CLOSED
+
+
+_SSE_BODY = b'data: {"choices":[{"delta":{"content":"streamed"}}]}\n\ndata: [DONE]\n\n'
+
+
+class TestStreamingRequests:
+    """Tests for streaming requests going through retries and the circuit breaker."""
+
+    async def test_stream_retries_before_first_byte(self, sleeps):
+        """Test a failed stream open is retried before any content arrives."""
+        from nexus_ai.core.ai_providers import AIMessage
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) < 2:
+                return httpx.Response(503)
+            return httpx.Response(200, content=_SSE_BODY)
+
+        provider = _provider(handler)
+        chunks = [c async for c in provider.stream_chat([AIMessage(role="user", content="hi")])]
+
+        assert chunks == ["streamed"]
+        assert len(calls) == 2
+        assert len(sleeps) == 1
+
+    async def test_stream_failures_trip_and_respect_breaker(self, sleeps):
+        """Test failed streams count against the breaker and an open circuit blocks them."""
+        from nexus_ai.core.ai_providers import AIMessage, CircuitState, ProviderUnavailable
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(500)
+
+        provider = _provider(handler, max_retries=0)
+        messages = [AIMessage(role="user", content="hi")]
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                async for _ in provider.stream_chat_bytes(messages):
+                    pass
+        assert provider.breaker.state is CircuitState.OPEN
+
+        with pytest.raises(ProviderUnavailable):
+            async for _ in provider.stream_chat(messages):
+                pass
+        assert len(calls) == 2
+
+class TestProviderManagerCache:
+    """Tests for response caching through AIProviderManager."""
+
+    @pytest.fixture
+    def manager(self, monkeypatch):
+        from nexus_ai.core.ai_providers import (
+            AIConfig,
+            AIProviderManager,
+            ProviderType,
+        )
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if b'"stream":true' in request.content:
+                chunk = b'{"choices":[{"delta":{"content":"streamed"}}]}'
+                return httpx.Response(200, content=b"data: " + chunk + b"\n\ndata: [DONE]\n\n")
+            return httpx.Response(200, json=_COMPLETION)
+
+        manager = AIProviderManager()
+        monkeypatch.setattr(
+            manager,
+            "_new_client",
+            lambda config: httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        )
+        # No model given: the provider fills in its default on first use
+        manager.register_provider(
+            ProviderType.LMSTUDIO, AIConfig(provider=ProviderType.LMSTUDIO, temperature=0)
+        )
+        manager.calls = calls
+        return manager
+
+    async def test_repeated_chat_hits_cache(self, manager):
+        """Test a second identical temperature-0 chat is served from the cache."""
+        from nexus_ai.core.ai_providers import AIMessage
+
+        messages = [AIMessage(role="user", content="hi")]
+        first = await manager.chat(messages)
+        second = await manager.chat(messages)
+
+        assert second.content == first.content == "ok"
+        assert len(manager.calls) == 1
+        assert len(manager.cache) == 1
+        assert manager.cache.hits == 1
+
+    async def test_repeated_stream_chat_hits_cache(self, manager):
+        """Test a second identical streamed chat is served from the cache."""
+        from nexus_ai.core.ai_providers import AIMessage
+
+        messages = [AIMessage(role="user", content="hi")]
+        first = [chunk async for chunk in manager.stream_chat(messages)]
+        second = [chunk async for chunk in manager.stream_chat(messages)]
+
+        assert first == second == ["streamed"]
+        assert len(manager.calls) == 1
+        assert manager.cache.hits == 1
+
+    async def test_cache_false_bypasses_cache(self, manager):
+        """Test cache=False always reaches the provider."""
+        from nexus_ai.core.ai_providers import AIMessage
+
+        messages = [AIMessage(role="user", content="hi")]
+        await manager.chat(messages, cache=False)
+        await manager.chat(messages, cache=False)
+
+        assert len(manager.calls) == 2
+        assert len(manager.cache) == 0
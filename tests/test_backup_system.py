@@ -0,0 +1,224 @@
+"""
+Tests for Backup System
+
+Tests for backup state persistence, backup codecs and restore.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from nexus_ai.core import backup_system
+
+
+def _manager(root: Path, **overrides):
+    """BackupManager with its primary and secondary locations under root."""
+    from nexus_ai.core.backup_system import BackupConfig, BackupManager
+
+    config = BackupConfig(
+        primary_backup_path=root / "primary",
+        secondary_backup_paths=[root / "secondary"],
+        **overrides,
+    )
+    return BackupManager(config)
+
+
+@pytest.fixture
+def source_file(tmp_path: Path) -> Path:
+    path = tmp_path / "data" / "notes.txt"
+    path.parent.mkdir()
+    path.write_text("backup me\n" * 100)
+    return path
+
+
+class TestStatePersistence:
+    """Tests for the state snapshot and its write-ahead log."""
+
+    def test_snapshot_roundtrip(self, tmp_path, source_file):
+        """Test records survive a restart through the snapshot alone."""
+        manager = _manager(tmp_path)
+        record = manager.backup([source_file])
+
+        reloaded = _manager(tmp_path).records[record.id]
+
+        assert reloaded.status == record.status
+        assert reloaded.expires_at == record.expires_at
+        assert [e.hash_original for e in reloaded.entries] == [
+            e.hash_original for e in record.entries
+        ]
+        assert not manager._wal_file_path().exists()
+
+    def test_wal_changes_replay_on_load(self, tmp_path, source_file):
+        """Test record changes written to the WAL are applied on top of the snapshot."""
+        manager = _manager(tmp_path)
+        record = manager.backup([source_file])
+        expires_at = record.expires_at
+
+        manager.extend_retention(record.id, days=3)
+        manager.extend_retention(record.id, days=5)
+
+        assert manager._wal_file_path().exists()
+        reloaded = _manager(tmp_path).records[record.id]
+        assert reloaded.expires_at == expires_at + timedelta(days=8)
+        assert reloaded.status == record.status
+
+    def test_torn_wal_tail_is_ignored(self, tmp_path, source_file):
+        """Test a crash mid-append loses only the torn last change."""
+        manager = _manager(tmp_path)
+        record = manager.backup([source_file])
+        expires_at = record.expires_at
+
+        manager.extend_retention(record.id, days=3)
+        manager.extend_retention(record.id, days=5)
+        wal_file = manager._wal_file_path()
+        data = wal_file.read_bytes()
+        wal_file.write_bytes(data[: len(data) - 10])
+
+        reloaded = _manager(tmp_path)
+        assert reloaded.records[record.id].expires_at == expires_at + timedelta(days=3)
+        assert reloaded._wal_entries == 1
+
+    def test_wal_compacts_into_snapshot(self, tmp_path, source_file, monkeypatch):
+        """Test the WAL is folded into a fresh snapshot once it grows long enough."""
+        monkeypatch.setattr(backup_system, "_WAL_COMPACT_EVERY", 3)
+        manager = _manager(tmp_path)
+        record = manager.backup([source_file])
+        expires_at = record.expires_at
+
+        for _ in range(3):
+            manager.extend_retention(record.id, days=1)
+
+        assert not manager._wal_file_path().exists()
+        reloaded = _manager(tmp_path).records[record.id]
+        assert reloaded.expires_at == expires_at + timedelta(days=3)
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _assert_roundtrip(manager, record, sources: list[Path], restore_dir: Path) -> None:
+    """Source hashes were recorded, the record verifies and restores byte for byte."""
+    from nexus_ai.core.backup_system import BackupStatus
+
+    assert record.status == BackupStatus.VERIFIED
+    by_source = {Path(e.source_path): e for e in record.entries}
+    for source in sources:
+        assert by_source[source].hash_original == _sha256(source)
+
+    assert manager.verifier.verify_record(record)[0]
+    # Every location holds a copy, so each file is restored once per location
+    assert manager.restore(record.id, restore_dir, overwrite=True)
+    for source in sources:
+        assert (restore_dir / source.name).read_bytes() == source.read_bytes()
+
+
+@pytest.fixture
+def source_tree(tmp_path: Path) -> Path:
+    """Many small, similar files (enough to train a zstd dictionary) and one large one."""
+    root = tmp_path / "tree"
+    (root / "conf").mkdir(parents=True)
+    for i in range(40):
+        (root / "conf" / f"service{i}.ini").write_text(
+            f"[service{i}]\nenabled = {i % 2 == 0}\npath = C:/Program Files/App{i}\n" * 20
+        )
+    (root / "blob.bin").write_bytes(os.urandom(1 << 20))
+    return root
+
+
+def _files(root: Path) -> list[Path]:
+    return sorted(p for p in root.rglob("*") if p.is_file())
+
+
+class TestBackupCodecs:
+    """Backup, verify and restore through each compression and copy path."""
+
+    @pytest.mark.skipif(not backup_system.ZSTD_AVAILABLE, reason="zstandard not installed")
+    def test_zstd_fused_hash_compress(self, tmp_path, source_file):
+        """Test the single-pass zstd path records the source hash."""
+        manager = _manager(tmp_path, compression_backend="zstd", skip_backup_rehash=False)
+        record = manager.backup([source_file])
+
+        assert all(e.backup_path.endswith(".zst") for e in record.entries)
+        assert all(e.hash_backup == _sha256(e.backup_path) for e in record.entries)
+        _assert_roundtrip(manager, record, [source_file], tmp_path / "restored")
+
+    @pytest.mark.skipif(not backup_system.ZSTD_AVAILABLE, reason="zstandard not installed")
+    def test_zstd_dictionary(self, tmp_path, source_tree):
+        """Test small files of a tree compress against a trained dictionary and restore."""
+        import zstandard
+
+        manager = _manager(tmp_path, compression_backend="zstd")
+        record = manager.backup([source_tree])
+
+        small = [e for e in record.entries if e.source_path.endswith(".ini")]
+        with open(small[0].backup_path, "rb") as f:
+            assert zstandard.get_frame_parameters(f.read(18)).dict_id != 0
+        _assert_roundtrip(manager, record, _files(source_tree), tmp_path / "restored")
+
+        # A fresh manager finds the dictionary on disk to restore with
+        reloaded = _manager(tmp_path, compression_backend="zstd")
+        assert reloaded.restore(record.id, tmp_path / "reloaded", overwrite=True)
+        for source in _files(source_tree):
+            assert (tmp_path / "reloaded" / source.name).read_bytes() == source.read_bytes()
+
+    def test_gzip_hashing_writer(self, tmp_path, source_tree):
+        """Test the gzip path hashes compressed output through _HashingWriter."""
+        manager = _manager(tmp_path, compression_backend="gzip", skip_backup_rehash=False)
+        record = manager.backup([source_tree])
+
+        assert all(e.backup_path.endswith(".gz") for e in record.entries)
+        assert all(e.hash_backup == _sha256(e.backup_path) for e in record.entries)
+        _assert_roundtrip(manager, record, _files(source_tree), tmp_path / "restored")
+
+    @pytest.mark.skipif(not backup_system.PGZIP_AVAILABLE, reason="pgzip not installed")
+    def test_pgzip_hashing_writer(self, tmp_path, source_tree):
+        """Test files above the block size go through parallel pgzip."""
+        manager = _manager(
+            tmp_path,
+            compression_backend="gzip",
+            parallel_compression_blocksize=64 << 10,
+            skip_backup_rehash=False,
+        )
+        record = manager.backup([source_tree])
+
+        assert all(e.hash_backup == _sha256(e.backup_path) for e in record.entries)
+        _assert_roundtrip(manager, record, _files(source_tree), tmp_path / "restored")
+
+    def test_kernel_copy(self, tmp_path, source_tree):
+        """Test uncompressed backups via copy_file_range/sendfile hash the source."""
+        manager = _manager(tmp_path, compress_backups=False)
+        record = manager.backup([source_tree])
+
+        assert not any(e.is_compressed for e in record.entries)
+        _assert_roundtrip(manager, record, _files(source_tree), tmp_path / "restored")
+
+    def test_read_write_copy_fallback(self, tmp_path, source_tree, monkeypatch):
+        """Test the fused read/hash/write copy used without an in-kernel copy."""
+        monkeypatch.setattr(backup_system, "_kernel_copy", lambda src_fd, dst_fd: None)
+        manager = _manager(tmp_path, compress_backups=False)
+        record = manager.backup([source_tree])
+
+        _assert_roundtrip(manager, record, _files(source_tree), tmp_path / "restored")
+
+    def test_bad_kernel_copy_fails_verification(self, tmp_path, source_file, monkeypatch):
+        """Test a corrupt in-kernel copy is caught instead of verifying against itself."""
+        from nexus_ai.core.backup_system import BackupStatus
+
+        def corrupt_copy(src_fd, dst_fd):
+            size = os.fstat(src_fd).st_size
+            os.write(dst_fd, b"x" * size)
+            return size
+
+        monkeypatch.setattr(backup_system, "_kernel_copy", corrupt_copy)
+        manager = _manager(tmp_path, compress_backups=False)
+        record = manager.backup([source_file])
+
+        assert record.entries[0].hash_original == _sha256(source_file)
+        assert record.status == BackupStatus.COMPLETED
+        assert not manager.verifier.verify_record(record)[0]
@@ -0,0 +1,258 @@
+"""
+Tests for Documentation Automation
+
+Tests for source discovery, code analysis and the analysis cache.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import orjson
+import pytest
+
+from nexus_ai.core import doc_automation
+
+
+def _write(root: Path, files: dict[str, str]) -> None:
+    for name, text in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+class TestSourceDiscovery:
+    """Tests for which files a scan picks up."""
+
+    def test_build_dirs_are_excluded_per_language(self, tmp_path):
+        """Test target/, bin/ and obj/ only hide the language that builds into them."""
+        from nexus_ai.core.doc_automation import _iter_source_files
+
+        _write(
+            tmp_path,
+            {
+                "src/bin/cli.rs": "",
+                "tools/bin/run.py": "",
+                "target/debug/build.rs": "",
+                "target/gen.py": "",
+                "App/bin/Debug/Gen.cs": "",
+                "App/obj/Gen.cs": "",
+                "App/Program.cs": "",
+                "pkg/__pycache__/mod.py": "",
+                "node_modules/dep/index.py": "",
+            },
+        )
+
+        found = sorted(p.relative_to(tmp_path).as_posix() for _, p in _iter_source_files(tmp_path))
+
+        assert found == ["App/Program.cs", "src/bin/cli.rs", "target/gen.py", "tools/bin/run.py"]
+
+    def test_build_dir_name_above_root_is_ignored(self, tmp_path):
+        """Test only components below the scan root are matched."""
+        from nexus_ai.core.doc_automation import _iter_source_files
+
+        root = tmp_path / "target" / "project"
+        _write(root, {"src/lib.rs": ""})
+
+        assert [p.name for _, p in _iter_source_files(root)] == ["lib.rs"]
+
+
+_RUST_SOURCE = """\
+// fn commented_out() {}
+/* struct Hidden;
+   fn also_hidden() {} */
+/// Docs mention fn doc_comment() too
+const S: &str = "fn in_string() { \\"struct Escaped\\" }";
+const R: &str = r#"struct InRaw "fn quoted()" "#;
+const Q: char = '"';
+fn after_quote_char(x: &'a str, y: &'b u8) -> &'a str { x }
+struct Real<'b> { s: &'b str }
+impl Real {}
+const E: char = '\\'';
+pub fn last() {}
+"""
+
+_CSHARP_SOURCE = '''\
+// public class Commented {}
+/* void Hidden() {} */
+public class Real
+{
+    private string s = "class InString { void M() }";
+    private string v = @"void InVerbatim() { ""class Quoted"" }";
+    private string raw = """
+        class InRaw {}
+        """;
+    private char q = '"';
+    public void AfterQuoteChar(int x) { }
+    private char e = '\\'';
+    public async Task Last() { }
+}
+'''
+
+
+class TestDeclarationMasking:
+    """Tests that declarations inside comments and literals are not extracted."""
+
+    def test_rust_comments_strings_and_chars(self, tmp_path):
+        """Test Rust comments, raw strings, '"' and lifetimes don't hide or fake declarations."""
+        from nexus_ai.core.doc_automation import CodeAnalyzer
+
+        path = tmp_path / "lib.rs"
+        path.write_text(_RUST_SOURCE)
+
+        found = {(e.name, e.type, e.line_number) for e in CodeAnalyzer().analyze_rust_file(path)}
+
+        assert found == {
+            ("after_quote_char", "function", 8),
+            ("Real", "struct", 9),
+            ("Real", "impl", 10),
+            ("last", "function", 12),
+        }
+
+    def test_csharp_comments_strings_and_chars(self, tmp_path):
+        """Test C# comments, verbatim/raw strings and '"' don't hide or fake declarations."""
+        from nexus_ai.core.doc_automation import CodeAnalyzer
+
+        path = tmp_path / "Program.cs"
+        path.write_text(_CSHARP_SOURCE)
+
+        found = {(e.name, e.type, e.line_number) for e in CodeAnalyzer().analyze_csharp_file(path)}
+
+        assert found == {
+            ("Real", "class", 3),
+            ("AfterQuoteChar", "method", 11),
+            ("Last", "method", 13),
+        }
+
+    def test_quote_char_does_not_open_a_string(self, tmp_path):
+        """Test a lone quote in a C# char literal doesn't open a string to end of line."""
+        from nexus_ai.core.doc_automation import CodeAnalyzer
+
+        path = tmp_path / "Quote.cs"
+        path.write_text("class Quote { char c = '\"'; void After() { } }\n")
+
+        names = {e.name for e in CodeAnalyzer().analyze_csharp_file(path)}
+
+        assert names == {"Quote", "After"}
+
+
+_PY_SOURCE = """\
+def undocumented(x):
+    pass
+
+
+class Documented:
+    \"\"\"A class.\"\"\"
+
+    def method(self):
+        return 1
+# TODO: tidy up
+"""
+
+
+@pytest.fixture
+def parses(monkeypatch) -> list[Path]:
+    """Record each file the analyzers actually parse."""
+    parsed: list[Path] = []
+    for suffix, (fn, register) in list(doc_automation._ANALYZERS.items()):
+
+        def counting(file_path, fn=fn):
+            parsed.append(file_path)
+            return fn(file_path)
+
+        monkeypatch.setitem(doc_automation._ANALYZERS, suffix, (counting, register))
+    return parsed
+
+
+@pytest.fixture
+def sources(tmp_path: Path) -> list[Path]:
+    _write(tmp_path, {"a.py": _PY_SOURCE, "b.py": _PY_SOURCE, "lib.rs": _RUST_SOURCE})
+    return [tmp_path / "a.py", tmp_path / "b.py", tmp_path / "lib.rs"]
+
+
+class TestAnalysisCache:
+    """Tests for the per-file analysis cache and its on-disk form."""
+
+    def test_repeat_scan_skips_unchanged_files(self, sources, parses):
+        """Test a second scan replays every unchanged file without parsing it."""
+        from nexus_ai.core.doc_automation import CodeAnalyzer
+
+        analyzer = CodeAnalyzer()
+        first = analyzer.analyze_files(sources)
+        assert parses == sources
+
+        parses.clear()
+        assert analyzer.analyze_files(sources) == first
+        assert parses == []
+
+    def test_changed_mtime_or_size_forces_reparse(self, sources, parses):
+        """Test a file whose mtime or size changed is parsed again, and only that file."""
+        from nexus_ai.core.doc_automation import CodeAnalyzer
+
+        analyzer = CodeAnalyzer()
+        analyzer.analyze_files(sources)
+
+        touched, grown = sources[0], sources[2]
+        stat = touched.stat()
+        os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        # Same mtime, different size
+        stat = grown.stat()
+        grown.write_text(_RUST_SOURCE + "fn added() {}\n")
+        os.utime(grown, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        parses.clear()
+        results = analyzer.analyze_files(sources)
+
+        assert parses == [touched, grown]
+        assert "added" in {e.name for e in results[2]}
+
+    def test_reloaded_cache_matches_fresh_analysis(self, tmp_path, sources, parses):
+        """Test a cache saved and loaded by a new analyzer replays the same elements and issues."""
+        from nexus_ai.core.doc_automation import CodeAnalyzer
+
+        fresh = CodeAnalyzer()
+        results = fresh.analyze_files(sources)
+        cache_path = tmp_path / "cache.json"
+        fresh.save_cache(cache_path)
+
+        reloaded = CodeAnalyzer()
+        reloaded.load_cache(cache_path)
+        parses.clear()
+
+        assert reloaded.analyze_files(sources) == results
+        assert parses == []
+        assert reloaded.elements == fresh.elements
+        assert reloaded.issues == fresh.issues
+        assert fresh.issues
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param(None, id="wrong-version"),
+            pytest.param(b'{"version": 4, "files": [{"path": "a.py", "ke', id="truncated"),
+            pytest.param(b'{"version": 4, "files": [{"path": "a.py"}]}', id="missing-fields"),
+            pytest.param(b"[1, 2, 3]", id="not-an-object"),
+        ],
+    )
+    def test_unusable_cache_is_ignored(self, tmp_path, sources, parses, content):
+        """Test a stale-version or corrupt cache file loads nothing and files are re-parsed."""
+        from nexus_ai.core.doc_automation import CodeAnalyzer
+
+        cache_path = tmp_path / "cache.json"
+        if content is None:
+            analyzer = CodeAnalyzer()
+            analyzer.analyze_files(sources)
+            analyzer.save_cache(cache_path)
+            cache = orjson.loads(cache_path.read_bytes())
+            cache["version"] = doc_automation._CACHE_VERSION - 1
+            content = orjson.dumps(cache)
+        cache_path.write_bytes(content)
+
+        analyzer = CodeAnalyzer()
+        analyzer.load_cache(cache_path)
+        assert analyzer._file_cache == {}
+
+        parses.clear()
+        analyzer.analyze_files(sources)
+        assert parses == sources